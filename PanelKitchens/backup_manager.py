@@ -0,0 +1,244 @@
+# file: panel_app/backup_manager.py
+"""
+גיבויים מצטברים: כל קובץ נחתך לחלקים לפי התוכן, וכל חלק נשמר פעם אחת בלבד (דחוס, לפי ה-hash שלו).
+גיבוי חוזר של נתונים שלא השתנו לא תופס מקום נוסף - רק החלקים החדשים נכתבים.
+
+Usage:
+    python backup_manager.py backup  [--data-dir panel_data]
+    python backup_manager.py list    [--data-dir panel_data]
+    python backup_manager.py restore SNAPSHOT_ID --to restore_dir [--data-dir panel_data]
+    python backup_manager.py verify  [SNAPSHOT_ID] [--data-dir panel_data]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from utils.file_lock import FileLock
+
+# גבולות החלקים נקבעים לפי תוכן השורות (ולא לפי מיקום), כך שהוספה באמצע קובץ
+# משנה רק את החלקים הסמוכים אליה. ממוצע של כ-64 שורות לחלק.
+BOUNDARY_MASK = 0x3F
+MIN_CHUNK = 16 * 1024
+MAX_CHUNK = 1024 * 1024
+KEEP_SNAPSHOTS = 30
+LOCK_FILE = ".lock"
+
+
+def iter_chunks(f):
+    """Split a binary stream into content-defined chunks (whole lines)."""
+    buf = []
+    size = 0
+    while True:
+        line = f.readline(MAX_CHUNK)
+        if not line:
+            break
+        buf.append(line)
+        size += len(line)
+        if size >= MAX_CHUNK or (size >= MIN_CHUNK and zlib.crc32(line) & BOUNDARY_MASK == 0):
+            yield b''.join(buf)
+            buf, size = [], 0
+    if buf:
+        yield b''.join(buf)
+
+
+class BackupStore:
+    def __init__(self, backup_dir: str):
+        self.backup_dir = backup_dir
+        self.chunks_dir = os.path.join(backup_dir, "chunks")
+        self.snapshots_dir = os.path.join(backup_dir, "snapshots")
+        os.makedirs(self.chunks_dir, exist_ok=True)
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+        # כמה עמדות יכולות לגבות לאותה תיקייה: גיבויים רצים במקביל (נעילה משותפת), וניקוי החלקים
+        # רק כשאין גיבוי באמצע - אחרת הוא מוחק חלק שגיבוי פעיל דילג עליו כי כבר היה קיים
+        self._lock = FileLock(os.path.join(backup_dir, LOCK_FILE))
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        self._lock.acquire(exclusive=exclusive)
+        try:
+            yield
+        finally:
+            self._lock.release()
+            self._lock.close()
+
+    def _chunk_path(self, digest: str) -> str:
+        return os.path.join(self.chunks_dir, digest[:2], f"{digest}.gz")
+
+    def _put_chunk(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._chunk_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(gzip.compress(data, compresslevel=6))
+            os.replace(tmp_path, path)
+        return digest
+
+    def _read_chunk(self, digest: str) -> bytes:
+        with open(self._chunk_path(digest), 'rb') as f:
+            return gzip.decompress(f.read())
+
+    def backup(self, files: Dict[str, str]) -> str:
+        """
+        Store the given files ({name: path}) and return the snapshot id.
+        The caller keeps the files from changing meanwhile (CustomerManager holds its file lock).
+        """
+        with self._locked(exclusive=False):
+            return self._backup(files)
+
+    def _backup(self, files: Dict[str, str]) -> str:
+        snapshots = self.list_snapshots()
+        previous = self.load_manifest(snapshots[-1])['files'] if snapshots else {}
+        snapshot_id = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        manifest = {'id': snapshot_id, 'created_at': datetime.now().isoformat(), 'files': {}}
+        for name, path in files.items():
+            if not os.path.exists(path):
+                continue
+            st = os.stat(path)
+            # קובץ שלא השתנה מאז הגיבוי הקודם לא נקרא שוב
+            prev = previous.get(name)
+            if prev and prev.get('mtime_ns') == st.st_mtime_ns and prev['size'] == st.st_size:
+                manifest['files'][name] = prev
+                continue
+            file_hash = hashlib.sha256()
+            chunks = []
+            size = 0
+            with open(path, 'rb') as f:
+                for data in iter_chunks(f):
+                    file_hash.update(data)
+                    size += len(data)
+                    chunks.append(self._put_chunk(data))
+            manifest['files'][name] = {'size': size, 'mtime_ns': st.st_mtime_ns, 'sha256': file_hash.hexdigest(),
+                                       'chunks': chunks}
+
+        tmp_path = os.path.join(self.snapshots_dir, f"{snapshot_id}.json.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, os.path.join(self.snapshots_dir, f"{snapshot_id}.json"))
+        return snapshot_id
+
+    def list_snapshots(self) -> List[str]:
+        return sorted(name[:-5] for name in os.listdir(self.snapshots_dir) if name.endswith('.json'))
+
+    def load_manifest(self, snapshot_id: str) -> dict:
+        with open(os.path.join(self.snapshots_dir, f"{snapshot_id}.json"), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def restore(self, snapshot_id: str, target_dir: str) -> List[str]:
+        """Rebuild the snapshot's files in target_dir; every file is checked against its hash."""
+        manifest = self.load_manifest(snapshot_id)
+        os.makedirs(target_dir, exist_ok=True)
+        restored = []
+        for name, entry in manifest['files'].items():
+            path = os.path.join(target_dir, name)
+            tmp_path = f"{path}.restore"
+            file_hash = hashlib.sha256()
+            with open(tmp_path, 'wb') as f:
+                for digest in entry['chunks']:
+                    data = self._read_chunk(digest)
+                    file_hash.update(data)
+                    f.write(data)
+            if file_hash.hexdigest() != entry['sha256']:
+                os.remove(tmp_path)
+                raise ValueError(f"{name}: restored content does not match the backup hash")
+            os.replace(tmp_path, path)
+            restored.append(path)
+        return restored
+
+    def verify(self, snapshot_id: Optional[str] = None) -> List[str]:
+        """Check chunks and file hashes of one snapshot (or all); returns a list of problems."""
+        problems = []
+        checked = {}
+        for sid in [snapshot_id] if snapshot_id else self.list_snapshots():
+            for name, entry in self.load_manifest(sid)['files'].items():
+                file_hash = hashlib.sha256()
+                for digest in entry['chunks']:
+                    if digest not in checked:
+                        try:
+                            data = self._read_chunk(digest)
+                            checked[digest] = hashlib.sha256(data).hexdigest() == digest
+                        except (OSError, EOFError, zlib.error) as e:
+                            problems.append(f"{sid}/{name}: chunk {digest[:12]} unreadable ({e})")
+                            checked[digest] = False
+                            continue
+                        file_hash.update(data)
+                    elif checked[digest]:
+                        file_hash.update(self._read_chunk(digest))
+                    if not checked[digest]:
+                        problems.append(f"{sid}/{name}: chunk {digest[:12]} is corrupt")
+                if file_hash.hexdigest() != entry['sha256']:
+                    problems.append(f"{sid}/{name}: file hash mismatch")
+        return problems
+
+    def prune(self, keep: int = KEEP_SNAPSHOTS) -> int:
+        """Keep the newest snapshots and delete chunks no snapshot refers to; returns chunks removed."""
+        with self._locked(exclusive=True):
+            return self._prune(keep)
+
+    def _prune(self, keep: int) -> int:
+        for sid in self.list_snapshots()[:-keep]:
+            os.remove(os.path.join(self.snapshots_dir, f"{sid}.json"))
+        referenced = set()
+        for sid in self.list_snapshots():
+            for entry in self.load_manifest(sid)['files'].values():
+                referenced.update(entry['chunks'])
+        removed = 0
+        for sub in os.listdir(self.chunks_dir):
+            sub_dir = os.path.join(self.chunks_dir, sub)
+            for name in os.listdir(sub_dir):
+                if name.endswith('.gz') and name[:-3] not in referenced:
+                    os.remove(os.path.join(sub_dir, name))
+                    removed += 1
+        return removed
+
+    def disk_usage(self) -> int:
+        total = 0
+        for root, _, names in os.walk(self.backup_dir):
+            total += sum(os.path.getsize(os.path.join(root, n)) for n in names)
+        return total
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Panel Kitchens - גיבוי ושחזור נתונים")
+    parser.add_argument('command', choices=['backup', 'list', 'restore', 'verify'])
+    parser.add_argument('snapshot', nargs='?', help="snapshot id (restore / verify)")
+    parser.add_argument('--data-dir', default='panel_data')
+    parser.add_argument('--to', default=None, help="restore target directory")
+    args = parser.parse_args(argv)
+
+    store = BackupStore(os.path.join(args.data_dir, "backups"))
+    if args.command == 'backup':
+        from customer_manager import CustomerManager
+        manager = CustomerManager(args.data_dir)
+        snapshot_id = manager.create_backup()
+        manager.close()
+        print(f"✅ backup {snapshot_id} ({store.disk_usage() / 1024 / 1024:.1f} MB in store)")
+    elif args.command == 'list':
+        for sid in store.list_snapshots():
+            files = store.load_manifest(sid)['files']
+            print(f"{sid}  {len(files)} files  {sum(f['size'] for f in files.values()) / 1024:.0f} KB")
+    elif args.command == 'restore':
+        if not args.snapshot or not args.to:
+            parser.error("restore needs SNAPSHOT_ID and --to")
+        for path in store.restore(args.snapshot, args.to):
+            print(f"restored {path}")
+    else:
+        problems = store.verify(args.snapshot)
+        for problem in problems:
+            print(f"❌ {problem}")
+        if problems:
+            return 1
+        print("✅ backup store verified")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
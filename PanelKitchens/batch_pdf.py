@@ -0,0 +1,199 @@
+# file: panel_app/batch_pdf.py
+"""
+יצירת הצעות מחיר באצווה (למשל אחרי שינוי מחירים או בסוף חודש)
+
+Usage:
+    python batch_pdf.py quotes.jsonl -o out_dir [--workers 4] [--settings panel_settings.json] [--profile email]
+    python batch_pdf.py quotes_dir/ -o out_dir
+    python batch_pdf.py quotes.jsonl --combined month_report.pdf
+
+Each quote is a JSON object:
+    {"id": "...", "customer_data": {"name": ..., "phone": ..., "date": "2025-06-20", "discount": 0, ...},
+     "items": [{"הפריט": ..., "כמות": ..., "מחיר יחידה": ...}], "demo1": "path", "demo2": "path"}
+Items may also use the CustomerManager keys (name / quantity / price / total).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from pdf_generator import create_combined_report, create_enhanced_pdf, register_fonts
+from utils.helpers import safe_filename
+
+# מיפוי מפתחות CustomerManager לעמודות המחולל
+ITEM_KEYS = {
+    'name': 'הפריט',
+    'quantity': 'כמות',
+    'price': 'מחיר יחידה',
+    'total': 'סהכ',
+}
+
+
+def load_quotes(source: str) -> List[Dict]:
+    """Load quotes from a JSON-lines file or a directory of .json / .jsonl files."""
+    if os.path.isdir(source):
+        quotes = []
+        for name in sorted(os.listdir(source)):
+            path = os.path.join(source, name)
+            if name.endswith('.jsonl'):
+                quotes.extend(load_quotes(path))
+            elif name.endswith('.json'):
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                quotes.extend(data if isinstance(data, list) else [data])
+        return quotes
+
+    quotes = []
+    with open(source, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                quotes.append(json.loads(line))
+    return quotes
+
+
+def _customer_data(raw: Dict) -> Dict:
+    data = {
+        'name': raw.get('name', ''),
+        'phone': raw.get('phone', ''),
+        'email': raw.get('email', ''),
+        'address': raw.get('address', ''),
+        'date': raw.get('date') or date.today(),
+        'discount': float(raw.get('discount', 0) or 0),
+        'contractor': raw.get('contractor', False),
+        'contractor_discount': float(raw.get('contractor_discount', 0) or 0),
+    }
+    if isinstance(data['date'], str):
+        data['date'] = date.fromisoformat(data['date'][:10])
+    return data
+
+
+def _items_df(items: List[Dict]) -> pd.DataFrame:
+    rows = []
+    for item in items:
+        row = {ITEM_KEYS.get(k, k): v for k, v in item.items()}
+        row.setdefault('כמות', 0)
+        row.setdefault('מחיר יחידה', 0)
+        row.setdefault('סהכ', row['כמות'] * row['מחיר יחידה'])
+        rows.append(row)
+    return pd.DataFrame(rows, columns=None if rows else ['הפריט', 'כמות', 'מחיר יחידה', 'סהכ'])
+
+
+def _output_name(quote: Dict, index: int) -> str:
+    if quote.get('output'):
+        return quote['output']
+    name = safe_filename(quote.get('customer_data', {}).get('name', ''))
+    return f"{quote.get('id') or f'{index:05d}'}_{name}.pdf"
+
+
+def _init_worker() -> None:
+    """רישום הגופנים פעם אחת בכל תהליך עובד"""
+    register_fonts()
+
+
+def render_quote(job) -> Dict:
+    """Render a single quote to disk; runs inside a worker process."""
+    index, quote, output_dir, pdf_settings, profile = job
+    output_path = os.path.join(output_dir, _output_name(quote, index))
+    try:
+        create_enhanced_pdf(
+            _customer_data(quote.get('customer_data', {})),
+            _items_df(quote.get('items', [])),
+            quote.get('demo1'),
+            quote.get('demo2'),
+            pdf_settings,
+            output=output_path,
+            profile=profile,
+        )
+        return {'index': index, 'path': output_path, 'ok': True}
+    except Exception as e:
+        return {'index': index, 'path': output_path, 'ok': False, 'error': str(e)}
+
+
+def render_batch(quotes: List[Dict], output_dir: str, workers: Optional[int] = None,
+                 pdf_settings: Optional[Dict] = None, profile: Optional[str] = None) -> Dict:
+    """
+    Render many quotes in parallel across CPU cores.
+    Returns a report with per-quote results and throughput (quotes per second).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    jobs = [(i, q, output_dir, pdf_settings, profile) for i, q in enumerate(quotes)]
+
+    start = time.perf_counter()
+    if workers == 1:
+        _init_worker()
+        results = [render_quote(job) for job in jobs]
+    else:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            results = list(pool.map(render_quote, jobs, chunksize=chunksize))
+    elapsed = time.perf_counter() - start
+
+    ok = sum(1 for r in results if r['ok'])
+    return {
+        'results': results,
+        'total': len(results),
+        'succeeded': ok,
+        'failed': len(results) - ok,
+        'seconds': elapsed,
+        'quotes_per_second': ok / elapsed if elapsed else 0.0,
+        'workers': workers,
+    }
+
+
+def render_combined(quotes: List[Dict], output_path: str, pdf_settings: Optional[Dict] = None,
+                    profile: Optional[str] = None) -> Dict:
+    """Render all quotes into one combined PDF report (single process, shared fonts and images)."""
+    def converted():
+        for quote in quotes:
+            yield {
+                'customer_data': _customer_data(quote.get('customer_data', {})),
+                'items_df': _items_df(quote.get('items', [])),
+                'demo1': quote.get('demo1'),
+                'demo2': quote.get('demo2'),
+            }
+
+    start = time.perf_counter()
+    count = create_combined_report(converted(), output_path, pdf_settings, profile)
+    elapsed = time.perf_counter() - start
+    return {'path': output_path, 'total': count, 'seconds': elapsed}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Panel Kitchens - יצירת הצעות מחיר באצווה")
+    parser.add_argument('source', help="JSON-lines file or directory of quote JSON files")
+    parser.add_argument('-o', '--output', default='batch_output', help="output directory")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--settings', default=None, help="settings file for PDF options (panel_settings.json)")
+    parser.add_argument('--profile', default=None, help="output profile: email / print / archive")
+    parser.add_argument('--combined', default=None, metavar='PDF', help="write all quotes into one combined report")
+    args = parser.parse_args(argv)
+
+    from settings_manager import SettingsManager
+    pdf_settings = SettingsManager(args.settings or "panel_settings.json").get_pdf_settings()
+
+    quotes = load_quotes(args.source)
+    if args.combined:
+        report = render_combined(quotes, args.combined, pdf_settings, args.profile)
+        print(f"✅ {report['total']} quotes -> {report['path']} in {report['seconds']:.2f}s")
+        return 0
+
+    report = render_batch(quotes, args.output, args.workers, pdf_settings, args.profile)
+
+    for r in report['results']:
+        if not r['ok']:
+            print(f"❌ {r['path']}: {r['error']}")
+    print(f"✅ {report['succeeded']}/{report['total']} quotes in {report['seconds']:.2f}s "
+          f"({report['quotes_per_second']:.1f} quotes/s, {report['workers']} workers)")
+    return 0 if report['failed'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# file: panel_app/benchmarks/backup_benchmark.py
+"""
+בנצ'מרק גיבויים - גיבוי מצטבר (backup_manager) מול עותק מלא של כל הקבצים בכל גיבוי
+
+כל "יום" נשמרות כמה הצעות חדשות ואז נלקח גיבוי, כמו auto_backup יומי.
+
+Usage (from the PanelKitchens directory):
+    python -m benchmarks.backup_benchmark
+    python -m benchmarks.backup_benchmark --size 10000 --days 10
+"""
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from backup_manager import BackupStore
+from benchmarks.storage_benchmark import fill_json, make_quote, _history_records
+from customer_manager import CustomerManager
+
+DAYS = 30
+QUOTES_PER_DAY = 40
+
+
+def _dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, n)) for root, _, names in os.walk(path) for n in names)
+
+
+def _full_copy(manager: CustomerManager, backup_dir: str) -> None:
+    """The previous scheme: a timestamped copy of every data file, keeping the last 30 files."""
+    manager.flush()
+    os.makedirs(backup_dir, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    for fname in [manager.customers_file, manager.quotes_file, manager.drafts_file, manager.journal_file,
+                  manager.stats_file, manager.items_file]:
+        if os.path.exists(fname):
+            shutil.copy2(fname, os.path.join(backup_dir, f"{timestamp}_{os.path.basename(fname)}"))
+    backups = sorted(os.listdir(backup_dir))
+    # 30 קבצים - כלומר רק 5 הגיבויים האחרונים כששישה קבצים בכל גיבוי
+    for old in backups[:-30]:
+        os.remove(os.path.join(backup_dir, old))
+
+
+def run(size: int, days: int, quotes_per_day: int) -> None:
+    tmp_dir = tempfile.mkdtemp(prefix='panel_backup_bench_')
+    try:
+        customers = max(1, size // 10)
+        fill_json(tmp_dir, _history_records(size, customers))
+        manager = CustomerManager(tmp_dir, flush_delay=0)
+        counter = size
+        full_dir = os.path.join(tmp_dir, "full_copies")
+        full_times, incremental_times = [], []
+        for _ in range(days):
+            for _ in range(quotes_per_day):
+                manager.save_quote(make_quote(counter, customers))
+                counter += 1
+            start = time.perf_counter()
+            _full_copy(manager, full_dir)
+            full_times.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            manager.create_backup()
+            incremental_times.append((time.perf_counter() - start) * 1000)
+        manager.close()
+
+        data_mb = sum(os.path.getsize(f) for f in [manager.customers_file, manager.quotes_file,
+                                                   manager.journal_file, manager.stats_file, manager.items_file]
+                      if os.path.exists(f)) / 1024 / 1024
+        store = BackupStore(os.path.join(tmp_dir, "backups"))
+        restore_dir = os.path.join(tmp_dir, "restored")
+        start = time.perf_counter()
+        store.restore(store.list_snapshots()[-1], restore_dir)
+        restore_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{size} quotes ({data_mb:.1f} MB of data), {days} daily backups, {quotes_per_day} quotes/day")
+        print(f"{'scheme':12} {'first ms':>9} {'median ms':>10} {'disk MB':>9}")
+        print(f"{'full copy':12} {full_times[0]:>9.0f} {statistics.median(full_times):>10.0f} "
+              f"{_dir_size(full_dir) / 1024 / 1024:>9.1f}")
+        print(f"{'incremental':12} {incremental_times[0]:>9.0f} {statistics.median(incremental_times):>10.0f} "
+              f"{store.disk_usage() / 1024 / 1024:>9.1f}")
+        print(f"restore of the latest snapshot: {restore_ms:.0f} ms, verify: "
+              f"{'ok' if not store.verify() else 'FAILED'}")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Backup benchmark")
+    parser.add_argument('--size', type=int, default=100000, help="history size (quotes)")
+    parser.add_argument('--days', type=int, default=DAYS)
+    parser.add_argument('--quotes-per-day', type=int, default=QUOTES_PER_DAY)
+    args = parser.parse_args(argv)
+    run(args.size, args.days, args.quotes_per_day)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
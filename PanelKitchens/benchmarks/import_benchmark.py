@@ -0,0 +1,101 @@
+# file: panel_app/benchmarks/import_benchmark.py
+"""
+בנצ'מרק ייבוא - bulk_import מול save_quote אחד-אחד
+
+Usage (from the PanelKitchens directory):
+    python -m benchmarks.import_benchmark
+    python -m benchmarks.import_benchmark --size 10000 --existing 0
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from benchmarks.storage_benchmark import _history_records, _load, fill_json, fill_sqlite
+from customer_manager_sqlite import SqliteCustomerManager
+
+IMPORT_SIZE = 50000
+EXISTING = 100000
+LOOP_SAMPLE = 2000
+
+
+def import_rows(size: int, customers: int) -> List[Dict]:
+    """Flat rows as they come out of an old Excel sheet: a few years back, dd/mm/yyyy dates."""
+    start = datetime(2015, 1, 1)
+    rows = []
+    for i in range(size):
+        total = 100 + i % 900
+        rows.append({
+            'name': f"לקוח ישן {i % customers}",
+            'phone': f"+972-54-{i % customers:07d}",
+            'created_at': (start + timedelta(hours=i)).strftime('%d/%m/%Y %H:%M'),
+            'items': [{'name': f"מוצר {i % 300}", 'quantity': 1, 'price': total, 'total': total}],
+            'total_amount': f"{total:,}",
+        })
+    return rows
+
+
+def _prepared_store(backend: str, existing: int) -> str:
+    data_dir = tempfile.mkdtemp(prefix='panel_import_bench_')
+    if existing:
+        records = _history_records(existing, max(1, existing // 10))
+        if backend == 'json':
+            fill_json(data_dir, records)
+        else:
+            manager = SqliteCustomerManager(data_dir, migrate=False)
+            fill_sqlite(manager, records)
+            manager.close()
+    return data_dir
+
+
+def run_case(backend: str, size: int, existing: int, loop_sample: int) -> Dict[str, float]:
+    rows = import_rows(size, max(1, size // 10))
+    result = {}
+
+    data_dir = _prepared_store(backend, existing)
+    try:
+        manager = _load(backend, data_dir)
+        start = time.perf_counter()
+        report = manager.bulk_import(quotes=rows)
+        result['bulk_s'] = time.perf_counter() - start
+        manager.close()
+        assert report['quotes_added'] == size and not report['errors']
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    # אותן שורות דרך save_quote (על מדגם) - כך נראה ייבוא בלולאה
+    data_dir = _prepared_store(backend, existing)
+    try:
+        manager = _load(backend, data_dir)
+        start = time.perf_counter()
+        for row in rows[:loop_sample]:
+            manager.save_quote({'customer_data': {'name': row['name'], 'phone': row['phone']},
+                                'items': row['items'], 'total_amount': 100})
+        per_quote = (time.perf_counter() - start) / loop_sample
+        manager.close()
+        result['loop_s'] = per_quote * size
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import benchmark")
+    parser.add_argument('--size', type=int, default=IMPORT_SIZE, help="quotes to import")
+    parser.add_argument('--existing', type=int, default=EXISTING, help="quotes already in the store")
+    parser.add_argument('--loop-sample', type=int, default=LOOP_SAMPLE,
+                        help="save_quote calls timed for the per-record estimate")
+    args = parser.parse_args(argv)
+
+    print(f"importing {args.size} quotes into a store with {args.existing} quotes")
+    print(f"{'backend':8} {'bulk s':>8} {'quotes/s':>10} {'save_quote loop s (est.)':>26}")
+    for backend in ('json', 'sqlite'):
+        r = run_case(backend, args.size, args.existing, args.loop_sample)
+        print(f"{backend:8} {r['bulk_s']:>8.2f} {args.size / r['bulk_s']:>10.0f} {r['loop_s']:>26.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,211 @@
+# file: panel_app/benchmarks/pdf_benchmark.py
+"""
+בנצ'מרק ליצירת PDF - זמן, זיכרון שיא וגודל קובץ מול baseline שמור
+
+Usage (from the PanelKitchens directory):
+    python -m benchmarks.pdf_benchmark                    # compare with baseline
+    python -m benchmarks.pdf_benchmark --update-baseline  # record a new baseline
+    python -m benchmarks.pdf_benchmark --quick            # skip the 5000-line cases
+    python -m benchmarks.pdf_benchmark --profiles         # size / time per output profile
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+import pandas as pd
+from PIL import Image as PILImage
+
+from pdf_generator import create_enhanced_pdf, register_fonts
+from settings_manager import SettingsManager
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdf_baseline.json')
+
+LINE_COUNTS = [5, 50, 500, 5000]
+VARIANTS = ['plain', 'images', 'long_names']
+
+# ספי רגרסיה (יחסית ל-baseline)
+DEFAULT_TIME_THRESHOLD = 0.5
+DEFAULT_MEMORY_THRESHOLD = 0.2
+DEFAULT_SIZE_THRESHOLD = 0.1
+
+LONG_NAME = "ארון מטבח עליון בגמר פורניר אלון טבעי עם דלתות זכוכית וציר טריקה שקטה"
+
+CUSTOMER = {
+    'name': 'לקוח בדיקה',
+    'phone': '050-1234567',
+    'email': 'bench@example.com',
+    'address': 'רחוב הבדיקה 1, באר שבע',
+    'date': date(2025, 1, 1),
+    'discount': 5.0,
+    'contractor': False,
+    'contractor_discount': 0.0,
+}
+
+
+def make_items(count: int, long_names: bool = False) -> pd.DataFrame:
+    rows = []
+    for i in range(count):
+        name = f"{LONG_NAME} {i}" if long_names else f"מוצר {i}"
+        qty = (i % 5) + 1
+        price = 100 + (i * 37) % 900
+        rows.append({'הפריט': name, 'כמות': qty, 'מחיר יחידה': price, 'סהכ': qty * price})
+    return pd.DataFrame(rows)
+
+
+def make_demo_image(path: str, seed: int) -> str:
+    """Deterministic 12MP photo-like image (smooth noise upscaled), like a phone picture"""
+    rng = random.Random(seed)
+    small = PILImage.frombytes('RGB', (160, 120), rng.randbytes(160 * 120 * 3))
+    small.resize((4000, 3000), PILImage.BICUBIC).save(path, format='JPEG', quality=95)
+    return path
+
+
+def run_case(lines: int, variant: str, images, repeats: int) -> dict:
+    items = make_items(lines, long_names=(variant == 'long_names'))
+    demo1, demo2 = images if variant == 'images' else (None, None)
+
+    def render():
+        # מטמון התמונות מנוקה כדי למדוד עיבוד מלא בכל ריצה
+        shutil.rmtree(os.path.join('panel_data', 'cache', 'images'), ignore_errors=True)
+        return create_enhanced_pdf(CUSTOMER, items, demo1, demo2)
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        buffer = render()
+        times.append(time.perf_counter() - start)
+    size = len(buffer.getbuffer())
+
+    tracemalloc.start()
+    render()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'seconds': min(times), 'peak_bytes': peak, 'size_bytes': size}
+
+
+def run_all(quick: bool = False, repeats: int = 3) -> dict:
+    register_fonts()
+    results = {}
+    workdir = tempfile.mkdtemp(prefix='pdf_bench_')
+    cwd = os.getcwd()
+    try:
+        images = (make_demo_image(os.path.join(workdir, 'demo1.jpg'), 1),
+                  make_demo_image(os.path.join(workdir, 'demo2.jpg'), 2))
+        os.chdir(workdir)
+        for lines in LINE_COUNTS:
+            if quick and lines > 500:
+                continue
+            for variant in VARIANTS:
+                name = f"{lines}_{variant}"
+                results[name] = run_case(lines, variant, images, repeats if lines < 5000 else 1)
+                r = results[name]
+                print(f"{name:>18}: {r['seconds'] * 1000:9.1f} ms  "
+                      f"{r['peak_bytes'] / 1e6:7.1f} MB peak  {r['size_bytes'] / 1e3:8.1f} KB")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def run_profiles(lines: int = 50, repeats: int = 3) -> dict:
+    """Size and render time of the same quote (with demo images) under each output profile"""
+    register_fonts()
+    pdf_settings = SettingsManager().default_settings['pdf']
+    items = make_items(lines)
+    results = {}
+    workdir = tempfile.mkdtemp(prefix='pdf_bench_')
+    cwd = os.getcwd()
+    try:
+        demo1 = make_demo_image(os.path.join(workdir, 'demo1.jpg'), 1)
+        demo2 = make_demo_image(os.path.join(workdir, 'demo2.jpg'), 2)
+        os.chdir(workdir)
+        for name in pdf_settings['profiles']:
+            times = []
+            for _ in range(repeats):
+                shutil.rmtree(os.path.join('panel_data', 'cache', 'images'), ignore_errors=True)
+                start = time.perf_counter()
+                buffer = create_enhanced_pdf(CUSTOMER, items, demo1, demo2, pdf_settings, profile=name)
+                times.append(time.perf_counter() - start)
+            results[name] = {'seconds': min(times), 'size_bytes': len(buffer.getbuffer())}
+            print(f"{name:>10}: {min(times) * 1000:9.1f} ms  {results[name]['size_bytes'] / 1e3:8.1f} KB")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def compare(results: dict, baseline: dict, time_threshold: float, memory_threshold: float,
+            size_threshold: float) -> list:
+    """Return a list of regression messages (empty when everything is within thresholds)."""
+    checks = [
+        ('seconds', time_threshold),
+        ('peak_bytes', memory_threshold),
+        ('size_bytes', size_threshold),
+    ]
+    failures = []
+    for name, result in results.items():
+        base = baseline.get('cases', {}).get(name)
+        if not base:
+            continue
+        for metric, threshold in checks:
+            if base[metric] and result[metric] > base[metric] * (1 + threshold):
+                change = result[metric] / base[metric] - 1
+                failures.append(f"{name}: {metric} {base[metric]:.4g} -> {result[metric]:.4g} (+{change:.0%})")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="PDF generation benchmark")
+    parser.add_argument('--update-baseline', action='store_true', help="store results as the new baseline")
+    parser.add_argument('--quick', action='store_true', help="skip the 5000-line cases")
+    parser.add_argument('--profiles', action='store_true', help="report size and time per output profile")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--time-threshold', type=float, default=DEFAULT_TIME_THRESHOLD)
+    parser.add_argument('--memory-threshold', type=float, default=DEFAULT_MEMORY_THRESHOLD)
+    parser.add_argument('--size-threshold', type=float, default=DEFAULT_SIZE_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.profiles:
+        run_profiles(repeats=args.repeats)
+        return 0
+
+    results = run_all(quick=args.quick, repeats=args.repeats)
+
+    if args.update_baseline:
+        baseline = {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'cases': results,
+        }
+        with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2)
+        print(f"📄 baseline saved: {BASELINE_FILE}")
+        return 0
+
+    if not os.path.exists(BASELINE_FILE):
+        print("⚠️ no baseline found - run with --update-baseline first")
+        return 0
+    with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    failures = compare(results, baseline, args.time_threshold, args.memory_threshold, args.size_threshold)
+    if failures:
+        print("\n❌ regressions against baseline:")
+        for line in failures:
+            print(f"  {line}")
+        return 1
+    print("\n✅ within baseline thresholds")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+# file: panel_app/benchmarks/storage_benchmark.py
+"""
+בנצ'מרק לאחסון הלקוחות וההצעות - זמן שמירה ושאילתה כשההיסטוריה גדלה
+
+Usage (from the PanelKitchens directory):
+    python -m benchmarks.storage_benchmark                   # JSON vs SQLite up to 100k quotes
+    python -m benchmarks.storage_benchmark --sizes 1000 10000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from bulk_import import normalize_phone
+from customer_manager import CustomerManager
+from customer_manager_sqlite import SqliteCustomerManager, QUOTE_FIELDS
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+CUSTOMERS_RATIO = 10  # הצעות ללקוח בממוצע
+SAMPLES = 50
+
+
+def make_quote(i: int, customers: int) -> Dict:
+    phone = f"050-{i % customers:07d}"
+    items = [{'name': f"מוצר {(i + k) % 300}", 'quantity': k + 1, 'price': 100 + k, 'total': (k + 1) * (100 + k)}
+             for k in range(5)]
+    return {
+        'customer_data': {'name': f"לקוח {i % customers}", 'phone': phone, 'discount': 0},
+        'items': items,
+        'total_amount': sum(item['total'] for item in items),
+    }
+
+
+def _history_records(size: int, customers: int) -> List[Dict]:
+    """היסטוריה מוכנה מראש (בלי לעבור דרך save_quote) כדי שהבנצ'מרק ימדוד רק את הגודל הסופי"""
+    start = datetime(2020, 1, 1)
+    records = []
+    for i in range(size):
+        quote = make_quote(i, customers)
+        created = (start + timedelta(minutes=i)).isoformat()
+        records.append({
+            'id': f"quote_{i:08d}",
+            'customer_id': normalize_phone(quote['customer_data']['phone']),
+            'customer_name': quote['customer_data']['name'],
+            'date': created,
+            'items': quote['items'],
+            'total_amount': quote['total_amount'],
+            'discount': 0,
+            'created_at': created,
+            'pdf_path': '',
+            'notes': '',
+        })
+    return records
+
+
+def _customers(records: List[Dict]) -> Dict[str, dict]:
+    customers = {}
+    for q in records:
+        c = customers.setdefault(q['customer_id'], {
+            'id': q['customer_id'], 'name': q['customer_name'], 'phone': q['customer_id'], 'email': '',
+            'address': '', 'created_at': q['created_at'], 'updated_at': q['created_at'],
+            'quotes_count': 0, 'total_amount': 0, 'notes': '',
+        })
+        c['quotes_count'] += 1
+        c['total_amount'] += q['total_amount']
+    return customers
+
+
+def fill_json(data_dir: str, records: List[Dict]) -> None:
+    """קבצים במבנה הישן (פריטים בתוך ההיסטוריה); הטעינה הראשונה מעבירה אותם למבנה הנוכחי"""
+    with open(os.path.join(data_dir, "quotes_history.json"), 'w', encoding='utf-8') as f:
+        json.dump(records, f, ensure_ascii=False)
+    with open(os.path.join(data_dir, "customers.json"), 'w', encoding='utf-8') as f:
+        json.dump(_customers(records), f, ensure_ascii=False)
+    CustomerManager(data_dir).close()
+
+
+def _load(backend: str, data_dir: str):
+    if backend == 'json':
+        # בלי חלון איסוף - כל שמירה נכתבת לדיסק כמו ב-SQLite
+        return CustomerManager(data_dir, flush_delay=0)
+    return SqliteCustomerManager(data_dir, migrate=False)
+
+
+def measure_load(backend: str, data_dir: str) -> Dict[str, float]:
+    """Startup time and memory retained by a freshly loaded manager."""
+    start = time.perf_counter()
+    _load(backend, data_dir).close()
+    load_ms = (time.perf_counter() - start) * 1000
+    tracemalloc.start()
+    manager = _load(backend, data_dir)
+    load_mb = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+    tracemalloc.stop()
+    manager.close()
+    return {'load_ms': load_ms, 'load_mb': load_mb}
+
+
+def fill_sqlite(manager: SqliteCustomerManager, records: List[Dict]) -> None:
+    with manager.conn:
+        manager.conn.executemany(
+            f"INSERT INTO quotes({', '.join(QUOTE_FIELDS)}) VALUES ({', '.join('?' * len(QUOTE_FIELDS))})",
+            (manager._quote_row(q) for q in records))
+        manager.conn.executemany(
+            "INSERT INTO customers(id, name, phone, email, address, created_at, updated_at, quotes_count, "
+            "total_amount, notes) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (manager._customer_row(c) for c in _customers(records).values()))
+    # ההכנסה עוקפת את save_quote - בונים את המצטברים כמו אחרי שדרוג
+    manager.rebuild_statistics()
+
+
+def _timed(fn, samples: int) -> float:
+    """Median latency in milliseconds."""
+    times = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def run_case(backend: str, size: int, samples: int = SAMPLES,
+             quotes_per_customer: int = CUSTOMERS_RATIO) -> Dict[str, float]:
+    tmp_dir = tempfile.mkdtemp(prefix='panel_storage_bench_')
+    try:
+        customers = max(1, size // quotes_per_customer)
+        records = _history_records(size, customers)
+        if backend == 'json':
+            fill_json(tmp_dir, records)
+        else:
+            manager = SqliteCustomerManager(tmp_dir, migrate=False)
+            fill_sqlite(manager, records)
+            manager.close()
+        del records
+
+        result = measure_load(backend, tmp_dir)
+        manager = _load(backend, tmp_dir)
+
+        rng = random.Random(size)
+        counter = iter(range(size, size + samples * 2))
+        some_customer = f"050{rng.randrange(customers):07d}"
+        result.update({
+            'save_ms': _timed(lambda: manager.save_quote(make_quote(next(counter), customers)), samples),
+            'customer_history_ms': _timed(lambda: manager.get_quote_history(some_customer), samples),
+            'get_customer_ms': _timed(lambda: manager.get_customer(some_customer), samples),
+            'search_ms': _timed(lambda: manager.search_customers("050-00012"), max(5, samples // 5)),
+            'search_name_ms': _timed(lambda: manager.search_customers("לקוח 123"), max(5, samples // 5)),
+            'statistics_ms': _timed(manager.get_statistics, 3),
+            'rollup_ms': _timed(lambda: manager.get_revenue_rollup('day'), 3),
+        })
+        manager.close()
+        return result
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Customer storage benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="history sizes (quotes)")
+    parser.add_argument('--samples', type=int, default=SAMPLES)
+    parser.add_argument('--quotes-per-customer', type=int, default=CUSTOMERS_RATIO,
+                        help="1 gives as many customers as quotes (search at scale)")
+    args = parser.parse_args(argv)
+
+    print(f"{'backend':8} {'quotes':>8} {'load':>9} {'MB':>7} {'save':>9} {'history':>9} {'customer':>9} "
+          f"{'search':>9} {'by name':>9} {'stats':>9} {'daily':>9}  (ms)")
+    for size in args.sizes:
+        for backend in ('json', 'sqlite'):
+            r = run_case(backend, size, args.samples, args.quotes_per_customer)
+            print(f"{backend:8} {size:>8} {r['load_ms']:>9.1f} {r['load_mb']:>7.1f} {r['save_ms']:>9.2f} {r['customer_history_ms']:>9.2f} "
+                  f"{r['get_customer_ms']:>9.3f} {r['search_ms']:>9.2f} {r['search_name_ms']:>9.2f} {r['statistics_ms']:>9.3f} {r['rollup_ms']:>9.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
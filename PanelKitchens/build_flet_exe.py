@@ -22,6 +22,7 @@ reportlab>=3.6.0
 pillow>=9.0.0
 arabic-reshaper>=3.0.0
 python-bidi>=0.4.2
+pypdfium2>=4.0.0
 """
 
     with open('requirements.txt', 'w') as f:
@@ -48,10 +49,30 @@ def build_exe():
         "--add-data", "static;static",
         "--add-data", "catalog_loader.py;.",
         "--add-data", "pdf_generator.py;.",
+        "--add-data", "image_processing.py;.",
+        "--add-data", "pdf_cache.py;.",
+        "--add-data", "pdf_preview.py;.",
+        "--add-data", "customer_manager.py;.",
+        "--add-data", "customer_manager_sqlite.py;.",
+        "--add-data", "backup_manager.py;.",
+        "--add-data", "bulk_import.py;.",
+        "--add-data", "excel_export.py;.",
+        "--add-data", "maintenance.py;.",
+        "--add-data", "settings_manager.py;.",
         "--add-data", "products_view_flet.py;.",
         "--add-data", "utils;utils",
         "--hidden-import", "catalog_loader",
         "--hidden-import", "pdf_generator",
+        "--hidden-import", "image_processing",
+        "--hidden-import", "pdf_cache",
+        "--hidden-import", "pdf_preview",
+        "--hidden-import", "customer_manager",
+        "--hidden-import", "customer_manager_sqlite",
+        "--hidden-import", "backup_manager",
+        "--hidden-import", "bulk_import",
+        "--hidden-import", "excel_export",
+        "--hidden-import", "maintenance",
+        "--hidden-import", "settings_manager",
         "--hidden-import", "products_view_flet",
         "--hidden-import", "utils.helpers",
         "--hidden-import", "utils.rtl",
@@ -63,8 +84,10 @@ def build_exe():
         "--hidden-import", "reportlab.lib.units",
         "--hidden-import", "PIL.Image",
         "--hidden-import", "PIL.ImageDraw",
+        "--hidden-import", "PIL.ImageOps",
         "--hidden-import", "arabic_reshaper",
         "--hidden-import", "bidi.algorithm",
+        "--hidden-import", "pypdfium2",
         "--distpath", "dist",
         "--onefile",
     ]
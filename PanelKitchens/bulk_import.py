@@ -0,0 +1,244 @@
+# file: panel_app/bulk_import.py
+"""
+ייבוא מרוכז של לקוחות והצעות היסטוריות (מ-Excel / CSV או מרשימת מילונים)
+
+כל הרשומות נבדקות, לקוחות מאוחדים לפי טלפון מנורמל, ומזהים חדשים מוקצים בלי התנגשות -
+ואז הכול נכתב בבת אחת (flush אחד ב-JSON, טרנזקציה אחת ב-SQLite) דרך bulk_import של המאגר.
+
+Usage:
+    python bulk_import.py old_quotes.xlsx [--data-dir panel_data] [--backend json|sqlite]
+"""
+import argparse
+import json
+import re
+import sys
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+from utils.ids import new_id
+
+CUSTOMER_FIELDS = ('name', 'phone', 'email', 'address', 'notes')
+# תאריך ישראלי: 31/12/2019, 31.12.2019, 31/12/2019 14:30
+_LOCAL_DATE = re.compile(r'(\d{1,2})[/.](\d{1,2})[/.](\d{4})(?:\s+(\d{1,2}):(\d{2}))?')
+
+
+def normalize_phone(phone) -> str:
+    """Digits only, with an Israeli +972 prefix turned into a leading 0."""
+    digits = re.sub(r'\D', '', str(phone or ''))
+    if digits.startswith('972'):
+        digits = '0' + digits[3:]
+    return digits
+
+
+def customer_id_for_phone(phone, customer_exists: Callable[[str], bool]) -> str:
+    """
+    Customer ID derived from a phone - the normalized digits, so '+972 54-1234567' and '054-1234567'
+    are the same customer. A customer saved before normalization (ID = phone without dashes) keeps its ID.
+    Empty when there is no phone.
+    """
+    customer_id = normalize_phone(phone)
+    legacy = str(phone or '').replace('-', '')
+    if customer_id and legacy != customer_id and not customer_exists(customer_id) and customer_exists(legacy):
+        return legacy
+    return customer_id
+
+
+def _blank(value) -> bool:
+    # תא ריק ב-pandas מגיע כ-NaN / NaT, ששונים מעצמם
+    return value is None or value == '' or value != value
+
+
+def _timestamp(value) -> Optional[str]:
+    """ISO timestamp from a date, datetime, pandas Timestamp or ISO / dd/mm/yyyy string."""
+    if _blank(value):
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day).isoformat()
+    if hasattr(value, 'to_pydatetime'):
+        return value.to_pydatetime().isoformat()
+    text = str(value).strip()
+    try:
+        return datetime.fromisoformat(text).isoformat()
+    except ValueError:
+        pass
+    match = _LOCAL_DATE.fullmatch(text)
+    if match:
+        day, month, year, hour, minute = (int(part) if part else 0 for part in match.groups())
+        return datetime(year, month, day, hour, minute).isoformat()
+    raise ValueError(f"unrecognized date {value!r}")
+
+
+def _number(value, field: str) -> float:
+    if _blank(value):
+        return 0
+    if isinstance(value, str):
+        value = value.replace('₪', '').replace(',', '').strip()
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} is not a number: {value!r}")
+    if number < 0:
+        raise ValueError(f"{field} must be a non-negative number: {value!r}")
+    return number
+
+
+def _items(value) -> List[dict]:
+    if _blank(value):
+        return []
+    if isinstance(value, str):
+        value = json.loads(value)
+    if not isinstance(value, list) or not all(isinstance(item, dict) for item in value):
+        raise ValueError("items must be a list of objects")
+    return value
+
+
+def _text(value) -> str:
+    if _blank(value):
+        return ''
+    return str(value).strip()
+
+
+class ImportPlan:
+    """Validated, de-duplicated records with final IDs, ready for a backend to write in one go."""
+
+    def __init__(self):
+        self.customers: Dict[str, dict] = {}
+        self.quotes: List[dict] = []
+        self.errors: List[dict] = []
+
+    def updated_at(self, customer_id: str, existing: Optional[dict], now: str) -> str:
+        """
+        updated_at of an imported customer: the time of its last imported quote (never earlier than
+        an existing customer's), or now when the import carries no quotes for it.
+        """
+        last = self.customers[customer_id].get('updated_at')
+        if last is None:
+            return now
+        return max((existing or {}).get('updated_at', last), last)
+
+    def report(self, customers_added: int) -> dict:
+        return {
+            'customers_added': customers_added,
+            'customers_updated': len(self.customers) - customers_added,
+            'quotes_added': len(self.quotes),
+            'errors': self.errors,
+        }
+
+
+def prepare_import(quotes: Iterable[dict], customers: Iterable[dict], phone_ids: Dict[str, str],
+                   customer_exists: Callable[[str], bool]) -> ImportPlan:
+    """
+    Validate and de-duplicate import records.
+
+    quotes use the save_quote layout ({'customer_data': {...}, 'items', 'total_amount', ...}) or flat
+    rows (name, phone, ... next to total_amount); an optional created_at (or customer_data date) keeps
+    the original time. phone_ids maps normalized phones of existing customers to their IDs.
+    Invalid records are skipped and listed in plan.errors.
+    """
+    plan = ImportPlan()
+    phone_ids = dict(phone_ids)
+    name_ids: Dict[str, str] = {}
+    now = datetime.now().isoformat()
+
+    def resolve_customer(data: dict) -> str:
+        name, phone = _text(data.get('name')), _text(data.get('phone'))
+        if not name and not phone:
+            raise ValueError("customer needs a name or a phone")
+        digits = normalize_phone(phone)
+        if digits:
+            customer_id = phone_ids.get(digits)
+            if customer_id is None:
+                customer_id = phone_ids[digits] = customer_id_for_phone(phone, customer_exists)
+        else:
+            # בלי טלפון - מאחדים רק לפי שם זהה בתוך אותו ייבוא
+            key = name.lower()
+            customer_id = name_ids.get(key)
+            if customer_id is None:
+                customer_id = name_ids[key] = new_id('customer')
+        merged = plan.customers.setdefault(customer_id, {})
+        for field in CUSTOMER_FIELDS:
+            value = _text(data.get(field))
+            if value:
+                merged[field] = value
+        return customer_id
+
+    for index, data in enumerate(customers):
+        try:
+            resolve_customer(data)
+        except (ValueError, TypeError, AttributeError) as e:
+            plan.errors.append({'source': 'customers', 'index': index, 'error': str(e)})
+
+    for index, quote in enumerate(quotes):
+        try:
+            customer_data = quote.get('customer_data') or quote
+            items = _items(quote.get('items'))
+            total = quote.get('total_amount')
+            if _blank(total):
+                total = sum(_number(item.get('total'), 'item total') for item in items)
+            created_at = _timestamp(quote.get('created_at'))
+            quote_date = _timestamp(customer_data.get('date'))
+            record = {
+                'customer_name': _text(customer_data.get('name')),
+                'date': quote_date or created_at or now,
+                'items': items,
+                'total_amount': _number(total, 'total_amount'),
+                'discount': _number(customer_data.get('discount'), 'discount'),
+                'created_at': created_at or quote_date or now,
+                'pdf_path': _text(quote.get('pdf_path')),
+                'notes': _text(quote.get('notes')),
+            }
+            record['customer_id'] = resolve_customer(customer_data)
+        except (ValueError, TypeError, AttributeError) as e:
+            plan.errors.append({'source': 'quotes', 'index': index, 'error': str(e)})
+            continue
+        customer = plan.customers[record['customer_id']]
+        # לקוח חדש נוצר בתאריך ההצעה הראשונה שלו
+        customer['created_at'] = min(customer.get('created_at', record['created_at']), record['created_at'])
+        customer['updated_at'] = max(customer.get('updated_at', record['created_at']), record['created_at'])
+        plan.quotes.append(record)
+
+    # הכנסה לפי סדר הזמן - ההיסטוריה נשארת ממוינת בלי מיון נוסף
+    plan.quotes.sort(key=lambda q: q['created_at'])
+    # מזהה לפי זמן ההצעה המקורי, כך שהמזהים ממוינים יחד עם ההיסטוריה; מוקצים אחרי המיון,
+    # כך שהצעות מאותו זמן מקבלות מזהים עוקבים
+    for record in plan.quotes:
+        record['id'] = new_id('quote', at=record['created_at'])
+    return plan
+
+
+def load_rows(path: str) -> List[dict]:
+    """Rows of an .xlsx / .xls / .csv file as dicts (phones kept as text, so leading zeros survive)."""
+    import pandas as pd
+    converters = {'phone': str}
+    if path.lower().endswith('.csv'):
+        df = pd.read_csv(path, converters=converters)
+    else:
+        df = pd.read_excel(path, converters=converters)
+    return df.to_dict('records')
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Panel Kitchens - ייבוא הצעות היסטוריות")
+    parser.add_argument('files', nargs='+', help=".xlsx / .csv files, one quote per row")
+    parser.add_argument('--data-dir', default='panel_data')
+    parser.add_argument('--backend', choices=['json', 'sqlite'], default='json')
+    args = parser.parse_args(argv)
+
+    from customer_manager import open_customer_manager
+    rows = [row for path in args.files for row in load_rows(path)]
+    manager = open_customer_manager(args.data_dir, args.backend)
+    try:
+        report = manager.bulk_import(quotes=rows)
+    finally:
+        manager.close()
+    print(f"✅ {report['quotes_added']} quotes, {report['customers_added']} new customers, "
+          f"{report['customers_updated']} updated")
+    for error in report['errors']:
+        print(f"❌ row {error['index'] + 2}: {error['error']}")
+    return 1 if report['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
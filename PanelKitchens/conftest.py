@@ -0,0 +1,3 @@
+# file: panel_app/conftest.py
+# test_app.py הוא סקריפט בדיקה אינטראקטיבי (מחכה ל-Enter) - לא חלק מהרצת pytest
+collect_ignore = ["test_app.py"]
@@ -1,41 +1,646 @@
 import os
+import re
 import json
-from datetime import datetime
-from typing import List, Dict, Optional
+import copy
+import atexit
+import base64
+import bisect
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Iterable, Tuple
+
+from backup_manager import BackupStore
+from bulk_import import customer_id_for_phone, normalize_phone, prepare_import
+from utils.file_lock import FileLock
+from utils.ids import new_id
+
+# גודל היומן שמעליו נכתבת תמונת מצב חדשה ברקע
+JOURNAL_COMPACT_BYTES = 4 * 1024 * 1024
+# שינויים שמגיעים בפרץ (שמירה אוטומטית, ייצוא באצווה) נאספים לכתיבה אחת בתוך החלון הזה
+FLUSH_DELAY_SECONDS = 1.0
+# גרסת מבנה הסטטיסטיקות השמורות - להעלות כשמוסיפים מצטבר חדש (גורם לבנייה מחדש)
+STATS_VERSION = 3
+ROLLUP_PERIODS = ('day', 'month', 'category')
+UNCATEGORIZED = 'ללא קטגוריה'
+TOP_CUSTOMERS = 5
+DEFAULT_PAGE_SIZE = 50
+# פריטי הצעות שנפתחו לאחרונה נשמרים בזיכרון
+ITEMS_CACHE_SIZE = 256
+LOCK_FILE = ".lock"
+
+
+def _phone_digits(phone: str) -> str:
+    return re.sub(r'\D', '', phone or '')
+
+
+def _name_tokens(name: str) -> List[str]:
+    return re.findall(r'\w+', (name or '').lower())
+
+
+def search_terms(query: str) -> Tuple[str, List[str]]:
+    """
+    Split a customer search into phone digits and name words. The digits are empty unless
+    the query looks like a phone number (digits, spaces and - + ( ) only).
+    """
+    digits = _phone_digits(query)
+    if re.search(r'[^\d\s\-+()]', query):
+        digits = ''
+    return digits, _name_tokens(query)
+
+
+def customer_matches(customer: Dict, digits: str, tokens: List[str]) -> bool:
+    """
+    The search rule of both storage backends: the phone starts with the query digits, or every
+    query word is the start of a word in the name ('כה' finds 'משה כהן', 'הן' does not).
+    """
+    if digits and _phone_digits(customer['phone']).startswith(digits):
+        return True
+    if not tokens:
+        return False
+    name_tokens = _name_tokens(customer['name'])
+    return all(any(nt.startswith(t) for nt in name_tokens) for t in tokens)
+
+
+def _index_add(index: List[Tuple[str, str]], key: str, customer_id: str) -> None:
+    bisect.insort(index, (key, customer_id))
+
+
+def _index_remove(index: List[Tuple[str, str]], key: str, customer_id: str) -> None:
+    pos = bisect.bisect_left(index, (key, customer_id))
+    if pos < len(index) and index[pos] == (key, customer_id):
+        del index[pos]
+
+
+def _ordered_insert(times: List[str], records: List[dict], record: Dict) -> None:
+    """Keep records ordered by created_at; appending (the normal case) is O(1)."""
+    created_at = record['created_at']
+    if not times or times[-1] <= created_at:
+        times.append(created_at)
+        records.append(record)
+    else:
+        pos = bisect.bisect_right(times, created_at)
+        times.insert(pos, created_at)
+        records.insert(pos, record)
+
+
+def _iso(value) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return value.isoformat()
+
+
+def _item_value(item: Dict, key: str, hebrew_key: str):
+    """Field of a saved item ('total') or of a catalog row ('סהכ')."""
+    value = item.get(key)
+    return item.get(hebrew_key) if value is None else value
+
+
+def _number(value) -> float:
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(str(value).replace(',', ''))
+    except ValueError:
+        return 0
+
+
+def category_totals(items: Iterable[dict]) -> Dict[str, float]:
+    """Item revenue per category of one quote - saved items (English keys) and catalog rows (Hebrew keys) alike."""
+    totals: Dict[str, float] = {}
+    for item in items:
+        category = str(_item_value(item, 'category', 'קטגוריה') or '').strip() or UNCATEGORIZED
+        total = _item_value(item, 'total', 'סהכ')
+        if total is None:
+            total = (_number(_item_value(item, 'price', 'מחיר יחידה') or 0)
+                     * _number(_item_value(item, 'quantity', 'כמות') or 0))
+        totals[category] = totals.get(category, 0) + _number(total)
+    return totals
+
+
+def rollup_range(start, end, width: int) -> Tuple[Optional[str], Optional[str]]:
+    """
+    First and last bucket keys (width 10 = day, 7 = month) overlapping start <= t < end.
+    None leaves that side open.
+    """
+    lo = _iso(start)[:width] if start is not None else None
+    hi = None
+    if end is not None:
+        # הבאקט של הרגע שלפני end - כך ש-end בתחילת חודש לא מכניס את החודש הזה
+        last = datetime.fromisoformat(_iso(end)) - timedelta(microseconds=1)
+        hi = last.isoformat()[:width]
+    return lo, hi
+
+
+def rollup_row(key: str, count: int, revenue) -> dict:
+    return {'key': key, 'count': count, 'revenue': revenue, 'average': revenue / count if count else 0}
+
+
+def encode_cursor(*parts) -> str:
+    """Opaque pagination cursor - the position after the last row of a page."""
+    return base64.urlsafe_b64encode(json.dumps(parts, ensure_ascii=False).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def _prefix_range(index: List[Tuple[str, str]], prefix: str) -> Tuple[int, int]:
+    """Slice of the index whose keys start with prefix - O(log n)."""
+    return (bisect.bisect_left(index, (prefix,)),
+            bisect.bisect_left(index, (prefix + '\U0010ffff',)))
+
+
+def _prefix_ids(index: List[Tuple[str, str]], prefix: str) -> Iterable[str]:
+    lo, hi = _prefix_range(index, prefix)
+    return (cid for _, cid in index[lo:hi])
 
 
 class CustomerManager:
-    def __init__(self, data_dir: str = "panel_data"):
+    def __init__(self, data_dir: str = "panel_data", compact_threshold: int = JOURNAL_COMPACT_BYTES,
+                 flush_delay: float = FLUSH_DELAY_SECONDS):
         self.data_dir = data_dir
         os.makedirs(self.data_dir, exist_ok=True)
         self.customers_file = os.path.join(self.data_dir, "customers.json")
         self.quotes_file = os.path.join(self.data_dir, "quotes_history.json")
         self.drafts_file = os.path.join(self.data_dir, "drafts.json")
+        # שינויי לקוחות והצעות נרשמים ביומן (שורה לכל שינוי) מעל תמונת המצב שבקבצי ה-JSON
+        self.journal_file = os.path.join(self.data_dir, "journal.jsonl")
+        # שורות הפריטים של כל הצעה נשמרות בנפרד (שורה להצעה) ונטענות רק כשפותחים את ההצעה
+        self.items_file = os.path.join(self.data_dir, "quote_items.jsonl")
+        # מצטברי הסטטיסטיקה נשמרים יחד עם תמונת המצב של ההצעות
+        self.stats_file = os.path.join(self.data_dir, "stats.json")
+        self.compact_threshold = compact_threshold
+
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._compact_thread: Optional[threading.Thread] = None
+        # כמה עמדות יכולות לעבוד על אותה תיקייה משותפת: קריאה בנעילה משותפת, כתיבה בבלעדית
+        self._file_lock = FileLock(os.path.join(self.data_dir, LOCK_FILE))
 
+        # כתיבה מאוחרת: flush_delay=0 כותב מיד בכל שינוי
+        self.flush_delay = flush_delay
+        self._flush_timer: Optional[threading.Timer] = None
+        self._pending_journal: List[dict] = []
+        # טיוטות שהשתנו וטרם נשמרו: מזהה -> טיוטה (None = נמחקה); ממוזגות עם הקובץ בשמירה
+        self._draft_changes: Dict[str, Optional[dict]] = {}
+        # פריטים שטרם נכתבו לקובץ: id(record) -> (record, items)
+        self._pending_items: Dict[int, Tuple[dict, list]] = {}
+        self._items_cache: "OrderedDict[int, list]" = OrderedDict()
+
+        with self._file_lock.exclusive():
+            if os.path.exists(self.items_file):
+                self._repair_tail(self.items_file)
+            self._load(initial=True)
+        atexit.register(self.flush)
+
+    def _load(self, initial: bool = False) -> None:
+        """(Re)build the in-memory state from the snapshot files and the journal; call with the file lock held."""
         self.customers: Dict[str, dict] = self._load_json(self.customers_file, {})
         self.quotes_history: List[dict] = self._load_json(self.quotes_file, [])
-        self.drafts: Dict[str, dict] = self._load_json(self.drafts_file, {})
+        self._snapshot_sig = self._snapshot_signature()
+        self._load_drafts()
+        if initial:
+            # מבנה ישן - הפריטים בתוך ההיסטוריה; מועברים לקובץ הפריטים פעם אחת
+            for q in self.quotes_history:
+                self._detach_items(q)
+        self._build_customer_indexes()
+        self._build_quote_indexes()
+        self._snapshot_quotes = len(self.quotes_history)
+        self._stats: Optional[dict] = self._load_stats()
+        stats_offset = self._stats.pop('journal_size') if self._stats is not None else 0
+        self._journal_size = 0
+        self._replay_journal(initial, stats_offset)
+        if not initial:
+            if self._stats is None:
+                self._rebuild_stats()
+            # שינויים מקומיים שטרם נכתבו מוחלים מחדש מעל מה שנטען
+            for entry in self._pending_journal:
+                self._apply(entry)
+            return
+        # פריטים שהופרדו מרשומות במבנה הישן - תמונת מצב חדשה כדי שלא יופרדו שוב בטעינה הבאה
+        migrated = bool(self._pending_items)
+        if self._stats is None:
+            self.rebuild_statistics()
+            self._save_stats()
+        if migrated:
+            self.compact()
+
+    def _load_drafts(self) -> None:
+        drafts = self._load_json(self.drafts_file, {})
+        self._drafts_sig = self._file_signature(self.drafts_file)
+        # שינויים מקומיים שטרם נשמרו גוברים על מה שבקובץ
+        for draft_id, draft in self._draft_changes.items():
+            if draft is None:
+                drafts.pop(draft_id, None)
+            else:
+                drafts[draft_id] = draft
+        # טיוטות מוחזקות לפי סדר העדכון (האחרונה בסוף)
+        self.drafts: Dict[str, dict] = dict(sorted(drafts.items(), key=lambda kv: kv[1]['updated_at']))
 
     def _load_json(self, filepath: str, default):
         if os.path.exists(filepath):
             try:
                 with open(filepath, 'r', encoding='utf-8') as f:
                     return json.load(f)
-            except json.JSONDecodeError:
+            except json.JSONDecodeError as e:
+                # לא דורסים קובץ פגום בשמירה הבאה - שומרים אותו בצד לשחזור ידני
+                corrupt_path = f"{filepath}.corrupt-{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                os.replace(filepath, corrupt_path)
+                print(f"Warning: {filepath} is corrupt ({e}); moved to {corrupt_path}")
                 return default
         return default
 
     def _save_json(self, filepath: str, data) -> None:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        """Write to a temp file and rename over the target, so a crash never leaves a half-written file."""
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+
+    # Other processes
+    # עמדה אחרת שכתבה לתיקייה: זנב היומן שלה מוחל כאן, ורק אחרי קומפקציה (תמונת מצב חדשה) נטען הכול מחדש
+    @staticmethod
+    def _file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _snapshot_signature(self) -> tuple:
+        return self._file_signature(self.quotes_file), self._file_signature(self.customers_file)
+
+    def _sync(self) -> None:
+        """Pick up what other processes wrote to the data folder; a few stat calls when nothing changed."""
+        # בזמן קומפקציה או גיבוי של התהליך הזה אף תהליך אחר לא כותב
+        if self._compact_lock.locked():
+            return
+        journal_size = os.path.getsize(self.journal_file) if os.path.exists(self.journal_file) else 0
+        if (journal_size == self._journal_size and self._snapshot_signature() == self._snapshot_sig
+                and self._file_signature(self.drafts_file) == self._drafts_sig):
+            return
+        with self._file_lock.shared():
+            self._sync_locked()
+
+    def _sync_locked(self) -> None:
+        if self._snapshot_signature() != self._snapshot_sig:
+            self._load()
+        elif os.path.exists(self.journal_file) and os.path.getsize(self.journal_file) > self._journal_size:
+            with open(self.journal_file, 'rb') as f:
+                f.seek(self._journal_size)
+                data = f.read()
+            end = data.rfind(b'\n') + 1
+            self._apply_lines(data[:end])
+            self._journal_size += end
+        if self._file_signature(self.drafts_file) != self._drafts_sig:
+            self._load_drafts()
+
+    # Write-behind
+    def _schedule_flush(self) -> None:
+        """Called with self._lock held after a change was queued."""
+        if self.flush_delay <= 0:
+            self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_delay, self._timed_flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _timed_flush(self) -> None:
+        with self._lock:
+            self._flush_timer = None
+            # תהליך אחר (או קומפקציה ברקע) מחזיק את הנעילה - מנסים שוב בחלון הבא במקום לחכות
+            if not self._file_lock.acquire(blocking=False):
+                self._schedule_flush()
+                return
+            try:
+                self._write_pending()
+            finally:
+                self._file_lock.release()
+
+    def flush(self) -> None:
+        """Write all queued changes now (call on shutdown; also runs at interpreter exit)."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if self._pending_journal or self._pending_items or self._draft_changes:
+                with self._file_lock.exclusive():
+                    self._write_pending()
+
+    def _write_pending(self) -> None:
+        """Called with self._lock and the exclusive file lock held."""
+        # קודם מחילים את מה שעמדות אחרות כתבו, כך שהיומן והטיוטות נכתבים מעל המצב העדכני
+        self._sync_locked()
+        entries, self._pending_journal = self._pending_journal, []
+        # הפריטים נכתבים לפני היומן, כך שרשומה ביומן תמיד מצביעה על פריטים קיימים
+        if self._pending_items:
+            self._write_items()
+        if entries:
+            self._write_journal(entries)
+        if self._draft_changes:
+            self._save_json(self.drafts_file, self.drafts)
+            self._drafts_sig = self._file_signature(self.drafts_file)
+            self._draft_changes = {}
+
+    def close(self) -> None:
+        self.flush()
+        # המצטברים נשמרים גם בסגירה, כך שהפעלה הבאה לא סורקת מחדש את כל ההיסטוריה עד הקומפקציה הבאה
+        with self._lock, self._file_lock.exclusive():
+            self._sync_locked()
+            self._save_stats()
+        atexit.unregister(self.flush)
+        self._file_lock.close()
+
+    # Journal
+    def _replay_journal(self, initial: bool = False, stats_offset: int = 0) -> None:
+        """
+        Apply journal entries written after the last snapshot (and an interrupted compaction).
+        The loaded aggregates already cover the first stats_offset bytes of the journal.
+        """
+        interrupted = os.path.exists(self._compacting_file)
+        for path in (self._compacting_file, self.journal_file):
+            if not os.path.exists(path):
+                continue
+            if initial:
+                self._repair_tail(path)
+            with open(path, 'rb') as f:
+                data = f.read()
+            end = data.rfind(b'\n') + 1
+            if path == self.journal_file and stats_offset:
+                stats, self._stats = self._stats, None
+                self._apply_lines(data[:stats_offset])
+                self._stats = stats
+                self._apply_lines(data[stats_offset:end])
+            else:
+                self._apply_lines(data[:end])
+            if path == self.journal_file:
+                self._journal_size = end
+
+        if interrupted and initial:
+            # ייתכן שרק חלק מקבצי תמונת המצב נכתבו - המונים נגזרים מחדש מההיסטוריה
+            self._rebuild_customer_counters()
+            self.rebuild_statistics()
+            self.compact()
+
+    def _apply_lines(self, data: bytes) -> None:
+        for line in data.splitlines():
+            entry = json.loads(line)
+            if entry['op'] == 'quote':
+                # הצעה שכבר נטענה (מתמונת המצב או מהיומן המועבר) לא מוחלת שוב
+                existing = self._quotes_by_id.get(entry['data']['id'])
+                if existing is not None and existing['created_at'] == entry['data']['created_at']:
+                    continue
+            self._apply(entry)
+
+    @staticmethod
+    def _repair_tail(path: str) -> None:
+        """Drop a partial last line left by a crash in the middle of an append."""
+        with open(path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+
+    @property
+    def _compacting_file(self) -> str:
+        return self.journal_file + ".compacting"
+
+    def _append_journal(self, *entries: Dict) -> None:
+        """Queue journal entries; they are written together on the next flush."""
+        with self._lock:
+            self._pending_journal.extend(entries)
+            self._schedule_flush()
+
+    def _write_journal(self, entries: List[dict]) -> None:
+        data = ''.join(json.dumps(e, ensure_ascii=False, default=str) + '\n' for e in entries).encode('utf-8')
+        with open(self.journal_file, 'ab') as f:
+            f.write(data)
+        self._journal_size += len(data)
+        if self._journal_size > self.compact_threshold:
+            self._start_compaction()
+
+    def _apply(self, entry: Dict) -> None:
+        if entry['op'] == 'customer':
+            self._apply_customer(entry['data'])
+        elif entry['op'] == 'quote':
+            self._apply_quote(entry['data'])
+
+    def _apply_customer(self, record: Dict) -> None:
+        existing = self.customers.get(record['id'])
+        if existing:
+            # המונים מתעדכנים רק דרך ההצעות עצמן, כך שהחלה חוזרת של היומן לא סופרת פעמיים
+            record = dict(record, created_at=existing['created_at'],
+                          quotes_count=existing['quotes_count'], total_amount=existing['total_amount'])
+            self._unindex_customer(existing)
+        else:
+            # עותק - רשומת היומן נשארת עם מונים אפס גם אחרי שההצעה מעדכנת את הלקוח
+            record = dict(record)
+        self.customers[record['id']] = record
+        self._index_customer(record)
+
+    def _apply_quote(self, record: Dict, index: bool = True) -> None:
+        """index=False leaves the ordered lists to _merge_quotes (bulk import)."""
+        items = self._detach_items(record)
+        if index:
+            _ordered_insert(self._quote_times, self.quotes_history, record)
+            times, records = self._customer_quotes.setdefault(record['customer_id'], ([], []))
+            _ordered_insert(times, records, record)
+        self._quotes_by_id[record['id']] = record
+        cust = self.customers.get(record['customer_id'])
+        if cust is not None:
+            cust['quotes_count'] += 1
+            cust['total_amount'] += record['total_amount']
+            # הצעה היסטורית (ייבוא, החלה חוזרת של היומן) לא מחזירה את תאריך העדכון אחורה
+            cust['updated_at'] = max(cust['updated_at'], record['created_at'])
+        if self._stats is not None:
+            self._add_to_stats(record, items if items is not None else self.get_quote_items(record))
+
+    def _rebuild_customer_counters(self) -> None:
+        for cust in self.customers.values():
+            cust['quotes_count'] = 0
+            cust['total_amount'] = 0
+        for q in self.quotes_history:
+            cust = self.customers.get(q['customer_id'])
+            if cust is not None:
+                cust['quotes_count'] += 1
+                cust['total_amount'] += q['total_amount']
+
+    def _start_compaction(self) -> None:
+        if self._compact_thread is not None and self._compact_thread.is_alive():
+            return
+        self._compact_thread = threading.Thread(target=self._compact_in_background, daemon=True)
+        self._compact_thread.start()
+
+    def _compact_in_background(self) -> None:
+        try:
+            self.compact()
+        except Exception as e:
+            print(f"Error compacting customer data: {e}")
+
+    def compact(self) -> None:
+        """Write fresh customers / quotes snapshots and drop the journal entries they cover."""
+        with self._compact_lock:
+            with self._lock:
+                # הנעילה הבלעדית נשמרת עד סוף כתיבת תמונת המצב, כך שתהליכים אחרים לא רואים מצב חלקי;
+                # שמירות של התהליך הזה ממשיכות להיאסף בזיכרון בינתיים
+                self._file_lock.acquire()
+                try:
+                    self.flush()
+                    # flush כותב רק כשיש שינויים מקומיים - תמונת המצב חייבת לכלול גם את מה שעמדות אחרות כתבו
+                    self._sync_locked()
+                    # היומן הנוכחי מועבר הצידה; שמירות חדשות נכתבות ליומן ריק
+                    if os.path.exists(self.journal_file) and not os.path.exists(self._compacting_file):
+                        os.replace(self.journal_file, self._compacting_file)
+                        self._journal_size = 0
+                    # רשומות הצעה לא משתנות אחרי השמירה - מספיק עותק רדוד של הרשימה
+                    quotes = list(self.quotes_history)
+                    customers = {cid: dict(c) for cid, c in self.customers.items()}
+                    stats = copy.deepcopy(self._stats)
+                except BaseException:
+                    self._file_lock.release()
+                    raise
+            try:
+                self._save_json(self.quotes_file, quotes)
+                self._save_json(self.customers_file, customers)
+                self._save_json(self.stats_file, dict(stats, snapshot_quotes=len(quotes), journal_size=0))
+                if os.path.exists(self._compacting_file):
+                    os.remove(self._compacting_file)
+                self._snapshot_sig = self._snapshot_signature()
+                self._snapshot_quotes = len(quotes)
+            finally:
+                self._file_lock.release()
+
+    # Line items
+    def _detach_items(self, record: Dict) -> Optional[list]:
+        """Move embedded line items out of a quote record; they are appended to the items file on flush."""
+        if 'items' not in record:
+            return None
+        items = record.pop('items') or []
+        record['items_count'] = len(items)
+        record['items_ref'] = None
+        self._pending_items[id(record)] = (record, items)
+        return items
+
+    def _write_items(self) -> None:
+        pending, self._pending_items = self._pending_items, {}
+        with open(self.items_file, 'ab') as f:
+            offset = f.seek(0, os.SEEK_END)
+            for record, items in pending.values():
+                line = json.dumps({'quote_id': record['id'], 'items': items}, ensure_ascii=False, default=str)
+                data = (line + '\n').encode('utf-8')
+                f.write(data)
+                record['items_ref'] = [offset, len(data)]
+                offset += len(data)
+
+    def _read_items(self, ref: List[int]) -> list:
+        offset, length = ref
+        with open(self.items_file, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.read(length))['items']
+
+    def _iter_items_file(self) -> Iterable[Tuple[int, list]]:
+        """(offset, items) for every line of the items file, read sequentially."""
+        if not os.path.exists(self.items_file):
+            return
+        with open(self.items_file, 'rb') as f:
+            offset = 0
+            for line in f:
+                yield offset, json.loads(line)['items']
+                offset += len(line)
+
+    def get_quote_items(self, quote: Dict) -> List[dict]:
+        """Line items of a quote header (as returned by get_quote_history), loaded on demand."""
+        with self._lock:
+            pending = self._pending_items.get(id(quote))
+            if pending is not None:
+                return [dict(item) for item in pending[1]]
+            ref = quote.get('items_ref')
+            if not ref:
+                return [dict(item) for item in quote.get('items', [])]
+            items = self._items_cache.get(ref[0])
+            if items is None:
+                items = self._read_items(ref)
+                self._items_cache[ref[0]] = items
+                if len(self._items_cache) > ITEMS_CACHE_SIZE:
+                    self._items_cache.popitem(last=False)
+            else:
+                self._items_cache.move_to_end(ref[0])
+            return [dict(item) for item in items]
+
+    def get_quote(self, quote_id: str) -> Optional[dict]:
+        """Full quote including its line items (to open or re-generate it)."""
+        with self._lock:
+            self._sync()
+            header = self._quotes_by_id.get(quote_id)
+            if header is None:
+                return None
+            quote = {k: v for k, v in header.items() if k != 'items_ref'}
+            quote['items'] = self.get_quote_items(header)
+            return quote
+
+    # Customer indexes
+    # רשימות ממוינות של (מפתח, מזהה לקוח): חיפוש קידומת ב-bisect במקום סריקה של כל הלקוחות
+    def _build_customer_indexes(self) -> None:
+        self._phone_index = sorted((_phone_digits(c['phone']), cid) for cid, c in self.customers.items())
+        self._token_index = sorted((token, cid) for cid, c in self.customers.items()
+                                   for token in set(_name_tokens(c['name'])))
+        self._name_view = sorted((c['name'], cid) for cid, c in self.customers.items())
+
+    def _index_customer(self, customer: Dict) -> None:
+        cid = customer['id']
+        _index_add(self._phone_index, _phone_digits(customer['phone']), cid)
+        for token in set(_name_tokens(customer['name'])):
+            _index_add(self._token_index, token, cid)
+        _index_add(self._name_view, customer['name'], cid)
+
+    def _unindex_customer(self, customer: Dict) -> None:
+        cid = customer['id']
+        _index_remove(self._phone_index, _phone_digits(customer['phone']), cid)
+        for token in set(_name_tokens(customer['name'])):
+            _index_remove(self._token_index, token, cid)
+        _index_remove(self._name_view, customer['name'], cid)
+
+    # Quote indexes
+    # ההיסטוריה נשמרת ממוינת לפי created_at, ולכל לקוח רשימה משלו - בלי סינון ומיון בכל קריאה
+    def _build_quote_indexes(self) -> None:
+        times = [q['created_at'] for q in self.quotes_history]
+        if any(times[i] > times[i + 1] for i in range(len(times) - 1)):
+            self.quotes_history.sort(key=lambda q: q['created_at'])
+            times.sort()
+        self._quote_times: List[str] = times
+        self._quotes_by_id: Dict[str, dict] = {q['id']: q for q in self.quotes_history}
+        self._customer_quotes: Dict[str, Tuple[List[str], List[dict]]] = {}
+        for q in self.quotes_history:
+            cust_times, records = self._customer_quotes.setdefault(q['customer_id'], ([], []))
+            cust_times.append(q['created_at'])
+            records.append(q)
+
+    def _merge_quotes(self, records: List[dict]) -> None:
+        """Add many quotes to the ordered lists at once - one merge instead of an insert per quote."""
+        def merge(times: List[str], quotes: List[dict], new: List[dict]) -> None:
+            quotes.extend(new)
+            # שני רצפים ממוינים - המיון של פייתון ממזג אותם בזמן לינארי
+            quotes.sort(key=lambda q: q['created_at'])
+            times[:] = [q['created_at'] for q in quotes]
+
+        merge(self._quote_times, self.quotes_history, records)
+        by_customer: Dict[str, List[dict]] = {}
+        for q in records:
+            by_customer.setdefault(q['customer_id'], []).append(q)
+        for customer_id, new in by_customer.items():
+            merge(*self._customer_quotes.setdefault(customer_id, ([], [])), new)
 
     # Customers
-    def add_customer(self, data: Dict) -> str:
-        customer_id = data.get('phone', '').replace('-', '') or f"customer_{len(self.customers)}"
-        now = datetime.now().isoformat()
+    def _customer_record(self, data: Dict, now: str, customer_id: Optional[str] = None) -> Dict:
+        customer_id = (customer_id or customer_id_for_phone(data.get('phone'), self.customers.__contains__)
+                       or new_id('customer'))
         existing = self.customers.get(customer_id, {})
-
-        self.customers[customer_id] = {
+        return {
             'id': customer_id,
             'name': data.get('name', existing.get('name', '')),
             'phone': data.get('phone', existing.get('phone', '')),
@@ -47,25 +652,65 @@ class CustomerManager:
             'total_amount': existing.get('total_amount', 0),
             'notes': data.get('notes', existing.get('notes', '')),
         }
-        self._save_json(self.customers_file, self.customers)
-        return customer_id
+
+    def add_customer(self, data: Dict) -> str:
+        with self._lock:
+            self._sync()
+            record = self._customer_record(data, datetime.now().isoformat())
+            self._apply_customer(record)
+            self._append_journal({'op': 'customer', 'data': record})
+        return record['id']
 
     def get_customer(self, customer_id: str) -> Optional[dict]:
-        return self.customers.get(customer_id)
+        with self._lock:
+            self._sync()
+            return self.customers.get(customer_id)
 
-    def search_customers(self, query: str) -> List[dict]:
-        query = query.lower()
-        return [c for c in self.customers.values() if query in c['name'].lower() or query in c['phone']]
+    def search_customers(self, query: str, limit: Optional[int] = None) -> List[dict]:
+        """
+        Typeahead lookup by customer_matches (phone prefix or name word prefixes), ordered by name.
+        An empty query returns all customers.
+        """
+        query = query.strip()
+        if not query:
+            return self.get_all_customers()[:limit]
+        digits, tokens = search_terms(query)
+        with self._lock:
+            self._sync()
+            ids = set()
+            if digits:
+                ids.update(_prefix_ids(self._phone_index, digits))
+            if tokens:
+                # מתחילים מהמילה הסלקטיבית ביותר ומסננים לפי השאר, כך שמילה נפוצה לא עולה ב-O(n)
+                (lo, hi), _ = min(((_prefix_range(self._token_index, t), t) for t in tokens),
+                                  key=lambda r: r[0][1] - r[0][0])
+                ids.update(cid for _, cid in self._token_index[lo:hi]
+                           if cid not in ids and customer_matches(self.customers[cid], '', tokens))
+            results = sorted((self.customers[cid] for cid in ids), key=lambda c: (c['name'], c['id']))
+        return results[:limit]
 
     def get_all_customers(self) -> List[dict]:
-        return sorted(self.customers.values(), key=lambda x: x['name'])
+        with self._lock:
+            self._sync()
+            return [self.customers[cid] for _, cid in self._name_view]
 
     # Quotes
     def save_quote(self, quote: Dict) -> str:
-        quote_id = f"quote_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        customer_id = self.add_customer(quote['customer_data'])
+        """Append the quote to the journal - O(1) bytes written whatever the history size."""
+        quote_id = new_id('quote')
         now = datetime.now().isoformat()
-        record = {
+        with self._lock:
+            self._sync()
+            customer = self._customer_record(quote['customer_data'], now)
+            self._apply_customer(customer)
+            record = self._quote_record(quote_id, customer['id'], quote, now)
+            self._apply_quote(record)
+            self._append_journal({'op': 'customer', 'data': customer}, {'op': 'quote', 'data': record})
+        return quote_id
+
+    @staticmethod
+    def _quote_record(quote_id: str, customer_id: str, quote: Dict, now: str) -> Dict:
+        return {
             'id': quote_id,
             'customer_id': customer_id,
             'customer_name': quote['customer_data']['name'],
@@ -77,111 +722,324 @@ class CustomerManager:
             'pdf_path': quote.get('pdf_path', ''),
             'notes': quote.get('notes', ''),
         }
-        self.quotes_history.append(record)
-        # update customer stats
-        cust = self.customers[customer_id]
-        cust['quotes_count'] += 1
-        cust['total_amount'] += record['total_amount']
-        cust['updated_at'] = now
-
-        self._save_json(self.quotes_file, self.quotes_history)
-        self._save_json(self.customers_file, self.customers)
-        return quote_id
 
     def get_quote_history(self, customer_id: Optional[str] = None) -> List[dict]:
-        quotes = self.quotes_history
-        if customer_id:
-            quotes = [q for q in quotes if q['customer_id'] == customer_id]
-        return sorted(quotes, key=lambda x: x['created_at'], reverse=True)
+        """
+        Quote headers newest first - O(k) for one customer's history.
+        Headers carry items_count; the line items come from get_quote_items / get_quote.
+        """
+        with self._lock:
+            self._sync()
+            if customer_id:
+                quotes = self._customer_quotes.get(customer_id, ([], []))[1]
+            else:
+                quotes = self.quotes_history
+            return quotes[::-1]
+
+    def get_quotes_in_range(self, start=None, end=None, customer_id: Optional[str] = None) -> List[dict]:
+        """
+        Quotes with start <= created_at < end, oldest first.
+        start / end may be date, datetime or ISO strings; None leaves that side open.
+        """
+        with self._lock:
+            self._sync()
+            if customer_id:
+                times, quotes = self._customer_quotes.get(customer_id, ([], []))
+            else:
+                times, quotes = self._quote_times, self.quotes_history
+            lo = bisect.bisect_left(times, _iso(start)) if start is not None else 0
+            hi = bisect.bisect_left(times, _iso(end)) if end is not None else len(times)
+            return quotes[lo:hi]
+
+    # Bulk import
+    def bulk_import(self, quotes: Iterable[dict] = (), customers: Iterable[dict] = ()) -> dict:
+        """
+        Import customers and historical quotes with a single journal append (see bulk_import.py).
+        Returns {'customers_added', 'customers_updated', 'quotes_added', 'errors'}.
+        """
+        with self._lock:
+            self.flush()
+            with self._file_lock.exclusive():
+                self._sync_locked()
+                plan = prepare_import(
+                    quotes, customers,
+                    {normalize_phone(c['phone']): cid for cid, c in self.customers.items() if c.get('phone')},
+                    self.customers.__contains__)
+                now = datetime.now().isoformat()
+                entries = []
+                added = 0
+                for customer_id, data in plan.customers.items():
+                    existing = self.customers.get(customer_id)
+                    record = self._customer_record(data, now, customer_id)
+                    record['updated_at'] = plan.updated_at(customer_id, existing, now)
+                    if existing is None:
+                        added += 1
+                        record['created_at'] = data.get('created_at', now)
+                    self._apply_customer(record)
+                    entries.append({'op': 'customer', 'data': record})
+                for record in plan.quotes:
+                    self._apply_quote(record, index=False)
+                    entries.append({'op': 'quote', 'data': record})
+                self._merge_quotes(plan.quotes)
+                self._pending_journal.extend(entries)
+                self._write_pending()
+        return plan.report(added)
+
+    # Pagination
+    # דפדוף לפי cursor: כל עמוד נקרא מהאינדקסים הממוינים, כך שהוספות בזמן הדפדוף לא מזיזות עמודים
+
+    def page_customers(self, limit: int = DEFAULT_PAGE_SIZE,
+                       cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """Customers ordered by name; returns (page, next_cursor), next_cursor is None on the last page."""
+        with self._lock:
+            self._sync()
+            start = bisect.bisect_right(self._name_view, tuple(decode_cursor(cursor))) if cursor else 0
+            keys = self._name_view[start:start + limit]
+            page = [self.customers[cid] for _, cid in keys]
+            more = start + limit < len(self._name_view)
+        return page, encode_cursor(*keys[-1]) if more and keys else None
+
+    def page_quotes(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                    customer_id: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """Quotes newest first (optionally for one customer); returns (page, next_cursor)."""
+        with self._lock:
+            self._sync()
+            if customer_id:
+                times, quotes = self._customer_quotes.get(customer_id, ([], []))
+            else:
+                times, quotes = self._quote_times, self.quotes_history
+            end = len(quotes)
+            if cursor:
+                created_at, quote_id = decode_cursor(cursor)
+                # הצעות באותו created_at - מחפשים את האחרונה שהוחזרה לפי המזהה
+                end = bisect.bisect_left(times, created_at)
+                hi = bisect.bisect_right(times, created_at)
+                for pos in range(end, hi):
+                    if quotes[pos]['id'] == quote_id:
+                        end = pos
+                        break
+            start = max(0, end - limit)
+            page = quotes[start:end][::-1]
+        last = page[-1] if page else None
+        return page, encode_cursor(last['created_at'], last['id']) if start > 0 and last else None
+
+    def page_drafts(self, limit: int = DEFAULT_PAGE_SIZE,
+                    cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """Drafts most recently updated first; returns (page, next_cursor)."""
+        with self._lock:
+            self._sync()
+            drafts = list(reversed(self.drafts.values()))
+        start = 0
+        if cursor:
+            updated_at, draft_id = decode_cursor(cursor)
+            # ממשיכים אחרי הטיוטה האחרונה שהוחזרה; אם עודכנה או נמחקה בינתיים - לפי זמן העדכון
+            start = next((i + 1 for i, d in enumerate(drafts)
+                          if d['id'] == draft_id and d['updated_at'] == updated_at), None)
+            if start is None:
+                start = sum(1 for d in drafts if d['updated_at'] >= updated_at)
+        page = drafts[start:start + limit]
+        more = start + limit < len(drafts)
+        return page, encode_cursor(page[-1]['updated_at'], page[-1]['id']) if more and page else None
 
     # Drafts
     def save_draft(self, draft: Dict) -> str:
-        draft_id = draft.get('id', f"draft_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        draft_id = draft.get('id') or new_id('draft')
         now = datetime.now().isoformat()
-        existing = self.drafts.get(draft_id, {})
-        self.drafts[draft_id] = {
-            'id': draft_id,
-            'customer_data': draft.get('customer_data', existing.get('customer_data', {})),
-            'items': draft.get('items', existing.get('items', [])),
-            'created_at': existing.get('created_at', now),
-            'updated_at': now,
-            'title': draft.get('title', existing.get('title', '')),
-        }
-        self._save_json(self.drafts_file, self.drafts)
+        with self._lock:
+            self._sync()
+            # הוצאה והכנסה מחדש שומרות את המילון ממוין לפי updated_at
+            existing = self.drafts.pop(draft_id, {})
+            record = self.drafts[draft_id] = {
+                'id': draft_id,
+                'customer_data': draft.get('customer_data', existing.get('customer_data', {})),
+                'items': draft.get('items', existing.get('items', [])),
+                'created_at': existing.get('created_at', now),
+                'updated_at': now,
+                'title': draft.get('title', existing.get('title', '')),
+            }
+            self._draft_changes[draft_id] = record
+            self._schedule_flush()
         return draft_id
 
     def get_all_drafts(self) -> List[dict]:
-        return sorted(self.drafts.values(), key=lambda x: x['updated_at'], reverse=True)
+        with self._lock:
+            self._sync()
+            return list(reversed(self.drafts.values()))
 
     def delete_draft(self, draft_id: str) -> bool:
-        if draft_id in self.drafts:
-            del self.drafts[draft_id]
-            self._save_json(self.drafts_file, self.drafts)
-            return True
+        with self._lock:
+            self._sync()
+            if draft_id in self.drafts:
+                del self.drafts[draft_id]
+                self._draft_changes[draft_id] = None
+                self._schedule_flush()
+                return True
         return False
 
-    # Statistics & Export
-    def get_statistics(self) -> dict:
-        stats = {
-            'total_customers': len(self.customers),
-            'total_quotes': len(self.quotes_history),
-            'total_revenue': sum(q['total_amount'] for q in self.quotes_history),
+    # Statistics aggregates
+    @staticmethod
+    def _empty_stats() -> dict:
+        return {
+            'version': STATS_VERSION,
+            'total_quotes': 0,
+            'total_revenue': 0,
+            'by_day': {},
+            'by_month': {},
+            # חודש -> קטגוריה -> {count, revenue}; שאילתת קטגוריות לפי טווח היא ברזולוציה של חודש
+            'by_category': {},
+            'popular_products': {},
+            'top_customers': [],
         }
-        if stats['total_quotes']:
-            stats['average_quote'] = stats['total_revenue'] / stats['total_quotes']
-        else:
-            stats['average_quote'] = 0
 
-        # this month stats
-        current_month = datetime.now().strftime('%Y-%m')
-        stats['this_month_quotes'] = sum(1 for q in self.quotes_history if q['created_at'][:7] == current_month)
-        stats['this_month_revenue'] = sum(q['total_amount'] for q in self.quotes_history if q['created_at'][:7] == current_month)
+    def _load_stats(self) -> Optional[dict]:
+        """
+        Persisted aggregates, or None when they do not match the loaded snapshot and journal.
+        The result carries journal_size - how much of the journal they already include.
+        """
+        stats = self._load_json(self.stats_file, None)
+        if not isinstance(stats, dict) or stats.get('version') != STATS_VERSION:
+            return None
+        journal_size = os.path.getsize(self.journal_file) if os.path.exists(self.journal_file) else 0
+        # היומן רק גדל בין קומפקציות, כך שהמצטברים מתאימים לכל יומן שהחלק הראשון שלו הוא מה שהם כוללים
+        if (stats.pop('snapshot_quotes', None) != self._snapshot_quotes
+                or stats.get('journal_size', -1) > journal_size or os.path.exists(self._compacting_file)):
+            return None
+        return stats
+
+    def _save_stats(self) -> None:
+        """Persist the aggregates with the snapshot and journal position they cover; call with the file lock held."""
+        self._save_json(self.stats_file, dict(self._stats, snapshot_quotes=self._snapshot_quotes,
+                                              journal_size=self._journal_size))
 
-        # popular products and top customers
-        popular = {}
-        customer_totals = {}
+    def _add_to_stats(self, q: Dict, items: Iterable[dict]) -> None:
+        stats = self._stats
+        stats['total_quotes'] += 1
+        stats['total_revenue'] += q['total_amount']
+
+        for rollup, key in (('by_day', q['created_at'][:10]), ('by_month', q['created_at'][:7])):
+            bucket = stats[rollup].setdefault(key, {'count': 0, 'revenue': 0})
+            bucket['count'] += 1
+            bucket['revenue'] += q['total_amount']
+
+        self._add_items_to_stats(items, q['created_at'][:7])
+
+        # סכומי הלקוחות רק עולים, אז מספיק לבדוק את הלקוח הנוכחי מול חמשת המובילים
+        cid = q['customer_id']
+        if cid in self.customers:
+            top = stats['top_customers']
+            if cid not in top:
+                top.append(cid)
+            top.sort(key=lambda c: self.customers[c]['total_amount'], reverse=True)
+            del top[TOP_CUSTOMERS:]
+
+    def _add_items_to_stats(self, items: Iterable[dict], month: str) -> None:
+        items = list(items)
+        popular = self._stats['popular_products']
+        for item in items:
+            name = item.get('name', '')
+            if name:
+                popular.setdefault(name, {'count': 0, 'quantity': 0})
+                popular[name]['count'] += 1
+                popular[name]['quantity'] += item.get('quantity', 0)
+
+        # count = הצעות שכוללות את הקטגוריה, revenue = סכום הפריטים שלה
+        categories = self._stats['by_category'].setdefault(month, {})
+        for category, revenue in category_totals(items).items():
+            bucket = categories.setdefault(category, {'count': 0, 'revenue': 0})
+            bucket['count'] += 1
+            bucket['revenue'] += revenue
+
+    def rebuild_statistics(self) -> None:
+        """Recompute all aggregates from the full history (after migration or manual data fixes)."""
+        with self._lock:
+            self.flush()
+            with self._file_lock.shared():
+                self._sync_locked()
+                self._rebuild_stats()
+
+    def _rebuild_stats(self) -> None:
+        self._stats = self._empty_stats()
         for q in self.quotes_history:
-            cid = q['customer_id']
-            customer_totals[cid] = customer_totals.get(cid, 0) + q['total_amount']
-            for item in q.get('items', []):
-                name = item.get('name', '')
-                if name:
-                    popular.setdefault(name, {'count': 0, 'quantity': 0})
-                    popular[name]['count'] += 1
-                    popular[name]['quantity'] += item.get('quantity', 0)
-        stats['popular_products'] = popular
-        stats['top_customers'] = sorted(
-            [{'name': self.customers[cid]['name'], 'total_amount': amt} for cid, amt in customer_totals.items()],
-            key=lambda x: x['total_amount'], reverse=True)[:5]
+            self._add_to_stats(q, ())
+        # הפריטים נקראים ברצף מהקובץ ולא בקפיצות לפי הצעה
+        refs = {q['items_ref'][0]: q['created_at'][:7] for q in self.quotes_history if q.get('items_ref')}
+        for offset, items in self._iter_items_file():
+            if offset in refs:
+                self._add_items_to_stats(items, refs[offset])
+
+    # Statistics & Export
+    def get_statistics(self) -> dict:
+        with self._lock:
+            self._sync()
+            s = self._stats
+            current_month = s['by_month'].get(datetime.now().strftime('%Y-%m'), {'count': 0, 'revenue': 0})
+            return {
+                'total_customers': len(self.customers),
+                'total_quotes': s['total_quotes'],
+                'total_revenue': s['total_revenue'],
+                'average_quote': s['total_revenue'] / s['total_quotes'] if s['total_quotes'] else 0,
+                'this_month_quotes': current_month['count'],
+                'this_month_revenue': current_month['revenue'],
+                'popular_products': {name: dict(v) for name, v in s['popular_products'].items()},
+                'top_customers': [{'name': self.customers[cid]['name'],
+                                   'total_amount': self.customers[cid]['total_amount']}
+                                  for cid in s['top_customers']],
+            }
+
+    def get_revenue_rollup(self, period: str = 'month', start=None, end=None) -> List[dict]:
+        """
+        Chart data from the materialized rollups: [{'key', 'count', 'revenue', 'average'}].
+        period 'day' / 'month' gives buckets oldest first; 'category' gives categories by revenue,
+        summed over the months in range. Buckets overlapping start <= t < end are included.
+        """
+        if period not in ROLLUP_PERIODS:
+            raise ValueError(f"period must be one of {ROLLUP_PERIODS}")
+        with self._lock:
+            self._sync()
+            if period == 'category':
+                lo, hi = rollup_range(start, end, 7)
+                totals: Dict[str, list] = {}
+                for month, categories in self._stats['by_category'].items():
+                    if (lo is None or month >= lo) and (hi is None or month <= hi):
+                        for category, bucket in categories.items():
+                            total = totals.setdefault(category, [0, 0])
+                            total[0] += bucket['count']
+                            total[1] += bucket['revenue']
+                rows = [rollup_row(category, count, revenue) for category, (count, revenue) in totals.items()]
+                return sorted(rows, key=lambda r: (-r['revenue'], r['key']))
+            buckets = self._stats['by_day' if period == 'day' else 'by_month']
+            lo, hi = rollup_range(start, end, 10 if period == 'day' else 7)
+            keys = sorted(k for k in buckets if (lo is None or k >= lo) and (hi is None or k <= hi))
+            return [rollup_row(k, buckets[k]['count'], buckets[k]['revenue']) for k in keys]
+
+    def export_to_excel(self, filepath: str, flatten_items: bool = False) -> None:
+        """Stream customers, quotes and statistics to an .xlsx file (constant memory)."""
+        from excel_export import export_to_excel
+        self.flush()
+        export_to_excel(self, filepath, flatten_items)
+
+    def create_backup(self) -> str:
+        """Incremental, deduplicated backup into backups/ (see backup_manager); returns the snapshot id."""
+        files = {os.path.basename(f): f for f in [self.customers_file, self.quotes_file, self.drafts_file,
+                                                   self.journal_file, self.stats_file, self.items_file]}
+        store = BackupStore(os.path.join(self.data_dir, "backups"))
+        # נעילה משותפת לאורך הגיבוי: אף תהליך לא כותב באמצע, כך שהקבצים עקביים זה עם זה.
+        # שמירות של התהליך הזה נאספות בזיכרון ונכתבות אחרי הגיבוי
+        with self._compact_lock:
+            with self._lock:
+                self.flush()
+                self._file_lock.acquire(exclusive=False)
+            try:
+                snapshot_id = store.backup(files)
+            finally:
+                self._file_lock.release()
+        store.prune()
+        return snapshot_id
 
-        return stats
 
-    def export_to_excel(self, filepath: str) -> None:
-        import pandas as pd
-        writer = pd.ExcelWriter(filepath, engine='openpyxl')
-        pd.DataFrame.from_dict(self.customers, orient='index').to_excel(writer, sheet_name='לקוחות', index=False)
-        pd.DataFrame(self.quotes_history).to_excel(writer, sheet_name='הצעות מחיר', index=False)
-        stats = self.get_statistics()
-        stats_df = pd.DataFrame({
-            'מדד': ['סה"כ לקוחות', 'סה"כ הצעות', 'סה"כ הכנסות', 'ממוצע הצעה', 'הצעות החודש', 'הכנסות החודש'],
-            'ערך': [
-                stats['total_customers'], stats['total_quotes'], f"₪{stats['total_revenue']:,.2f}",
-                f"₪{stats['average_quote']:,.2f}", stats['this_month_quotes'], f"₪{stats['this_month_revenue']:,.2f}"
-            ]
-        })
-        stats_df.to_excel(writer, sheet_name='סטטיסטיקות', index=False)
-        writer.save()
-
-    def create_backup(self) -> None:
-        import shutil
-        backup_dir = os.path.join(self.data_dir, "backups")
-        os.makedirs(backup_dir, exist_ok=True)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        for fname in [self.customers_file, self.quotes_file, self.drafts_file]:
-            if os.path.exists(fname):
-                dst = os.path.join(backup_dir, f"{timestamp}_{os.path.basename(fname)}")
-                shutil.copy2(fname, dst)
-        # keep last 30 backups
-        backups = sorted(os.listdir(backup_dir))
-        for old in backups[:-30]:
-            os.remove(os.path.join(backup_dir, old))
+def open_customer_manager(data_dir: str = "panel_data", backend: str = "json"):
+    """Return a customer manager for the given storage backend ('json' or 'sqlite')."""
+    if backend == "sqlite":
+        from customer_manager_sqlite import SqliteCustomerManager
+        return SqliteCustomerManager(data_dir)
+    return CustomerManager(data_dir)
@@ -0,0 +1,589 @@
+# file: panel_app/customer_manager_sqlite.py
+"""
+מאגר לקוחות והצעות מחיר ב-SQLite - אותו ממשק ציבורי כמו CustomerManager
+
+כל שמירה היא טרנזקציה קטנה (INSERT/UPDATE) במקום כתיבה מחדש של קבצי JSON שלמים.
+בפתיחה הראשונה הנתונים הקיימים מתיקיית ה-JSON (תמונת המצב, היומן והטיוטות)
+מועברים אוטומטית (פעם אחת).
+"""
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backup_manager import BackupStore
+from bulk_import import customer_id_for_phone, normalize_phone, prepare_import
+from customer_manager import (DEFAULT_PAGE_SIZE, ROLLUP_PERIODS, TOP_CUSTOMERS, CustomerManager, category_totals,
+                              customer_matches, decode_cursor, encode_cursor, rollup_range, rollup_row,
+                              search_terms)
+from utils.ids import new_id
+
+SCHEMA_VERSION = 1
+# להעלות כשמשנים את חישוב טבלאות המצטברים - גורם לבנייה מחדש בפתיחה
+ROLLUPS_VERSION = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS customers (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL DEFAULT '',
+    phone TEXT NOT NULL DEFAULT '',
+    email TEXT NOT NULL DEFAULT '',
+    address TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    quotes_count INTEGER NOT NULL DEFAULT 0,
+    total_amount REAL NOT NULL DEFAULT 0,
+    notes TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_customers_phone ON customers(phone);
+CREATE INDEX IF NOT EXISTS idx_customers_name ON customers(name);
+CREATE INDEX IF NOT EXISTS idx_customers_total ON customers(total_amount);
+CREATE TABLE IF NOT EXISTS quotes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    customer_id TEXT NOT NULL,
+    customer_name TEXT NOT NULL DEFAULT '',
+    date TEXT,
+    items TEXT NOT NULL DEFAULT '[]',
+    total_amount REAL NOT NULL DEFAULT 0,
+    discount REAL NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    pdf_path TEXT NOT NULL DEFAULT '',
+    notes TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_quotes_customer ON quotes(customer_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_quotes_created ON quotes(created_at);
+CREATE INDEX IF NOT EXISTS idx_quotes_id ON quotes(id);
+CREATE TABLE IF NOT EXISTS drafts (
+    id TEXT PRIMARY KEY,
+    customer_data TEXT NOT NULL DEFAULT '{}',
+    items TEXT NOT NULL DEFAULT '[]',
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_drafts_updated ON drafts(updated_at);
+CREATE TABLE IF NOT EXISTS rollups (
+    period TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    revenue REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (period, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS category_rollups (
+    month TEXT NOT NULL,
+    category TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    revenue REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (month, category)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS product_rollups (
+    name TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0,
+    quantity REAL NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+"""
+
+CUSTOMER_FIELDS = ['id', 'name', 'phone', 'email', 'address', 'created_at', 'updated_at',
+                   'quotes_count', 'total_amount', 'notes']
+QUOTE_FIELDS = ['id', 'customer_id', 'customer_name', 'date', 'items', 'total_amount', 'discount',
+                'created_at', 'pdf_path', 'notes']
+DRAFT_FIELDS = ['id', 'customer_data', 'items', 'created_at', 'updated_at', 'title']
+# כותרות הצעה בלי שורות הפריטים (כמו ב-CustomerManager); הפריטים נטענים ב-get_quote / get_quote_items
+QUOTE_HEADER = ("seq, id, customer_id, customer_name, date, total_amount, discount, created_at, pdf_path, notes, "
+                "json_array_length(items) AS items_count")
+
+
+def _json_value(value) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+class SqliteCustomerManager:
+    def __init__(self, data_dir: str = "panel_data", db_file: str = "panel.db", migrate: bool = True):
+        self.data_dir = data_dir
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.db_file = os.path.join(self.data_dir, db_file)
+
+        # חיבור אחד משותף - ה-UI והעבודות ברקע רצים ב-threads שונים
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            self.conn.execute("INSERT OR IGNORE INTO meta(key, value) VALUES ('schema_version', ?)",
+                              (str(SCHEMA_VERSION),))
+
+        # מסד מגרסה קודמת (או מלא ישירות) - בונים את המצטברים פעם אחת, מכאן הם מתעדכנים בכל שמירה
+        if self._get_meta('rollups_version') != str(ROLLUPS_VERSION):
+            self.rebuild_statistics()
+        if migrate and self._get_meta('migrated_from_json') is None:
+            self.migrate_from_json()
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    def compact(self) -> None:
+        """Fold the WAL back into the database file and refresh the query planner statistics."""
+        with self._lock:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.conn.execute("PRAGMA optimize")
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row['value'] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)", (key, value))
+
+    # Migration
+    def migrate_from_json(self, json_dir: Optional[str] = None) -> Dict[str, int]:
+        """
+        One-time import of a JSON data folder (see CustomerManager).
+        Returns the number of imported rows per table.
+        """
+        json_dir = json_dir or self.data_dir
+        # הנתונים נמצאים גם ביומן (ובקובץ .compacting אחרי קריסה) ולא רק בתמונת המצב -
+        # טוענים דרך CustomerManager, שמחיל אותם
+        source = CustomerManager(json_dir)
+        try:
+            customers = source.get_all_customers()
+            # כותרות ההצעות מצביעות לקובץ הפריטים - הפריטים עצמם נשמרים בטבלה
+            quotes = [dict(q, items=source.get_quote_items(q)) for q in reversed(source.get_quote_history())]
+            drafts = source.get_all_drafts()
+        finally:
+            source.close()
+
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO customers({', '.join(CUSTOMER_FIELDS)}) "
+                f"VALUES ({', '.join('?' * len(CUSTOMER_FIELDS))})",
+                (self._customer_row(c) for c in customers))
+            self.conn.executemany(
+                f"INSERT INTO quotes({', '.join(QUOTE_FIELDS)}) VALUES ({', '.join('?' * len(QUOTE_FIELDS))})",
+                (self._quote_row(q) for q in quotes))
+            self._add_rollups((q['created_at'], q.get('total_amount', 0), q.get('items', [])) for q in quotes)
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO drafts({', '.join(DRAFT_FIELDS)}) "
+                f"VALUES ({', '.join('?' * len(DRAFT_FIELDS))})",
+                (self._draft_row(d) for d in drafts))
+            self._set_meta('migrated_from_json', datetime.now().isoformat())
+
+        return {'customers': len(customers), 'quotes': len(quotes), 'drafts': len(drafts)}
+
+    # Row conversion
+    @staticmethod
+    def _customer_row(c: Dict) -> tuple:
+        now = datetime.now().isoformat()
+        return (c['id'], c.get('name', ''), c.get('phone', ''), c.get('email', ''), c.get('address', ''),
+                c.get('created_at', now), c.get('updated_at', now), c.get('quotes_count', 0),
+                c.get('total_amount', 0), c.get('notes', ''))
+
+    @staticmethod
+    def _quote_row(q: Dict) -> tuple:
+        date_value = q.get('date')
+        if date_value is not None and not isinstance(date_value, str):
+            date_value = date_value.isoformat()
+        return (q['id'], q['customer_id'], q.get('customer_name', ''), date_value,
+                _json_value(q.get('items', [])), q.get('total_amount', 0), q.get('discount', 0),
+                q['created_at'], q.get('pdf_path', ''), q.get('notes', ''))
+
+    @staticmethod
+    def _draft_row(d: Dict) -> tuple:
+        return (d['id'], _json_value(d.get('customer_data', {})), _json_value(d.get('items', [])),
+                d['created_at'], d['updated_at'], d.get('title', ''))
+
+    @staticmethod
+    def _quote(row) -> dict:
+        quote = {k: row[k] for k in row.keys() if k != 'seq'}
+        if 'items' in quote:
+            quote['items'] = json.loads(quote['items'])
+        return quote
+
+    @staticmethod
+    def _draft(row) -> dict:
+        draft = {k: row[k] for k in DRAFT_FIELDS}
+        draft['customer_data'] = json.loads(draft['customer_data'])
+        draft['items'] = json.loads(draft['items'])
+        return draft
+
+    # Customers
+    def _customer_exists(self, customer_id: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM customers WHERE id = ?", (customer_id,)).fetchone() is not None
+
+    def _upsert_customer(self, data: Dict, now: str) -> str:
+        customer_id = customer_id_for_phone(data.get('phone'), self._customer_exists) or new_id('customer')
+        row = self.conn.execute("SELECT * FROM customers WHERE id = ?", (customer_id,)).fetchone()
+        existing = dict(row) if row else {}
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO customers({', '.join(CUSTOMER_FIELDS)}) "
+            f"VALUES ({', '.join('?' * len(CUSTOMER_FIELDS))})",
+            (customer_id,
+             data.get('name', existing.get('name', '')),
+             data.get('phone', existing.get('phone', '')),
+             data.get('email', existing.get('email', '')),
+             data.get('address', existing.get('address', '')),
+             existing.get('created_at', now),
+             now,
+             existing.get('quotes_count', 0),
+             existing.get('total_amount', 0),
+             data.get('notes', existing.get('notes', ''))))
+        return customer_id
+
+    def add_customer(self, data: Dict) -> str:
+        with self._lock, self.conn:
+            return self._upsert_customer(data, datetime.now().isoformat())
+
+    def get_customer(self, customer_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM customers WHERE id = ?", (customer_id,)).fetchone()
+        return dict(row) if row else None
+
+    def search_customers(self, query: str, limit: Optional[int] = None) -> List[dict]:
+        """Same matching and order as CustomerManager.search_customers."""
+        query = query.strip()
+        if not query:
+            return self.get_all_customers()[:limit]
+        digits, tokens = search_terms(query)
+        # LIKE מחזיר קבוצה רחבה יותר (הספרות בסדר, כל מופע של המילה) - הכלל עצמו נבדק ב-customer_matches
+        clauses, params = [], []
+        if digits:
+            clauses.append("phone LIKE ?")
+            params.append('%' + '%'.join(digits) + '%')
+        if tokens:
+            clauses.append(' AND '.join(["lower(name) LIKE ?"] * len(tokens)))
+            params.extend(f"%{token}%" for token in tokens)
+        if not clauses:
+            return []
+        results = []
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT * FROM customers WHERE ({') OR ('.join(clauses)}) ORDER BY name, id", params)
+            for row in rows:
+                customer = dict(row)
+                if customer_matches(customer, digits, tokens):
+                    results.append(customer)
+                    if limit is not None and len(results) >= limit:
+                        break
+        return results
+
+    def get_all_customers(self) -> List[dict]:
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM customers ORDER BY name").fetchall()
+        return [dict(r) for r in rows]
+
+    # Quotes
+    def save_quote(self, quote: Dict) -> str:
+        quote_id = new_id('quote')
+        now = datetime.now().isoformat()
+        with self._lock, self.conn:
+            customer_id = self._upsert_customer(quote['customer_data'], now)
+            record = {
+                'id': quote_id,
+                'customer_id': customer_id,
+                'customer_name': quote['customer_data']['name'],
+                'date': quote['customer_data'].get('date', now),
+                'items': quote.get('items', []),
+                'total_amount': quote.get('total_amount', 0),
+                'discount': quote['customer_data'].get('discount', 0),
+                'created_at': now,
+                'pdf_path': quote.get('pdf_path', ''),
+                'notes': quote.get('notes', ''),
+            }
+            self.conn.execute(
+                f"INSERT INTO quotes({', '.join(QUOTE_FIELDS)}) VALUES ({', '.join('?' * len(QUOTE_FIELDS))})",
+                self._quote_row(record))
+            # update customer stats
+            self.conn.execute(
+                "UPDATE customers SET quotes_count = quotes_count + 1, total_amount = total_amount + ?, "
+                "updated_at = ? WHERE id = ?", (record['total_amount'], now, customer_id))
+            self._add_rollups([(now, record['total_amount'], record['items'])])
+        return quote_id
+
+    def bulk_import(self, quotes: Iterable[dict] = (), customers: Iterable[dict] = ()) -> dict:
+        """
+        Import customers and historical quotes in a single transaction (see bulk_import.py).
+        Returns {'customers_added', 'customers_updated', 'quotes_added', 'errors'}.
+        """
+        now = datetime.now().isoformat()
+        with self._lock, self.conn:
+            existing = {row['id']: dict(row) for row in self.conn.execute("SELECT * FROM customers")}
+            plan = prepare_import(
+                quotes, customers,
+                {normalize_phone(c['phone']): cid for cid, c in existing.items() if c['phone']},
+                existing.__contains__)
+
+            totals: Dict[str, list] = {}
+            for q in plan.quotes:
+                # מונים לכל לקוח: מספר הצעות וסכום
+                agg = totals.setdefault(q['customer_id'], [0, 0])
+                agg[0] += 1
+                agg[1] += q['total_amount']
+            rows = []
+            for customer_id, data in plan.customers.items():
+                old = existing.get(customer_id, {})
+                count, amount = totals.get(customer_id, (0, 0))
+                rows.append((customer_id,
+                             data.get('name', old.get('name', '')),
+                             data.get('phone', old.get('phone', '')),
+                             data.get('email', old.get('email', '')),
+                             data.get('address', old.get('address', '')),
+                             old.get('created_at', data.get('created_at', now)),
+                             plan.updated_at(customer_id, existing.get(customer_id), now),
+                             old.get('quotes_count', 0) + count,
+                             old.get('total_amount', 0) + amount,
+                             data.get('notes', old.get('notes', ''))))
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO customers({', '.join(CUSTOMER_FIELDS)}) "
+                f"VALUES ({', '.join('?' * len(CUSTOMER_FIELDS))})", rows)
+            self.conn.executemany(
+                f"INSERT INTO quotes({', '.join(QUOTE_FIELDS)}) VALUES ({', '.join('?' * len(QUOTE_FIELDS))})",
+                (self._quote_row(q) for q in plan.quotes))
+            self._add_rollups((q['created_at'], q['total_amount'], q['items']) for q in plan.quotes)
+        return plan.report(sum(1 for customer_id in plan.customers if customer_id not in existing))
+
+    def get_quote_history(self, customer_id: Optional[str] = None) -> List[dict]:
+        with self._lock:
+            if customer_id:
+                rows = self.conn.execute(
+                    f"SELECT {QUOTE_HEADER} FROM quotes WHERE customer_id = ? ORDER BY created_at DESC", (customer_id,)).fetchall()
+            else:
+                rows = self.conn.execute(f"SELECT {QUOTE_HEADER} FROM quotes ORDER BY created_at DESC").fetchall()
+        return [self._quote(r) for r in rows]
+
+    def get_quote_items(self, quote: Dict) -> List[dict]:
+        with self._lock:
+            row = self.conn.execute("SELECT items FROM quotes WHERE id = ? AND created_at = ?",
+                                    (quote['id'], quote['created_at'])).fetchone()
+        return json.loads(row['items']) if row else []
+
+    def get_quote(self, quote_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self.conn.execute(f"SELECT {', '.join(QUOTE_FIELDS)} FROM quotes WHERE id = ? "
+                                    "ORDER BY seq DESC LIMIT 1", (quote_id,)).fetchone()
+        return self._quote(row) if row else None
+
+    def get_quotes_in_range(self, start=None, end=None, customer_id: Optional[str] = None) -> List[dict]:
+        """Quotes with start <= created_at < end, oldest first."""
+        clauses, params = [], []
+        for clause, value in (("created_at >= ?", start), ("created_at < ?", end)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value if isinstance(value, str) else value.isoformat())
+        if customer_id:
+            clauses.append("customer_id = ?")
+            params.append(customer_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self.conn.execute(f"SELECT {QUOTE_HEADER} FROM quotes {where} ORDER BY created_at, seq", params).fetchall()
+        return [self._quote(r) for r in rows]
+
+    # Pagination
+    def page_customers(self, limit: int = DEFAULT_PAGE_SIZE,
+                       cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        with self._lock:
+            if cursor:
+                rows = self.conn.execute(
+                    "SELECT * FROM customers WHERE (name, id) > (?, ?) ORDER BY name, id LIMIT ?",
+                    (*decode_cursor(cursor), limit + 1)).fetchall()
+            else:
+                rows = self.conn.execute("SELECT * FROM customers ORDER BY name, id LIMIT ?", (limit + 1,)).fetchall()
+        page = [dict(r) for r in rows[:limit]]
+        return page, encode_cursor(page[-1]['name'], page[-1]['id']) if len(rows) > limit else None
+
+    def page_quotes(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                    customer_id: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        clauses, params = [], []
+        if customer_id:
+            clauses.append("customer_id = ?")
+            params.append(customer_id)
+        if cursor:
+            clauses.append("(created_at, seq) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self.conn.execute(f"SELECT {QUOTE_HEADER} FROM quotes {where} ORDER BY created_at DESC, seq DESC LIMIT ?",
+                                     (*params, limit + 1)).fetchall()
+        page = rows[:limit]
+        next_cursor = encode_cursor(page[-1]['created_at'], page[-1]['seq']) if len(rows) > limit else None
+        return [self._quote(r) for r in page], next_cursor
+
+    def page_drafts(self, limit: int = DEFAULT_PAGE_SIZE,
+                    cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        with self._lock:
+            if cursor:
+                rows = self.conn.execute(
+                    "SELECT * FROM drafts WHERE (updated_at, id) < (?, ?) ORDER BY updated_at DESC, id DESC LIMIT ?",
+                    (*decode_cursor(cursor), limit + 1)).fetchall()
+            else:
+                rows = self.conn.execute("SELECT * FROM drafts ORDER BY updated_at DESC, id DESC LIMIT ?",
+                                         (limit + 1,)).fetchall()
+        page = [self._draft(r) for r in rows[:limit]]
+        return page, encode_cursor(page[-1]['updated_at'], page[-1]['id']) if len(rows) > limit else None
+
+    # Drafts
+    def save_draft(self, draft: Dict) -> str:
+        draft_id = draft.get('id') or new_id('draft')
+        now = datetime.now().isoformat()
+        with self._lock, self.conn:
+            row = self.conn.execute("SELECT * FROM drafts WHERE id = ?", (draft_id,)).fetchone()
+            existing = self._draft(row) if row else {}
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO drafts({', '.join(DRAFT_FIELDS)}) "
+                f"VALUES ({', '.join('?' * len(DRAFT_FIELDS))})",
+                self._draft_row({
+                    'id': draft_id,
+                    'customer_data': draft.get('customer_data', existing.get('customer_data', {})),
+                    'items': draft.get('items', existing.get('items', [])),
+                    'created_at': existing.get('created_at', now),
+                    'updated_at': now,
+                    'title': draft.get('title', existing.get('title', '')),
+                }))
+        return draft_id
+
+    def get_all_drafts(self) -> List[dict]:
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM drafts ORDER BY updated_at DESC").fetchall()
+        return [self._draft(r) for r in rows]
+
+    def delete_draft(self, draft_id: str) -> bool:
+        with self._lock, self.conn:
+            return self.conn.execute("DELETE FROM drafts WHERE id = ?", (draft_id,)).rowcount > 0
+
+    # Rollups
+    # מצטברים לפי יום / חודש / קטגוריה, מתעדכנים באותה טרנזקציה של השמירה - גרפים על שנים בלי סריקת הצעות
+
+    def _add_rollups(self, quotes: Iterable[Tuple[str, float, list]]) -> None:
+        """Add (created_at, total_amount, items) of new quotes to the rollup tables (inside a transaction)."""
+        buckets: Dict[Tuple[str, str], list] = {}
+        categories: Dict[Tuple[str, str], list] = {}
+        products: Dict[str, list] = {}
+        for created_at, total_amount, items in quotes:
+            for item in items:
+                name = item.get('name', '')
+                if name:
+                    product = products.setdefault(name, [0, 0])
+                    product[0] += 1
+                    product[1] += item.get('quantity', 0)
+            for period, key in (('day', created_at[:10]), ('month', created_at[:7])):
+                bucket = buckets.setdefault((period, key), [0, 0])
+                bucket[0] += 1
+                bucket[1] += total_amount
+            for category, revenue in category_totals(items).items():
+                bucket = categories.setdefault((created_at[:7], category), [0, 0])
+                bucket[0] += 1
+                bucket[1] += revenue
+        self.conn.executemany(
+            "INSERT INTO rollups(period, bucket, count, revenue) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(period, bucket) DO UPDATE SET count = count + excluded.count, "
+            "revenue = revenue + excluded.revenue",
+            ((period, key, count, revenue) for (period, key), (count, revenue) in buckets.items()))
+        self.conn.executemany(
+            "INSERT INTO category_rollups(month, category, count, revenue) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(month, category) DO UPDATE SET count = count + excluded.count, "
+            "revenue = revenue + excluded.revenue",
+            ((month, category, count, revenue) for (month, category), (count, revenue) in categories.items()))
+        self.conn.executemany(
+            "INSERT INTO product_rollups(name, count, quantity) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET count = count + excluded.count, "
+            "quantity = quantity + excluded.quantity",
+            ((name, count, quantity) for name, (count, quantity) in products.items()))
+
+    def rebuild_statistics(self) -> None:
+        """Recompute the rollup tables from all quotes (after an upgrade or manual data fixes)."""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM rollups")
+            self.conn.execute("DELETE FROM category_rollups")
+            self.conn.execute("DELETE FROM product_rollups")
+            rows = self.conn.execute("SELECT created_at, total_amount, items FROM quotes")
+            self._add_rollups((r['created_at'], r['total_amount'], json.loads(r['items'])) for r in rows)
+            self._set_meta('rollups_version', str(ROLLUPS_VERSION))
+
+    def get_revenue_rollup(self, period: str = 'month', start=None, end=None) -> List[dict]:
+        """Chart data from the rollup tables - same contract as CustomerManager.get_revenue_rollup."""
+        if period not in ROLLUP_PERIODS:
+            raise ValueError(f"period must be one of {ROLLUP_PERIODS}")
+        lo, hi = rollup_range(start, end, 10 if period == 'day' else 7)
+        column = 'month' if period == 'category' else 'bucket'
+        clauses, params = [], []
+        if period != 'category':
+            clauses.append("period = ?")
+            params.append(period)
+        for clause, value in ((f"{column} >= ?", lo), (f"{column} <= ?", hi)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            if period == 'category':
+                rows = self.conn.execute(
+                    f"SELECT category AS key, SUM(count) AS count, SUM(revenue) AS revenue FROM category_rollups "
+                    f"{where} GROUP BY category ORDER BY revenue DESC, category", params).fetchall()
+            else:
+                rows = self.conn.execute(
+                    f"SELECT bucket AS key, count, revenue FROM rollups {where} ORDER BY bucket", params).fetchall()
+        return [rollup_row(r['key'], r['count'], r['revenue']) for r in rows]
+
+    # Statistics & Export
+    def get_statistics(self) -> dict:
+        """Dashboard numbers from the rollup tables and the customer counters - no scan of the quotes."""
+        current_month = datetime.now().strftime('%Y-%m')
+        with self._lock:
+            total_customers = self.conn.execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+            # שורה לכל חודש - עשרות שורות גם אחרי שנים של הצעות
+            total_quotes, total_revenue = self.conn.execute(
+                "SELECT COALESCE(SUM(count), 0), COALESCE(SUM(revenue), 0) FROM rollups "
+                "WHERE period = 'month'").fetchone()
+            month = self.conn.execute(
+                "SELECT count, revenue FROM rollups WHERE period = 'month' AND bucket = ?",
+                (current_month,)).fetchone()
+            popular_rows = self.conn.execute("SELECT name, count, quantity FROM product_rollups").fetchall()
+            top_rows = self.conn.execute(
+                "SELECT name, total_amount FROM customers WHERE quotes_count > 0 "
+                "ORDER BY total_amount DESC LIMIT ?", (TOP_CUSTOMERS,)).fetchall()
+
+        return {
+            'total_customers': total_customers,
+            'total_quotes': total_quotes,
+            'total_revenue': total_revenue,
+            'average_quote': total_revenue / total_quotes if total_quotes else 0,
+            'this_month_quotes': month['count'] if month else 0,
+            'this_month_revenue': month['revenue'] if month else 0,
+            'popular_products': {r['name']: {'count': r['count'], 'quantity': r['quantity']} for r in popular_rows},
+            'top_customers': [{'name': r['name'], 'total_amount': r['total_amount']} for r in top_rows],
+        }
+
+    def export_to_excel(self, filepath: str, flatten_items: bool = False) -> None:
+        """Stream customers, quotes and statistics to an .xlsx file (constant memory)."""
+        from excel_export import export_to_excel
+        export_to_excel(self, filepath, flatten_items)
+
+    def create_backup(self) -> str:
+        """Incremental, deduplicated backup of the database into backups/; returns the snapshot id."""
+        store = BackupStore(os.path.join(self.data_dir, "backups"))
+        tmp_dir = tempfile.mkdtemp(prefix='panel_backup_')
+        try:
+            tmp_path = os.path.join(tmp_dir, os.path.basename(self.db_file))
+            # גיבוי עקבי גם כשיש כותבים פעילים (WAL)
+            dst = sqlite3.connect(tmp_path)
+            try:
+                with self._lock:
+                    self.conn.backup(dst)
+            finally:
+                dst.close()
+            snapshot_id = store.backup({os.path.basename(self.db_file): tmp_path})
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        store.prune()
+        return snapshot_id
@@ -0,0 +1,82 @@
+# file: panel_app/excel_export.py
+"""
+ייצוא לקוחות והצעות מחיר ל-Excel בזרימה - שורות נכתבות בקבוצות ישר מהאחסון
+
+openpyxl במצב write-only כותב כל שורה לקובץ זמני במקום להחזיק את כל הגיליון בזיכרון,
+והנתונים נקראים בעמודים דרך page_customers / page_quotes, כך שצריכת הזיכרון קבועה
+בלי תלות בגודל ההיסטוריה. עובד עם CustomerManager ועם SqliteCustomerManager.
+"""
+import json
+from typing import Iterable, Iterator
+
+from openpyxl import Workbook
+
+EXPORT_PAGE_SIZE = 1000
+
+CUSTOMER_COLUMNS = ['id', 'name', 'phone', 'email', 'address', 'created_at', 'updated_at',
+                    'quotes_count', 'total_amount', 'notes']
+QUOTE_COLUMNS = ['id', 'customer_id', 'customer_name', 'date', 'total_amount', 'discount',
+                 'created_at', 'pdf_path', 'notes', 'items_count']
+ITEM_COLUMNS = ['quote_id', 'created_at', 'customer_name', 'name', 'quantity', 'price', 'total']
+
+
+def _cell(value):
+    """openpyxl accepts only scalars - nested values are written as JSON text."""
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+
+def _pages(fetch, **kwargs) -> Iterator[dict]:
+    cursor = None
+    while True:
+        page, cursor = fetch(limit=EXPORT_PAGE_SIZE, cursor=cursor, **kwargs)
+        yield from page
+        if cursor is None:
+            return
+
+
+def _write_rows(ws, columns, rows: Iterable[dict]) -> None:
+    ws.append(columns)
+    for row in rows:
+        ws.append([_cell(row.get(col)) for col in columns])
+
+
+def export_to_excel(manager, filepath: str, flatten_items: bool = False) -> None:
+    """
+    Write customers, quotes and statistics sheets.
+    flatten_items=True adds a "פריטים" sheet with one row per line item;
+    otherwise each quote row carries its items as JSON text (the previous layout).
+    """
+    wb = Workbook(write_only=True)
+
+    _write_rows(wb.create_sheet('לקוחות'), CUSTOMER_COLUMNS, _pages(manager.page_customers))
+
+    if flatten_items:
+        _write_rows(wb.create_sheet('הצעות מחיר'), QUOTE_COLUMNS, _pages(manager.page_quotes))
+
+        def item_rows():
+            for quote in _pages(manager.page_quotes):
+                for item in manager.get_quote_items(quote):
+                    yield dict(item, quote_id=quote['id'], created_at=quote['created_at'],
+                               customer_name=quote['customer_name'])
+
+        _write_rows(wb.create_sheet('פריטים'), ITEM_COLUMNS, item_rows())
+    else:
+        quotes = (dict(quote, items=manager.get_quote_items(quote)) for quote in _pages(manager.page_quotes))
+        _write_rows(wb.create_sheet('הצעות מחיר'), QUOTE_COLUMNS + ['items'], quotes)
+
+    stats = manager.get_statistics()
+    ws = wb.create_sheet('סטטיסטיקות')
+    ws.append(['מדד', 'ערך'])
+    for label, value in [
+        ('סה"כ לקוחות', stats['total_customers']),
+        ('סה"כ הצעות', stats['total_quotes']),
+        ('סה"כ הכנסות', f"₪{stats['total_revenue']:,.2f}"),
+        ('ממוצע הצעה', f"₪{stats['average_quote']:,.2f}"),
+        ('הצעות החודש', stats['this_month_quotes']),
+        ('הכנסות החודש', f"₪{stats['this_month_revenue']:,.2f}"),
+    ]:
+        ws.append([label, value])
+
+    wb.save(filepath)
@@ -0,0 +1,112 @@
+# file: panel_app/image_processing.py
+import hashlib
+import io
+import os
+from typing import List, Tuple
+
+from PIL import Image as PILImage, ImageOps
+
+from utils.helpers import cache_dir, enforce_lru_limits
+
+# גרסת צינור העיבוד - להעלות כשמשנים את אופן העיבוד כדי לפסול את המטמון
+PIPELINE_VERSION = 1
+
+DEFAULT_DPI = 150
+DEFAULT_JPEG_QUALITY = 80
+
+# גבולות מטמון התמונות המעובדות - הישנות ביותר בשימוש נמחקות ראשונות
+IMAGE_CACHE_MAX_BYTES = 100 * 1024 * 1024
+IMAGE_CACHE_MAX_ENTRIES = 500
+
+
+def _read_source(source) -> bytes:
+    """Return raw bytes for a path, bytes object or file-like source."""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if hasattr(source, 'read'):
+        return source.read()
+    with open(source, 'rb') as f:
+        return f.read()
+
+
+def _cache_key(raw: bytes, max_width: float, max_height: float, dpi: int, quality: int) -> str:
+    h = hashlib.sha256(raw)
+    h.update(f"|v{PIPELINE_VERSION}|{max_width:.2f}x{max_height:.2f}|{dpi}|{quality}".encode())
+    return h.hexdigest()
+
+
+def _cache_entries(root: str) -> List[Tuple[float, int, str]]:
+    entries = []
+    for name in os.listdir(root):
+        if name.endswith('.jpg'):
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+    return entries
+
+
+def _process(raw: bytes, max_px_w: int, max_px_h: int, quality: int) -> bytes:
+    img = PILImage.open(io.BytesIO(raw))
+    # תיקון כיוון לפי EXIF (תמונות מטלפון)
+    img = ImageOps.exif_transpose(img)
+
+    # JPEG לא תומך בשקיפות - מניחים על רקע לבן
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        img = img.convert('RGBA')
+        background = PILImage.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel('A'))
+        img = background
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    # הקטנה לגודל ההדפסה בלבד (לא מגדילים תמונות קטנות)
+    if img.width > max_px_w or img.height > max_px_h:
+        img.thumbnail((max_px_w, max_px_h), PILImage.LANCZOS)
+
+    out = io.BytesIO()
+    img.save(out, format='JPEG', quality=quality, optimize=True)
+    return out.getvalue()
+
+
+def prepare_image(source, max_width: float, max_height: float,
+                  dpi: int = DEFAULT_DPI, quality: int = DEFAULT_JPEG_QUALITY,
+                  use_cache: bool = True) -> bytes:
+    """
+    Return JPEG bytes ready for embedding in the PDF.
+    max_width / max_height are the printed size in points (1/72 inch);
+    the image is downsampled to that size at the given dpi.
+    Results are cached on disk by content hash.
+    """
+    raw = _read_source(source)
+    key = _cache_key(raw, max_width, max_height, dpi, quality)
+
+    cached_path = None
+    if use_cache:
+        root = cache_dir('images')
+        cached_path = os.path.join(root, f"{key}.jpg")
+        try:
+            with open(cached_path, 'rb') as f:
+                data = f.read()
+            # עדכון זמן שימוש אחרון (LRU)
+            os.utime(cached_path, None)
+            return data
+        except OSError:
+            pass
+
+    max_px_w = max(1, int(round(max_width / 72 * dpi)))
+    max_px_h = max(1, int(round(max_height / 72 * dpi)))
+    data = _process(raw, max_px_w, max_px_h, quality)
+
+    if cached_path:
+        tmp_path = f"{cached_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, cached_path)
+            enforce_lru_limits(_cache_entries(root), IMAGE_CACHE_MAX_BYTES, IMAGE_CACHE_MAX_ENTRIES)
+        except OSError as e:
+            print(f"Warning: could not cache image: {e}")
+    return data
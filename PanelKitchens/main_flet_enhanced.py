@@ -3,7 +3,8 @@ from datetime import date
 import os
 import sys
 import pandas as pd
-import time
+import shutil
+import threading
 
 # Handle PyInstaller paths
 if getattr(sys, 'frozen', False):
@@ -16,7 +17,13 @@ if base_path not in sys.path:
 
 # Import our existing modules
 from catalog_loader import load_catalog
-from pdf_generator import create_enhanced_pdf
+from pdf_generator import create_enhanced_pdf, PdfGenerationCancelled
+from pdf_cache import PdfCache, quote_cache_key
+from pdf_preview import preview_available, render_thumbnails_async
+from settings_manager import SettingsManager
+from customer_manager import open_customer_manager
+from maintenance import MaintenanceScheduler
+from utils.helpers import safe_filename
 from products_view_flet import create_products_view
 
 
@@ -81,6 +88,26 @@ class PanelKitchensApp:
             'loading': False,
         }
 
+        # יצירת PDF ברקע
+        self._pdf_job = None
+        self._pdf_cancel = None
+        self._preview_cancel = None
+
+        # הגדרות ומטמון PDF - שינוי הגדרות פוסל את המטמון
+        self.settings_manager = SettingsManager()
+        self.pdf_cache = PdfCache()
+        self.settings_manager.add_change_listener(self.pdf_cache.invalidate)
+
+        # תחזוקה ברקע (גיבוי, דחיסה, סטטיסטיקות) - המאגר נפתח ב-thread של התחזוקה, לא בזמן העלייה
+        self.maintenance = MaintenanceScheduler(
+            self.settings_manager,
+            open_customer_manager,
+            is_busy=lambda: self._pdf_job is not None and self._pdf_job.is_alive(),
+        )
+        self.maintenance.start()
+        self.page.on_disconnect = lambda _: self.maintenance.stop()
+        self.page.on_keyboard_event = lambda _: self.maintenance.touch()
+
         # File pickers
         self.catalog_picker = ft.FilePicker(on_result=self.handle_catalog_picked)
         self.demo1_picker = ft.FilePicker(on_result=self.handle_demo1_picked)
@@ -428,6 +455,7 @@ class PanelKitchensApp:
     def _on_generate_click(self, e):
         """Handler נקי שמוודא שהכפתור נקלט ואז מפעיל generate_pdf"""
         print("🔘 🔘 Button clicked — now calling generate_pdf")
+        self.maintenance.touch()
         self.generate_pdf(e)
 
     def create_pdf_section(self):
@@ -465,6 +493,22 @@ class PanelKitchensApp:
             height=60,
         )
 
+        # כפתור ביטול - מוצג רק בזמן יצירת PDF ברקע
+        self.cancel_generate_button = ft.OutlinedButton(
+            content=ft.Row([
+                ft.Icon(ft.Icons.CANCEL, size=20),
+                ft.Text("בטל יצירה", size=16),
+            ]),
+            style=ft.ButtonStyle(
+                side={ft.ControlState.DEFAULT: ft.BorderSide(2, "#f44336")},
+                padding=20,
+                shape=ft.RoundedRectangleBorder(radius=10),
+            ),
+            visible=False,
+            on_click=self.cancel_pdf_generation,
+        )
+        self.generate_button = generate_button
+
         # Reset button
         reset_button = ft.OutlinedButton(
             content=ft.Row([
@@ -494,7 +538,7 @@ class PanelKitchensApp:
                 ft.Row([demo1_container, demo2_container], spacing=20),
                 ft.Container(height=30),
                 ft.Row(
-                    [generate_button, reset_button],
+                    [generate_button, self.cancel_generate_button, reset_button],
                     alignment=ft.MainAxisAlignment.CENTER,
                     spacing=20
                 ),
@@ -592,15 +636,15 @@ class PanelKitchensApp:
 
     def on_tab_change(self, e):
         """אנימציה בין טאבים"""
+        self.maintenance.touch()
         # Can add validation or animation here
         pass
 
-    def show_loading(self, show=True):
-        """הצגת/הסתרת loading"""
+    def show_loading(self, show=True, value=None):
+        """הצגת/הסתרת loading (value=None - מחוון ללא אחוזים)"""
+        self.progress_bar.value = value
         self.progress_bar.visible = show
         self.page.update()
-        if show:
-            time.sleep(0.1)  # Give UI time to update
 
     def handle_catalog_picked(self, e: ft.FilePickerResultEvent):
         """טיפול בקובץ קטלוג שנבחר"""
@@ -671,22 +715,12 @@ class PanelKitchensApp:
         self.page.update()
 
     def generate_pdf(self, e):
-        """יצירת PDF עם שמירה ופתיחה אוטומטית"""
-        import os, re, traceback
-        from datetime import date
-        import pandas as pd
-
-        # Debug: מציג את כל ה-state לפני הכל
-       # print("🔘 generate_pdf invoked")
-       # print("   • full page.data:", self.page.data)
-       # print("   • form_fields:", self.page.data.get('form_fields'))
-       # print("   • selected_items:", self.page.data.get('selected_items'))
-
-        self.show_success_message("generate_pdf() called")
-        self.show_loading(True)
+        """יצירת PDF ברקע עם התקדמות וביטול - הממשק נשאר זמין"""
+        if self._pdf_job is not None and self._pdf_job.is_alive():
+            self.show_error_message("יצירת הצעה כבר מתבצעת")
+            return
 
         # איסוף שדות
-       # print(">> collecting form fields...")
         form_fields = self.page.data.get('form_fields', {})
         customer_data = {
             'name': form_fields.get('name').value or '',
@@ -705,80 +739,112 @@ class PanelKitchensApp:
         print(">> validate_form returned:", ok)
         if not ok:
             print(">> aborting after validate_form")
-            self.show_loading(False)
             return
 
         # בדיקה של הפריטים הנבחרים
         items = self.page.data.get('selected_items')
-        print(">> selected_items is:", items)
         if not items:
             print(">> aborting because no selected_items")
             self.show_error_message("יש לבחור מוצרים להצעה")
-            self.show_loading(False)
             return
 
+        # תמונות demo מועברות כנתיב - העיבוד (הקטנה ודחיסה) נעשה במחולל עם מטמון
+        demo1_data = self.page.data.get('demo1')
+        demo2_data = self.page.data.get('demo2')
+
+        self._pdf_cancel = threading.Event()
+        self.set_pdf_generation_running(True)
+        self._pdf_job = threading.Thread(
+            target=self._generate_pdf_worker,
+            args=(customer_data, list(items), demo1_data, demo2_data, self._pdf_cancel),
+            daemon=True,
+        )
+        self._pdf_job.start()
+
+    def _generate_pdf_worker(self, customer_data, items, demo1_data, demo2_data, cancel_event):
+        """רץ ב-thread נפרד: בניית הנתונים, רינדור וכתיבה לדיסק"""
+        import traceback
+        from datetime import date
+
         try:
             # יצירת DataFrame
-            print(">> creating DataFrame from selected_items...")
             selected_df = pd.DataFrame(items)
             print(f">> DataFrame created with {len(selected_df)} rows")
 
-            # קריאת תמונות demo במידת הצורך
-            demo1_data = demo2_data = None
-            if self.page.data.get('demo1'):
-                print(">> reading demo1 image from", self.page.data['demo1'])
-                with open(self.page.data['demo1'], 'rb') as f:
-                    demo1_data = f.read()
-            if self.page.data.get('demo2'):
-                print(">> reading demo2 image from", self.page.data['demo2'])
-                with open(self.page.data['demo2'], 'rb') as f:
-                    demo2_data = f.read()
-
-            # יצירת PDF
-            print(">> calling create_enhanced_pdf...")
-            pdf_buffer = create_enhanced_pdf(customer_data, selected_df, demo1_data, demo2_data)
-            pdf_bytes = pdf_buffer.getvalue()
-            print(f">> PDF buffer length: {len(pdf_bytes)} bytes")
-            print(">> PDF header:", pdf_bytes[:4], "…", "PDF trailer:", pdf_bytes[-6:])
-            if not pdf_bytes.startswith(b'%PDF'):
-                print("‼️ Warning: buffer does not start with '%PDF'")
-
-            # שמירת הבופר ב-page.data
-            self.page.data['generated_pdf'] = pdf_bytes
-
-            # שמירת קובץ ה-PDF לדיסק
+            # יעד השמירה
             desktop = os.path.join(os.path.expanduser("~"), "Desktop")
             if not os.path.isdir(desktop):
                 desktop = os.path.expanduser("~")
             print(f">> target save path: {desktop}")
 
-            safe_name = re.sub(r'[\\/:*?"<>|]', '_', customer_data['name']) or 'לקוח'
+            safe_name = safe_filename(customer_data['name'])
             filename = f"הצעת_מחיר_{safe_name}_{date.today().strftime('%Y%m%d')}.pdf"
             save_path = os.path.join(desktop, filename)
 
-            print(f">> writing PDF to: {save_path}")
-            with open(save_path, 'wb') as f:
-                f.write(pdf_bytes)
-            print(f">> PDF saved: exists? {os.path.exists(save_path)}")
-            self.show_success_message(f"PDF saved to {save_path}")
-
-            self.show_loading(False)
-            print(">> before show_pdf_success_dialog")
+            # בקשה זהה (לקוח, פריטים, תמונות, הגדרות) מוגשת מהמטמון
+            pdf_settings = self.settings_manager.get_pdf_settings()
+            cache_key = quote_cache_key(customer_data, selected_df, demo1_data, demo2_data, pdf_settings)
+            if cancel_event.is_set():
+                raise PdfGenerationCancelled()
+            cached_path = self.pdf_cache.get_path(cache_key)
+            if cached_path:
+                print(">> PDF served from cache")
+                shutil.copyfile(cached_path, save_path)
+            else:
+                # יצירת PDF ישירות לקובץ היעד (ללא עותק בזיכרון)
+                print(f">> rendering PDF to: {save_path}")
+                create_enhanced_pdf(customer_data, selected_df, demo1_data, demo2_data, pdf_settings,
+                                    output=save_path, progress=self.update_pdf_progress,
+                                    cancel_event=cancel_event)
+                self.pdf_cache.put_file(cache_key, save_path)
+            print(f">> PDF saved: {os.path.getsize(save_path)} bytes")
+
+            # שומרים רק את הנתיב - "שמור בשם" מעתיק את הקובץ מהדיסק
+            self.page.data['generated_pdf_path'] = save_path
+
+            self.set_pdf_generation_running(False)
             self.show_pdf_success_dialog(save_path)
-            print(">> after show_pdf_success_dialog")
+
+        except PdfGenerationCancelled:
+            print(">> PDF generation cancelled")
+            self.set_pdf_generation_running(False)
+            self.show_error_message("יצירת ההצעה בוטלה")
 
         except Exception as ex:
             print("‼️ exception during PDF generation:", ex)
             traceback.print_exc()
-            self.show_loading(False)
+            self.set_pdf_generation_running(False)
             self.show_error_message(f"שגיאה ביצירת PDF: {ex}")
 
+    def update_pdf_progress(self, page, total):
+        """עדכון פס ההתקדמות לפי עמודים (נקרא מה-thread של היצירה)"""
+        self.progress_bar.value = min(1.0, page / total) if total else None
+        self.page.update()
+
+    def set_pdf_generation_running(self, running):
+        """מצב כפתורים ופס התקדמות בזמן יצירה ברקע"""
+        self.page.data['loading'] = running
+        self.generate_button.disabled = running
+        self.cancel_generate_button.visible = running
+        self.cancel_generate_button.disabled = False
+        # עד סיום העמוד הראשון המחוון אינו מציג אחוזים
+        self.show_loading(running)
+
+    def cancel_pdf_generation(self, e):
+        """בקשת ביטול - ה-thread יעצור בסוף העמוד הנוכחי"""
+        if self._pdf_cancel is not None:
+            self._pdf_cancel.set()
+        self.cancel_generate_button.disabled = True
+        self.page.update()
+
     def show_pdf_success_dialog(self, file_path):
         print("✅ show_pdf_success_dialog() called with:", file_path)
 
         try:
             def close_dialog(e):
                 print("🟨 dialog closed")
+                if self._preview_cancel is not None:
+                    self._preview_cancel.set()
                 self.page.dialog.open = False
                 self.page.update()
 
@@ -821,6 +887,9 @@ class PanelKitchensApp:
                     file_name=os.path.basename(file_path),
                 )
 
+            # תצוגה מקדימה בתוך האפליקציה (אם pypdfium2 מותקן)
+            preview = self.create_pdf_preview(file_path)
+
             dlg = ft.AlertDialog(
                 modal=True,
                 title=ft.Row([
@@ -832,8 +901,9 @@ class PanelKitchensApp:
                         ft.Text("הקובץ נשמר ב:", size=16),
                         ft.Text(file_path, size=14, weight=ft.FontWeight.BOLD, selectable=True),
                         ft.Container(height=10),
+                        *([preview] if preview else []),
                         ft.Text("מה תרצה לעשות?", size=16),
-                    ], spacing=5),
+                    ], spacing=5, scroll=ft.ScrollMode.AUTO),
                     width=500,
                 ),
                 actions=[
@@ -872,12 +942,56 @@ class PanelKitchensApp:
             print(f"❌ Error showing dialog: {ex}")
             self.show_error_message(f"שגיאה בהצגת חלון הצלחה: {str(ex)}")
 
+    def create_pdf_preview(self, file_path):
+        """תצוגה מקדימה של ה-PDF - העמודים מרונדרים ברקע והעמוד הראשון מוצג מיד כשהוא מוכן"""
+        if not preview_available():
+            return None
+
+        main_image = ft.Container(
+            content=ft.ProgressRing(color="#d32f2f"),
+            width=300,
+            height=424,
+            bgcolor="#f5f5f5",
+            border_radius=5,
+            alignment=ft.alignment.center,
+        )
+        thumbnails = ft.Row(spacing=8, scroll=ft.ScrollMode.AUTO)
+
+        def show_page(png_path):
+            main_image.content = ft.Image(src=png_path, width=300, height=424, fit=ft.ImageFit.CONTAIN)
+            self.page.update()
+
+        def on_page(index, png_path, total):
+            thumbnails.controls.append(
+                ft.Container(
+                    content=ft.Image(src=png_path, width=60, height=85, fit=ft.ImageFit.CONTAIN),
+                    border=ft.border.all(1, "#e0e0e0"),
+                    tooltip=f"עמוד {index + 1} מתוך {total}",
+                    on_click=lambda _, p=png_path: show_page(p),
+                )
+            )
+            if index == 0:
+                show_page(png_path)
+            else:
+                self.page.update()
+
+        def on_error(ex):
+            main_image.content = ft.Text("לא ניתן להציג תצוגה מקדימה", color="#666666")
+            self.page.update()
+
+        if self._preview_cancel is not None:
+            self._preview_cancel.set()
+        self._preview_cancel = render_thumbnails_async(file_path, on_page, on_error)
+
+        return ft.Column([main_image, thumbnails], horizontal_alignment=ft.CrossAxisAlignment.CENTER, spacing=10)
+
     def handle_save_pdf(self, e: ft.FilePickerResultEvent):
         """שמירה של קובץ ה-PDF שנוצר"""
-        if e.path and self.page.data.get('generated_pdf'):
+        source = self.page.data.get('generated_pdf_path')
+        if e.path and source and os.path.exists(source):
             try:
-                with open(e.path, 'wb') as f:
-                    f.write(self.page.data['generated_pdf'])
+                if os.path.abspath(e.path) != os.path.abspath(source):
+                    shutil.copyfile(source, e.path)
                 self.show_success_message("הקובץ נשמר בהצלחה")
             except Exception as ex:
                 self.show_error_message(f"שגיאה בשמירת הקובץ: {str(ex)}")
@@ -0,0 +1,146 @@
+# file: panel_app/maintenance.py
+"""
+תחזוקה ברקע: גיבוי, דחיסת האחסון ובניית הסטטיסטיקות מחדש לפי מרווחי הזמן שבהגדרות.
+
+המשימות רצות ב-thread נפרד (אף פעם לא בלולאת האירועים של Flet), ועדיף כשהאפליקציה במנוחה -
+האפליקציה קוראת ל-touch() בכל פעולת משתמש. משימה שנדחתה יותר מדי רצה גם בלי מנוחה.
+זמני ההרצה האחרונים נשמרים ב-maintenance.json, כך שהמרווחים נשמרים גם בין הפעלות.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from utils.helpers import DATA_DIR
+
+STATE_FILE = "maintenance.json"
+CHECK_INTERVAL_SECONDS = 60
+# משימה שמחכה למנוחה יותר מזה רצה בכל מקרה
+MAX_DEFER = timedelta(hours=6)
+
+
+class MaintenanceScheduler:
+    def __init__(self, settings_manager, manager_factory: Callable[[], object], data_dir: str = DATA_DIR,
+                 is_busy: Optional[Callable[[], bool]] = None, check_interval: float = CHECK_INTERVAL_SECONDS):
+        self.settings_manager = settings_manager
+        self.manager_factory = manager_factory
+        self.is_busy = is_busy
+        self.check_interval = check_interval
+        self.state_file = os.path.join(data_dir, STATE_FILE)
+        self.state = self._load_state()
+        self.manager = None
+        self._last_activity = time.monotonic()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _load_state(self) -> Dict:
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+        return {}
+
+    def _save_state(self) -> None:
+        os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+        tmp_path = f"{self.state_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.state_file)
+
+    # Lifecycle
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the loop; a job that is already running is allowed to finish within timeout."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                return
+        if self.manager is not None and hasattr(self.manager, 'close'):
+            self.manager.close()
+            self.manager = None
+
+    def touch(self) -> None:
+        """Record user activity (called from UI handlers - must stay cheap)."""
+        self._last_activity = time.monotonic()
+
+    def _idle(self) -> bool:
+        idle_seconds = self.settings_manager.get('maintenance.idle_minutes', 2) * 60
+        if self.is_busy is not None and self.is_busy():
+            return False
+        return time.monotonic() - self._last_activity >= idle_seconds
+
+    # Jobs
+    def jobs(self) -> Dict[str, Optional[timedelta]]:
+        """Job name -> interval from the current settings (None = disabled)."""
+        get = self.settings_manager.get
+        return {
+            'backup': timedelta(days=get('features.backup_interval_days', 7))
+            if get('features.auto_backup', False) else None,
+            'compact': timedelta(hours=get('maintenance.compact_interval_hours', 24)),
+            'rollups': timedelta(hours=get('maintenance.rollup_interval_hours', 24))
+            if get('features.statistics', True) else None,
+        }
+
+    def _due_since(self, name: str, interval: timedelta) -> Optional[timedelta]:
+        """How long the job has been due (None if it is not due yet)."""
+        last_run = self.state.get(name, {}).get('last_run')
+        if not last_run:
+            return timedelta(0)
+        overdue = datetime.now() - (datetime.fromisoformat(last_run) + interval)
+        return overdue if overdue >= timedelta(0) else None
+
+    def _job_function(self, name: str) -> Optional[Callable[[], object]]:
+        if self.manager is None:
+            self.manager = self.manager_factory()
+        method = {'backup': 'create_backup', 'compact': 'compact', 'rollups': 'rebuild_statistics'}[name]
+        return getattr(self.manager, method, None)
+
+    def run_job(self, name: str) -> Optional[float]:
+        """Run one job now; returns its duration in ms (None if the backend has no such job)."""
+        fn = self._job_function(name)
+        if fn is None:
+            return None
+        start = time.perf_counter()
+        error = None
+        try:
+            fn()
+        except Exception as e:
+            error = str(e)
+            print(f"❌ Maintenance job '{name}' failed: {e}")
+        duration_ms = (time.perf_counter() - start) * 1000
+        self.state[name] = {'last_run': datetime.now().isoformat(), 'duration_ms': round(duration_ms, 1),
+                            'error': error}
+        self._save_state()
+        if error is None:
+            print(f"🛠️ Maintenance job '{name}' took {duration_ms:.0f} ms")
+        return duration_ms
+
+    def run_pending(self) -> None:
+        if not self.settings_manager.get('maintenance.enabled', True):
+            return
+        for name, interval in self.jobs().items():
+            if interval is None or self._stop.is_set():
+                continue
+            overdue = self._due_since(name, interval)
+            if overdue is None:
+                continue
+            if self._idle() or overdue >= MAX_DEFER:
+                self.run_job(name)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.check_interval):
+            try:
+                self.run_pending()
+            except Exception as e:
+                print(f"Error in maintenance scheduler: {e}")
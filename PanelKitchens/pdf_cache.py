@@ -0,0 +1,146 @@
+# file: panel_app/pdf_cache.py
+import hashlib
+import json
+import os
+import shutil
+from typing import Optional
+
+from pdf_generator import GENERATOR_VERSION
+from utils.helpers import cache_dir, enforce_lru_limits
+
+# העמודות שמשפיעות על ה-PDF בפועל
+ITEM_COLUMNS = ['הפריט', 'כמות', 'מחיר יחידה', 'סהכ']
+
+
+def _content_hash(source) -> Optional[str]:
+    """Hash an image given as path or bytes (None when there is no image)."""
+    if not source:
+        return None
+    h = hashlib.sha256()
+    if isinstance(source, (bytes, bytearray)):
+        h.update(source)
+    else:
+        with open(source, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def quote_cache_key(customer_data: dict, items, demo1=None, demo2=None, settings: Optional[dict] = None) -> str:
+    """
+    Stable hash of everything that affects the rendered quote:
+    customer data, line items, image contents, settings and generator version.
+    items may be a DataFrame or a list of dicts / Series.
+    """
+    if hasattr(items, 'to_dict'):
+        records = items.to_dict(orient='records')
+    else:
+        records = [dict(item) for item in items]
+    records = [{col: rec.get(col) for col in ITEM_COLUMNS} for rec in records]
+
+    payload = {
+        'version': GENERATOR_VERSION,
+        'customer': customer_data,
+        'items': records,
+        'demo1': _content_hash(demo1),
+        'demo2': _content_hash(demo2),
+        'settings': settings or {},
+    }
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+class PdfCache:
+    """On-disk LRU cache of finished quote PDFs keyed by quote_cache_key."""
+
+    def __init__(self, cache_root: Optional[str] = None, max_bytes: int = 200 * 1024 * 1024,
+                 max_entries: int = 500):
+        self.cache_root = cache_root or cache_dir('pdf')
+        os.makedirs(self.cache_root, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._check_version()
+
+    def _check_version(self) -> None:
+        """Drop everything cached by a different template version."""
+        version_file = os.path.join(self.cache_root, 'VERSION')
+        current = str(GENERATOR_VERSION)
+        stored = None
+        if os.path.exists(version_file):
+            with open(version_file, 'r', encoding='utf-8') as f:
+                stored = f.read().strip()
+        if stored != current:
+            self.invalidate()
+            with open(version_file, 'w', encoding='utf-8') as f:
+                f.write(current)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_root, f"{key}.pdf")
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_root):
+            if name.endswith('.pdf'):
+                path = os.path.join(self.cache_root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        # עדכון זמן שימוש אחרון (LRU)
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return data
+
+    def get_path(self, key: str) -> Optional[str]:
+        """Path of the cached PDF (to copy without loading it), or None on a miss."""
+        path = self._entry_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return path
+
+    def put_file(self, key: str, source_path: str) -> None:
+        """Store a PDF that was rendered straight to disk."""
+        path = self._entry_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        shutil.copyfile(source_path, tmp_path)
+        os.replace(tmp_path, path)
+        self._enforce_limits()
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._entry_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._enforce_limits()
+
+    def _enforce_limits(self) -> None:
+        enforce_lru_limits(self._entries(), self.max_bytes, self.max_entries)
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Remove one entry, or the whole cache when key is None."""
+        if key is not None:
+            paths = [self._entry_path(key)]
+        else:
+            paths = [path for _, _, path in self._entries()]
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -1,6 +1,9 @@
 # file: panel_app/pdf_generator.py
 import io
 import os
+import threading
+import zlib
+from contextlib import contextmanager
 from datetime import date
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
@@ -8,48 +11,194 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.utils import ImageReader
 from reportlab.lib.units import mm
+from reportlab import rl_config
 from PIL import Image as PILImage
 
+from image_processing import prepare_image, DEFAULT_DPI, DEFAULT_JPEG_QUALITY
 from utils.helpers import asset_path
 from utils.rtl import rtl
 
+# גרסת התבנית - להעלות בכל שינוי בעיצוב ה-PDF (פוסלת את מטמון ההצעות)
+GENERATOR_VERSION = 2
+
+# זרמים בינאריים במקום ASCII85 - קובץ קטן יותר וקידוד מהיר יותר (ASCII85 מקודד ב-Python).
+# ל-ReportLab אין הגדרה לכל canvas, ולכן ההגדרה הגלובלית משתנה רק בזמן שה-canvas שלנו פעיל
+_a85_lock = threading.Lock()
+_a85_users = 0
+_a85_saved = None
+
+
+@contextmanager
+def _binary_streams():
+    global _a85_users, _a85_saved
+    with _a85_lock:
+        if _a85_users == 0:
+            _a85_saved = rl_config.useA85
+            rl_config.useA85 = 0
+        _a85_users += 1
+    try:
+        yield
+    finally:
+        with _a85_lock:
+            _a85_users -= 1
+            if _a85_users == 0:
+                rl_config.useA85 = _a85_saved
+
+# פרופיל ברירת מחדל כשלא הוגדרו פרופילים בהגדרות.
+# גופני TTF מוטמעים תמיד כ-subset (רק התווים שבשימוש) על ידי ReportLab.
+DEFAULT_PROFILE = {
+    'page_compression': True,
+    'image_dpi': DEFAULT_DPI,
+    'jpeg_quality': DEFAULT_JPEG_QUALITY,
+}
+
+
+def resolve_profile(pdf_settings=None, name=None):
+    """Return the output profile (compression / image DPI / JPEG quality) by name or the active one"""
+    pdf_settings = pdf_settings or {}
+    profiles = pdf_settings.get('profiles') or {}
+    name = name or pdf_settings.get('profile')
+    profile = dict(DEFAULT_PROFILE)
+    profile.update(profiles.get(name, {}))
+    return profile
+
+
+DEFAULT_TERMS = [
+    "הצעת המחיר תקפה ל-14 ימים ממועד הפקתה.",
+    "ההצעה מיועדת ללקוח הספציפי בלבד ולא להעברה לחוץ.",
+    "המחירים עשויים להשתנות והחברה אינה אחראית לטעויות.",
+    "אישור ההצעה מהווה התחייבות לתשלום 10% מקדמה.",
+    "הלקוח מתחייב לפנות נקודות מים וחשמל בהתאם לתכניות.",
+    "אי עמידה בתנאים עלולה לגרור עיכובים וחריגות."
+]
+
+TERMS_FORM = 'terms_static'
+
+# ImageReader ללוגו ולסימן המים - פענוח פעם אחת לכל תהליך במקום בכל עמוד
+_asset_images = {}
+
+
+def _asset_image(filename):
+    """Cached ImageReader for an asset, or None when the file is missing"""
+    if filename not in _asset_images:
+        path = asset_path(filename)
+        _asset_images[filename] = ImageReader(path) if os.path.exists(path) else None
+    return _asset_images[filename]
+
+# שורות התנאים לאחר עיבוד RTL - מחושבות פעם אחת לכל גרסת הגדרות
+_shaped_terms_cache = {}
 
-def create_enhanced_pdf(customer_data, items_df, demo1=None, demo2=None):
-    """Create styled PDF with fixed layout"""
-    buffer = io.BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-    W, H = A4
-    m = 20 * mm
-    ROW_HEIGHT = 8 * mm
+
+def _shaped_terms(terms):
+    key = tuple(terms)
+    if key not in _shaped_terms_cache:
+        _shaped_terms_cache[key] = [rtl(t) for t in terms]
+    return _shaped_terms_cache[key]
+
+
+# שמות הגופנים הרשומים - רישום פעם אחת לכל תהליך
+_registered_fonts = None
+
+
+def register_fonts():
+    """Register the Hebrew fonts once per process; returns (regular, bold) font names"""
+    global _registered_fonts
+    if _registered_fonts is not None:
+        return _registered_fonts
 
     try:
         reg_path = asset_path('Heebo-Regular.ttf')
         bold_path = asset_path('Heebo-Bold.ttf')
         pdfmetrics.registerFont(TTFont('Heebo', reg_path))
         pdfmetrics.registerFont(TTFont('Heebo-Bold', bold_path))
-        PDF_FONT = 'Heebo'
-        PDF_BOLD = 'Heebo-Bold'
+        fonts = ('Heebo', 'Heebo-Bold')
     except Exception:
         fallback = asset_path('Heebo-Regular.ttf')
         if os.path.exists(fallback):
             pdfmetrics.registerFont(TTFont('Hebrew', fallback))
-            PDF_FONT = PDF_BOLD = 'Hebrew'
+            fonts = ('Hebrew', 'Hebrew')
         else:
-            PDF_FONT = PDF_BOLD = 'Helvetica'
+            fonts = ('Helvetica', 'Helvetica')
+    _registered_fonts = fonts
+    return fonts
+
+
+class PdfGenerationCancelled(Exception):
+    """Raised when PDF generation is cancelled through cancel_event"""
+
+
+def _new_canvas(output, output_profile):
+    return canvas.Canvas(output, pagesize=A4, pageCompression=1 if output_profile['page_compression'] else 0)
+
+
+def create_enhanced_pdf(customer_data, items_df, demo1=None, demo2=None, pdf_settings=None, output=None,
+                        progress=None, cancel_event=None, profile=None):
+    """
+    Create styled PDF with fixed layout.
+    output may be a file path or a writable file-like object; the PDF is written
+    straight to it and output is returned. Without output a BytesIO is returned.
+    progress(page, total) is called after each finished page; setting cancel_event
+    (threading.Event) aborts with PdfGenerationCancelled before anything is written.
+    profile selects an output profile from pdf_settings['profiles'] ("email", "print", "archive");
+    by default the active pdf_settings['profile'] is used.
+    """
+    output_profile = resolve_profile(pdf_settings, profile)
+    buffer = output if output is not None else io.BytesIO()
+    with _binary_streams():
+        c = _new_canvas(buffer, output_profile)
+        draw_quote(c, customer_data, items_df, demo1, demo2, pdf_settings, output_profile, progress, cancel_event)
+        c.save()
+    if output is None:
+        buffer.seek(0)
+    return buffer
+
+
+def create_combined_report(quotes, output, pdf_settings=None, profile=None, progress=None, cancel_event=None):
+    """
+    Render many quotes into a single PDF (e.g. a month of quotes for a manager).
+    quotes is any iterable of dicts with customer_data / items_df / demo1 / demo2; it is consumed
+    lazily, so a generator keeps only one quote's data in memory at a time. Fonts, logo, watermark and the
+    terms form are embedded once and shared by every page. progress(quotes_done) is called
+    after each quote. Returns the number of quotes rendered.
+    """
+    output_profile = resolve_profile(pdf_settings, profile)
+    count = 0
+    with _binary_streams():
+        c = _new_canvas(output, output_profile)
+        for quote in quotes:
+            draw_quote(c, quote['customer_data'], quote['items_df'], quote.get('demo1'), quote.get('demo2'),
+                       pdf_settings, output_profile, cancel_event=cancel_event)
+            count += 1
+            if progress:
+                progress(count)
+        c.save()
+    return count
+
+
+def draw_quote(c, customer_data, items_df, demo1=None, demo2=None, pdf_settings=None, output_profile=None,
+               progress=None, cancel_event=None):
+    """Draw one complete quote (with its own page numbering) onto an existing canvas"""
+    pdf_settings = pdf_settings or {}
+    terms = pdf_settings.get('terms') or DEFAULT_TERMS
+    output_profile = output_profile or resolve_profile(pdf_settings)
+    W, H = A4
+    m = 20 * mm
+    ROW_HEIGHT = 8 * mm
+
+    PDF_FONT, PDF_BOLD = register_fonts()
 
     def draw_rtl(canv, x, y, text, font=PDF_FONT, fontsize=12):
         canv.setFont(font, fontsize)
         canv.drawRightString(x, y, rtl(text))
 
     def draw_watermark(canv):
-        wm_path = asset_path('watermark.png')
-        if os.path.exists(wm_path):
+        img = _asset_image('watermark.png')
+        if img is not None:
             canv.saveState()
             try:
                 canv.setFillAlpha(0.1)
             except Exception:
                 pass
-            img = ImageReader(wm_path)
             w_img, h_img = img.getSize()
             scale = min((W / 2) / w_img, (H / 2) / h_img)
             nw, nh = w_img * scale, h_img * scale
@@ -65,9 +214,8 @@ def create_enhanced_pdf(customer_data, items_df, demo1=None, demo2=None):
 
         # לוגו קטן משמאל
         x = m
-        logo_path = asset_path('logo.png')
-        if os.path.exists(logo_path):
-            img = ImageReader(logo_path)
+        img = _asset_image('logo.png')
+        if img is not None:
             w, h = img.getSize()
             scale = (8 * mm) / h
             canv.drawImage(img, x, 4 * mm, height=8 * mm, width=w * scale, preserveAspectRatio=True, mask='auto')
@@ -84,20 +232,23 @@ def create_enhanced_pdf(customer_data, items_df, demo1=None, demo2=None):
         canv.setFont(PDF_FONT, 9)
         canv.drawRightString(W - m, 7 * mm, page_text)
 
+    def header_logo_height():
+        img = _asset_image('logo.png')
+        if img is None:
+            return 0
+        w_img, h_img = img.getSize()
+        return h_img * (70 * mm / w_img)
+
     def draw_header(canv):
         # מסגרת מעוצבת
         canv.setStrokeColorRGB(0.827, 0.184, 0.184)
         canv.setLineWidth(2)
         canv.rect(m / 2, m / 2, W - m, H - m, fill=0, stroke=1)
 
-        logo_big = asset_path('logo.png')
         logo_w = 70 * mm
-        logo_h = 0
-        if os.path.exists(logo_big):
-            img = ImageReader(logo_big)
-            w_img, h_img = img.getSize()
-            ratio = logo_w / w_img
-            logo_h = h_img * ratio
+        logo_h = header_logo_height()
+        img = _asset_image('logo.png')
+        if img is not None:
             canv.drawImage(img, m / 2 + 5 * mm, H - m / 2 - logo_h - 5 * mm, width=logo_w, height=logo_h,
                            preserveAspectRatio=True, mask='auto')
         canv.setFont(PDF_BOLD, 42)
@@ -105,6 +256,32 @@ def create_enhanced_pdf(customer_data, items_df, demo1=None, demo2=None):
         canv.drawCentredString(W / 2, H - m - logo_h - 15 * mm, rtl('הצעת מחיר'))
         return H - m - logo_h - 25 * mm
 
+    def draw_terms_static(canv):
+        """
+        Place the fixed part of the terms page, recording it as a form the first time
+        it is used in the document; returns the signature line y
+        """
+        shaped = _shaped_terms(terms)
+        form_name = f"{TERMS_FORM}_{zlib.crc32(chr(10).join(terms).encode('utf-8')):08x}"
+        if canv.hasForm(form_name):
+            canv.doForm(form_name)
+            return H - m - header_logo_height() - 25 * mm - 40 * mm - len(shaped) * 5 * mm - 10 * mm
+
+        canv.beginForm(form_name)
+        y_terms = draw_header(canv)
+        draw_watermark(canv)
+        y_terms -= 40 * mm
+
+        # טקסט משפטי
+        canv.setFont(PDF_FONT, 10)
+        canv.setFillColorRGB(0, 0, 0)
+        for line in shaped:
+            canv.drawRightString(W - m, y_terms, line)
+            y_terms -= 5 * mm
+        canv.endForm()
+        canv.doForm(form_name)
+        return y_terms - 10 * mm
+
     # חישוב מספר עמודים
     pages_total = 1  # עמוד ראשי
 
@@ -129,6 +306,17 @@ def create_enhanced_pdf(customer_data, items_df, demo1=None, demo2=None):
 
     page_num = 1
 
+    def finish_page():
+        """Footer and page break, then report progress and honour cancellation"""
+        nonlocal page_num
+        draw_footer(c, page_num, pages_total)
+        c.showPage()
+        if progress:
+            progress(page_num, pages_total)
+        if cancel_event is not None and cancel_event.is_set():
+            raise PdfGenerationCancelled()
+        page_num += 1
+
     # עמוד ראשון - כותרת ופרטי לקוח
     y = draw_header(c)
     draw_watermark(c)
@@ -195,9 +383,7 @@ def create_enhanced_pdf(customer_data, items_df, demo1=None, demo2=None):
     for i, rec in enumerate(items_df.to_dict(orient='records')):
         # בדיקה אם צריך עמוד חדש
         if items_on_current_page >= max_items_current_page:
-            draw_footer(c, page_num, pages_total)
-            c.showPage()
-            page_num += 1
+            finish_page()
 
             # הגדרת עמוד חדש
             y = draw_header(c)
@@ -231,10 +417,15 @@ def create_enhanced_pdf(customer_data, items_df, demo1=None, demo2=None):
         max_width = col_widths['product'] - 10 * mm
         text_width = c.stringWidth(rtl(product_text), PDF_FONT, 11)
         if text_width > max_width:
-            while text_width > max_width and len(product_text) > 3:
-                product_text = product_text[:-1]
-                text_width = c.stringWidth(rtl(product_text + "..."), PDF_FONT, 11)
-            product_text += "..."
+            # חיפוש בינארי של האורך הארוך ביותר שנכנס (במקום קיצוץ תו אחר תו)
+            lo, hi = 3, len(product_text) - 1
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if c.stringWidth(rtl(product_text[:mid] + "..."), PDF_FONT, 11) <= max_width:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            product_text = product_text[:max(lo, 3)] + "..."
         draw_rtl(c, x_product, text_y, product_text, PDF_FONT, 11)
         c.restoreState()
 
@@ -255,9 +446,7 @@ def create_enhanced_pdf(customer_data, items_df, demo1=None, demo2=None):
 
     # סיכום - וידוא שיש מספיק מקום
     if y < 100 * mm:  # אם נשאר פחות מ-100mm, עבור לעמוד חדש
-        draw_footer(c, page_num, pages_total)
-        c.showPage()
-        page_num += 1
+        finish_page()
         y = draw_header(c)
         draw_watermark(c)
         y -= 20 * mm
@@ -312,108 +501,50 @@ def create_enhanced_pdf(customer_data, items_df, demo1=None, demo2=None):
     c.setFillColorRGB(0, 0, 0)
 
     # תמיד מוסיפים footer לעמוד הנוכחי
-    draw_footer(c, page_num, pages_total)
-    c.showPage()
-    page_num += 1
+    finish_page()
 
     # עמודי תמונות
-    if demo1:
+    def draw_demo_page(demo, title, label):
         y_img = draw_header(c)
         draw_watermark(c)
 
         c.setFont(PDF_FONT, 20)
-        c.drawCentredString(W / 2, y_img, rtl("הדמיה"))
+        c.drawCentredString(W / 2, y_img, rtl(title))
         y_img -= 10 * mm
 
         # טיפול בתמונה - תומך גם ב-bytes וגם בנתיב
         try:
-            if isinstance(demo1, bytes):
-                img1 = ImageReader(io.BytesIO(demo1))
-            else:
-                img1 = ImageReader(demo1)
-
-            w1, h1 = img1.getSize()
-            img_area_height = H - 80 * mm
             max_w = W - 20 * mm
-            max_h = img_area_height
-            r1 = min(max_w / w1, max_h / h1)
-            nw1, nh1 = w1 * r1, h1 * r1
-            x1 = (W - nw1) / 2
-            y1 = y_img - nh1
-
-            if nh1 < max_h * 0.8:
-                y1 = (y_img - (max_h - nh1) / 2) - nh1
-
-            c.drawImage(img1, x1, y1, width=nw1, height=nh1)
-        except Exception as e:
-            print(f"Error loading demo1: {e}")
-            c.drawString(m, y_img - 50, f"Error loading image: {str(e)}")
-
-        draw_footer(c, page_num, pages_total)
-        c.showPage()
-        page_num += 1
-
-    if demo2:
-        y_img = draw_header(c)
-        draw_watermark(c)
+            max_h = H - 80 * mm
+            # תיקון כיוון, הקטנה לגודל ההדפסה ודחיסה (עם מטמון לפי תוכן)
+            img = ImageReader(io.BytesIO(prepare_image(demo, max_w, max_h,
+                                                       dpi=output_profile['image_dpi'],
+                                                       quality=output_profile['jpeg_quality'])))
 
-        c.setFont(PDF_FONT, 20)
-        c.drawCentredString(W / 2, y_img, rtl("הדמיית נקודות מים וחשמל"))
-        y_img -= 10 * mm
-
-        # טיפול בתמונה - תומך גם ב-bytes וגם בנתיב
-        try:
-            if isinstance(demo2, bytes):
-                img2 = ImageReader(io.BytesIO(demo2))
-            else:
-                img2 = ImageReader(demo2)
-
-            w2, h2 = img2.getSize()
-            img_area_height = H - 80 * mm
-            max_w = W - 20 * mm
-            max_h = img_area_height
-            r2 = min(max_w / w2, max_h / h2)
-            nw2, nh2 = w2 * r2, h2 * r2
-            x2 = (W - nw2) / 2
-            y2 = y_img - nh2
+            w_img, h_img = img.getSize()
+            r = min(max_w / w_img, max_h / h_img)
+            nw, nh = w_img * r, h_img * r
+            x_pos = (W - nw) / 2
+            y_pos = y_img - nh
 
-            if nh2 < max_h * 0.8:
-                y2 = (y_img - (max_h - nh2) / 2) - nh2
+            if nh < max_h * 0.8:
+                y_pos = (y_img - (max_h - nh) / 2) - nh
 
-            c.drawImage(img2, x2, y2, width=nw2, height=nh2)
+            c.drawImage(img, x_pos, y_pos, width=nw, height=nh)
         except Exception as e:
-            print(f"Error loading demo2: {e}")
+            print(f"Error loading {label}: {e}")
             c.drawString(m, y_img - 50, f"Error loading image: {str(e)}")
 
-        draw_footer(c, page_num, pages_total)
-        c.showPage()
-        page_num += 1
+        finish_page()
 
-    # עמוד טקסט משפטי
-    y = draw_header(c)
-    draw_watermark(c)
-    y -= 40 * mm
+    if demo1:
+        draw_demo_page(demo1, "הדמיה", 'demo1')
+    if demo2:
+        draw_demo_page(demo2, "הדמיית נקודות מים וחשמל", 'demo2')
 
-    # טקסט משפטי
-    c.setFont(PDF_FONT, 10)
-    c.setFillColorRGB(0, 0, 0)
-    for t in [
-        "הצעת המחיר תקפה ל-14 ימים ממועד הפקתה.",
-        "ההצעה מיועדת ללקוח הספציפי בלבד ולא להעברה לחוץ.",
-        "המחירים עשויים להשתנות והחברה אינה אחראית לטעויות.",
-        "אישור ההצעה מהווה התחייבות לתשלום 10% מקדמה.",
-        "הלקוח מתחייב לפנות נקודות מים וחשמל בהתאם לתכניות.",
-        "אי עמידה בתנאים עלולה לגרור עיכובים וחריגות."
-    ]:
-        draw_rtl(c, W - m, y, t, PDF_FONT, 10)
-        y -= 5 * mm
-    y -= 10 * mm
+    # עמוד טקסט משפטי - החלק הקבוע מוקלט פעם אחת כ-Form, ורק החתימה ומספור העמוד משתנים
+    y = draw_terms_static(c)
 
     c.setFillColorRGB(0, 0, 0)
     draw_rtl(c, W - m, y, "חתימת הלקוח: __________", PDF_FONT, 14)
-    draw_footer(c, page_num, pages_total)
-    c.showPage()
-
-    c.save()
-    buffer.seek(0)
-    return buffer
\ No newline at end of file
+    finish_page()
\ No newline at end of file
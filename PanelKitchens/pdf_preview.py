@@ -0,0 +1,111 @@
+# file: panel_app/pdf_preview.py
+import hashlib
+import os
+import shutil
+import threading
+from typing import Callable, List, Optional, Tuple
+
+from utils.helpers import cache_dir, enforce_lru_limits
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # התצוגה המקדימה אופציונלית - בלעדיה פותחים בצופה חיצוני
+    pdfium = None
+
+# pdfium אינו בטוח לשימוש מקביל מכמה threads
+_render_lock = threading.Lock()
+
+DEFAULT_SCALE = 1.0  # 1.0 = 72 DPI, עמוד A4 בגודל 595x842 פיקסלים
+# מטמון התמונות הממוזערות - תיקייה לכל PDF, התיקיות שלא נפתחו הכי הרבה זמן נמחקות קודם
+THUMBNAIL_CACHE_MAX_BYTES = 100 * 1024 * 1024
+THUMBNAIL_CACHE_MAX_ENTRIES = 200
+
+
+def preview_available() -> bool:
+    return pdfium is not None
+
+
+def _file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _thumbnail_entries(root: str, exclude: str) -> List[Tuple[float, int, str]]:
+    entries = []
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if path == exclude or not os.path.isdir(path):
+            continue
+        try:
+            size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+            entries.append((os.stat(path).st_mtime, size, path))
+        except OSError:
+            continue
+    return entries
+
+
+def render_thumbnails(pdf_path: str, on_page: Optional[Callable[[int, str, int], None]] = None,
+                      cancel_event: Optional[threading.Event] = None, scale: float = DEFAULT_SCALE) -> List[str]:
+    """
+    Rasterize every page of pdf_path to PNG, cached by PDF content hash.
+    on_page(index, png_path, total) is called as soon as each page is ready,
+    so the first page can be shown before the rest are rendered.
+    """
+    if pdfium is None:
+        raise RuntimeError("pypdfium2 is not installed")
+
+    # נתיב מוחלט - Flet מפרש נתיב יחסי ביחס לתיקיית ה-assets
+    root = os.path.abspath(cache_dir('thumbnails'))
+    target_dir = os.path.join(root, f"{_file_hash(pdf_path)}_{scale:g}")
+    os.makedirs(target_dir, exist_ok=True)
+    # זמן שימוש אחרון (LRU) - גם כשכל העמודים כבר במטמון
+    os.utime(target_dir, None)
+
+    paths = []
+    with _render_lock:
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            total = len(pdf)
+            for index in range(total):
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                png_path = os.path.join(target_dir, f"page_{index + 1:03d}.png")
+                if not os.path.exists(png_path):
+                    page = pdf[index]
+                    try:
+                        image = page.render(scale=scale).to_pil()
+                        tmp_path = f"{png_path}.tmp"
+                        image.save(tmp_path, format='PNG', optimize=True)
+                        os.replace(tmp_path, png_path)
+                    finally:
+                        page.close()
+                paths.append(png_path)
+                if on_page:
+                    on_page(index, png_path, total)
+        finally:
+            pdf.close()
+        # התיקייה שמוצגת עכשיו לא נספרת - היא החדשה ביותר בכל מקרה
+        enforce_lru_limits(_thumbnail_entries(root, exclude=target_dir), THUMBNAIL_CACHE_MAX_BYTES,
+                           THUMBNAIL_CACHE_MAX_ENTRIES - 1, remove=shutil.rmtree)
+    return paths
+
+
+def render_thumbnails_async(pdf_path: str, on_page: Callable[[int, str, int], None],
+                            on_error: Optional[Callable[[Exception], None]] = None,
+                            scale: float = DEFAULT_SCALE) -> threading.Event:
+    """Run render_thumbnails in a background thread; returns an Event that cancels it."""
+    cancel_event = threading.Event()
+
+    def worker():
+        try:
+            render_thumbnails(pdf_path, on_page, cancel_event, scale)
+        except Exception as e:
+            print(f"Error rendering preview: {e}")
+            if on_error:
+                on_error(e)
+
+    threading.Thread(target=worker, daemon=True).start()
+    return cancel_event
@@ -1,6 +1,6 @@
 import json
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Callable
 
 
 class SettingsManager:
@@ -30,6 +30,13 @@ class SettingsManager:
                     "הלקוח מתחייב לפנות נקודות מים וחשמל בהתאם לתכניות.",
                     "אי עמידה בתנאים עלולה לגרור עיכובים וחריגות."
                 ],
+                # פרופילי פלט: דחיסת עמודים, רזולוציית תמונות ואיכות JPEG
+                'profile': 'email',
+                'profiles': {
+                    'email': {'page_compression': True, 'image_dpi': 110, 'jpeg_quality': 70},
+                    'print': {'page_compression': True, 'image_dpi': 300, 'jpeg_quality': 92},
+                    'archive': {'page_compression': True, 'image_dpi': 200, 'jpeg_quality': 85},
+                },
             },
             'ui': {
                 'theme': 'light',
@@ -47,6 +54,13 @@ class SettingsManager:
                 'statistics': True,
                 'customer_history': True,
             },
+            # תחזוקה ברקע (maintenance.py) - גיבוי לפי features.backup_interval_days
+            'maintenance': {
+                'enabled': True,
+                'compact_interval_hours': 24,
+                'rollup_interval_hours': 24,
+                'idle_minutes': 2,
+            },
             'shortcuts': {
                 'new_quote': 'Ctrl+N',
                 'save_draft': 'Ctrl+S',
@@ -64,6 +78,7 @@ class SettingsManager:
             }
         }
 
+        self._change_listeners = []
         self.settings = self.load_settings()
 
     def load_settings(self) -> Dict:
@@ -92,6 +107,19 @@ class SettingsManager:
         """שמירת הגדרות"""
         with open(self.settings_file, 'w', encoding='utf-8') as f:
             json.dump(self.settings, f, ensure_ascii=False, indent=2)
+        self.notify_change()
+
+    def add_change_listener(self, callback: Callable[[], None]):
+        """רישום פונקציה שתיקרא אחרי כל שינוי הגדרות (למשל פסילת מטמון PDF)"""
+        self._change_listeners.append(callback)
+
+    def notify_change(self):
+        """הודעה לכל המאזינים על שינוי הגדרות"""
+        for callback in self._change_listeners:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Settings listener failed: {e}")
 
     def get(self, key_path: str, default: Any = None) -> Any:
         """
@@ -139,6 +167,17 @@ class SettingsManager:
         self.settings['pdf'].update(settings)
         self.save_settings()
 
+    def get_pdf_profile(self, name: str = None) -> Dict:
+        """קבלת פרופיל פלט PDF (ברירת מחדל - הפרופיל הפעיל)"""
+        pdf = self.settings['pdf']
+        return pdf.get('profiles', {}).get(name or pdf.get('profile'), {})
+
+    def set_pdf_profile(self, name: str):
+        """בחירת פרופיל הפלט הפעיל"""
+        if name in self.settings['pdf'].get('profiles', {}):
+            self.settings['pdf']['profile'] = name
+            self.save_settings()
+
     def get_ui_settings(self) -> Dict:
         """קבלת הגדרות ממשק"""
         return self.settings['ui']
@@ -168,7 +168,10 @@ def test_pdf_save_logic():
         def test_page(page: ft.Page):
             app = PanelKitchensApp(page)
             sample_bytes = b"test pdf"
-            page.data['generated_pdf'] = sample_bytes
+            src_fd, src_path = tempfile.mkstemp(suffix=".pdf")
+            with os.fdopen(src_fd, 'wb') as f:
+                f.write(sample_bytes)
+            page.data['generated_pdf_path'] = src_path
             tmp_fd, tmp_path = tempfile.mkstemp(suffix=".pdf")
             os.close(tmp_fd)
             class E:
@@ -180,6 +183,7 @@ def test_pdf_save_logic():
                 print("❌ כשל בשמירת הקובץ")
                 result = False
             os.remove(tmp_path)
+            os.remove(src_path)
             page.window.close()
 
         ft.app(target=test_page, view=ft.AppView.FLET_APP_HIDDEN)
@@ -0,0 +1,19 @@
+# file: panel_app/tests/conftest.py
+import pytest
+
+from customer_manager import open_customer_manager
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def open_manager(request, tmp_path):
+    """Factory opening a manager of each storage backend on the same folder; closes them afterwards."""
+    opened = []
+
+    def factory():
+        manager = open_customer_manager(str(tmp_path), request.param)
+        opened.append(manager)
+        return manager
+
+    yield factory
+    for manager in opened:
+        manager.close()
@@ -0,0 +1,43 @@
+# file: panel_app/tests/factories.py
+"""נתוני בדיקה והרצת קוד בתהליך נפרד (עמדה נוספת על אותה תיקיית נתונים)"""
+import os
+import re
+import subprocess
+import sys
+import textwrap
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def quote(name: str, phone: str, total: float = 100, items=None) -> dict:
+    """A save_quote payload with one line item of the given total."""
+    return {
+        'customer_data': {'name': name, 'phone': phone},
+        'items': items if items is not None else [{'name': 'מוצר', 'quantity': 1, 'price': total, 'total': total}],
+        'total_amount': total,
+    }
+
+
+def pdf_page_count(data: bytes) -> int:
+    """Number of pages in a PDF written by reportlab (page objects are not compressed)."""
+    return len(re.findall(rb'/Type /Page\b(?!s)', data))
+
+
+def _script(data_dir: str, code: str, **options) -> list:
+    args = ', '.join(f"{k}={v!r}" for k, v in options.items())
+    script = (f"from customer_manager import CustomerManager\n"
+              f"manager = CustomerManager({data_dir!r}, {args})\n"
+              f"{textwrap.dedent(code)}\n"
+              f"manager.close()\n")
+    return [sys.executable, '-c', script]
+
+
+def in_other_process(data_dir: str, code: str, **options) -> None:
+    """Run code in a separate interpreter with `manager` opened on data_dir, then close it."""
+    options.setdefault('flush_delay', 0)
+    subprocess.run(_script(data_dir, code, **options), cwd=APP_DIR, check=True)
+
+
+def start_other_process(data_dir: str, code: str, **options) -> subprocess.Popen:
+    """Like in_other_process, without waiting for it."""
+    return subprocess.Popen(_script(data_dir, code, **options), cwd=APP_DIR)
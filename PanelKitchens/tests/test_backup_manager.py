@@ -0,0 +1,40 @@
+# file: panel_app/tests/test_backup_manager.py
+"""בדיקות התנהגות למאגר הגיבויים"""
+import os
+import threading
+
+from backup_manager import LOCK_FILE, BackupStore
+from utils.file_lock import FileLock
+
+
+def test_backup_restore_roundtrip_and_prune(tmp_path):
+    data = tmp_path / "journal.jsonl"
+    data.write_text(''.join(f'{{"n": {i}}}\n' for i in range(5000)), encoding='utf-8')
+    store = BackupStore(str(tmp_path / "backups"))
+    first = store.backup({'journal.jsonl': str(data)})
+    with open(data, 'a', encoding='utf-8') as f:
+        f.write('{"n": "new"}\n')
+    second = store.backup({'journal.jsonl': str(data)})
+
+    store.prune(keep=1)
+    assert store.list_snapshots() == [second]
+    assert store.verify() == []
+    store.restore(second, str(tmp_path / "restored"))
+    assert (tmp_path / "restored" / "journal.jsonl").read_bytes() == data.read_bytes()
+    assert first != second
+
+
+def test_prune_waits_for_a_backup_in_progress(tmp_path):
+    backup_dir = str(tmp_path / "backups")
+    store = BackupStore(backup_dir)
+    # גיבוי של עמדה אחרת באמצע: מחזיק נעילה משותפת על מאגר הגיבויים
+    other = FileLock(os.path.join(backup_dir, LOCK_FILE))
+    other.acquire(exclusive=False)
+    pruner = threading.Thread(target=store.prune)
+    pruner.start()
+    pruner.join(0.3)
+    assert pruner.is_alive()
+    other.release()
+    pruner.join(5)
+    assert not pruner.is_alive()
+    other.close()
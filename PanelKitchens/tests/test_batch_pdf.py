@@ -0,0 +1,69 @@
+# file: panel_app/tests/test_batch_pdf.py
+"""בדיקות ליצירת הצעות מחיר באצווה"""
+import json
+import os
+
+import batch_pdf
+from tests.factories import pdf_page_count
+
+QUOTES = [
+    {'id': 'q1', 'customer_data': {'name': 'דנה', 'phone': '050-1111111', 'date': '2026-01-05'},
+     'items': [{'name': 'ארון', 'quantity': 2, 'price': 100}]},
+    {'customer_data': {'name': 'יוסי/לוי', 'discount': 10},
+     'items': [{'הפריט': 'ידית', 'כמות': 4, 'מחיר יחידה': 5, 'סהכ': 20}]},
+]
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_load_quotes_from_file_and_directory(tmp_path):
+    source = tmp_path / "quotes.jsonl"
+    source.write_text('\n'.join(json.dumps(q, ensure_ascii=False) for q in QUOTES) + '\n\n', encoding='utf-8')
+    assert batch_pdf.load_quotes(str(source)) == QUOTES
+
+    folder = tmp_path / "folder"
+    folder.mkdir()
+    (folder / "a.json").write_text(json.dumps(QUOTES[0]), encoding='utf-8')
+    (folder / "b.json").write_text(json.dumps(QUOTES), encoding='utf-8')
+    (folder / "c.jsonl").write_text(json.dumps(QUOTES[1]), encoding='utf-8')
+    (folder / "notes.txt").write_text("ignored", encoding='utf-8')
+    assert len(batch_pdf.load_quotes(str(folder))) == 4
+
+
+def test_items_use_the_generator_columns():
+    df = batch_pdf._items_df(QUOTES[0]['items'])
+    assert df.to_dict('records') == [{'הפריט': 'ארון', 'כמות': 2, 'מחיר יחידה': 100, 'סהכ': 200}]
+    assert list(batch_pdf._items_df([]).columns) == ['הפריט', 'כמות', 'מחיר יחידה', 'סהכ']
+
+
+def test_render_batch_reports_each_quote(tmp_path):
+    bad = {'customer_data': {'name': 'שגוי', 'date': 'not a date'}, 'items': []}
+    report = batch_pdf.render_batch(QUOTES + [bad], str(tmp_path), workers=1)
+    assert (report['total'], report['succeeded'], report['failed']) == (3, 2, 1)
+    assert report['quotes_per_second'] > 0
+    ok = [r for r in report['results'] if r['ok']]
+    assert [os.path.basename(r['path']) for r in ok] == ['q1_דנה.pdf', '00001_יוסי_לוי.pdf']
+    assert all(pdf_page_count(_read(r['path'])) >= 1 for r in ok)
+    assert not report['results'][2]['ok'] and report['results'][2]['error']
+
+
+def test_render_batch_in_worker_processes(tmp_path):
+    quotes = [dict(QUOTES[i % 2], id=f"q{i}") for i in range(4)]
+    report = batch_pdf.render_batch(quotes, str(tmp_path), workers=2)
+    assert report['succeeded'] == 4 and report['workers'] == 2
+    assert sorted(name[:2] for name in os.listdir(tmp_path)) == ['q0', 'q1', 'q2', 'q3']
+
+
+def test_cli_combined_report(tmp_path):
+    source = tmp_path / "quotes.jsonl"
+    source.write_text('\n'.join(json.dumps(q, ensure_ascii=False) for q in QUOTES), encoding='utf-8')
+    output = tmp_path / "report.pdf"
+    assert batch_pdf.main([str(source), '--settings', str(tmp_path / "settings.json"),
+                           '--combined', str(output)]) == 0
+    single = tmp_path / "single"
+    batch_pdf.render_batch(QUOTES, str(single), workers=1)
+    assert pdf_page_count(_read(output)) == sum(pdf_page_count(_read(single / name))
+                                                for name in os.listdir(single))
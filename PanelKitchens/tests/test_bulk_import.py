@@ -0,0 +1,135 @@
+# file: panel_app/tests/test_bulk_import.py
+"""ייבוא מרוכז: איחוד לקוחות, בדיקת שורות ושמירה בשני סוגי האחסון"""
+from datetime import datetime
+
+from bulk_import import customer_id_for_phone, normalize_phone, prepare_import
+from tests.factories import quote
+
+
+def _plan(quotes=(), customers=(), phone_ids=None):
+    phone_ids = phone_ids or {}
+    return prepare_import(quotes, customers, phone_ids, lambda cid: cid in phone_ids.values())
+
+
+def test_normalize_phone():
+    assert normalize_phone("+972-54-123-4567") == "0541234567"
+    assert normalize_phone("054 1234567") == "0541234567"
+    assert normalize_phone(None) == ""
+
+
+def test_customer_id_for_phone():
+    assert customer_id_for_phone("+972 54-123 4567", lambda cid: False) == "0541234567"
+    # לקוח שנשמר לפני הנרמול שומר על המזהה הישן
+    assert customer_id_for_phone("054 1234567", {"054 1234567"}.__contains__) == "054 1234567"
+    assert customer_id_for_phone("", lambda cid: False) == ""
+
+
+def test_customers_are_merged_by_normalized_phone():
+    plan = _plan(quotes=[
+        {'name': "דנה", 'phone': "054-1234567", 'total_amount': 100, 'created_at': "2019-01-01"},
+        {'name': "דנה כהן", 'phone': "+972 54 1234567", 'email': "d@example.com", 'total_amount': 50,
+         'created_at': "2019-02-01"},
+    ])
+    assert list(plan.customers) == ["0541234567"]
+    customer = plan.customers["0541234567"]
+    assert customer['name'] == "דנה כהן" and customer['email'] == "d@example.com"
+    assert customer['created_at'] == "2019-01-01T00:00:00"
+    assert {q['customer_id'] for q in plan.quotes} == {"0541234567"}
+
+
+def test_existing_customer_is_reused():
+    plan = _plan(quotes=[{'name': "דנה", 'phone': "0541234567", 'total_amount': 1}],
+                 phone_ids={"0541234567": "customer_existing"})
+    assert plan.quotes[0]['customer_id'] == "customer_existing"
+
+
+def test_customers_without_phone_are_merged_by_name_within_the_import():
+    plan = _plan(quotes=[{'name': "יוסי לוי", 'total_amount': 1}, {'name': "  יוסי לוי ", 'total_amount': 2},
+                         {'name': "רונית", 'total_amount': 3}])
+    assert len(plan.customers) == 2
+    assert len({q['customer_id'] for q in plan.quotes[:2]}) == 1
+
+
+def test_invalid_rows_are_reported_and_skipped():
+    plan = _plan(quotes=[
+        {'name': "דנה", 'phone': "0541234567", 'total_amount': "1,200 ₪", 'created_at': "31/12/2019 14:30"},
+        {'name': "", 'phone': "", 'total_amount': 10},
+        {'name': "יוסי", 'total_amount': "abc"},
+        {'name': "רונית", 'total_amount': 5, 'created_at': "yesterday"},
+        {'name': "מיכל", 'total_amount': -1},
+    ])
+    assert [q['total_amount'] for q in plan.quotes] == [1200]
+    assert plan.quotes[0]['created_at'] == "2019-12-31T14:30:00"
+    assert [e['index'] for e in plan.errors] == [1, 2, 3, 4]
+
+
+def test_quotes_are_ordered_by_time_with_unique_time_ordered_ids():
+    rows = [{'name': "דנה", 'phone': "0541234567", 'total_amount': 1, 'created_at': f"2019-01-{day:02d}"}
+            for day in (5, 1, 3, 1)]
+    plan = _plan(quotes=rows)
+    times = [q['created_at'] for q in plan.quotes]
+    ids = [q['id'] for q in plan.quotes]
+    assert times == sorted(times)
+    assert len(set(ids)) == 4 and ids == sorted(ids)
+    assert ids[0].startswith("quote_20190101_")
+
+
+def test_bulk_import_into_a_store_with_existing_customers(open_manager):
+    manager = open_manager()
+    manager.save_quote(quote("דנה", "054-1234567", 100))
+    report = manager.bulk_import(
+        quotes=[{'name': "דנה", 'phone': "+972-54-1234567", 'total_amount': 200, 'created_at': "2019-01-01"},
+                {'name': "יוסי", 'phone': "052-7654321", 'total_amount': 300, 'created_at': "2019-02-01"},
+                {'name': "", 'total_amount': 1}],
+        customers=[{'name': "רונית", 'phone': "053-1111111"}])
+    assert report['quotes_added'] == 2
+    assert report['customers_added'] == 2 and report['customers_updated'] == 1
+    assert [e['index'] for e in report['errors']] == [2]
+
+    customer = manager.get_customer("0541234567")
+    assert customer['quotes_count'] == 2 and customer['total_amount'] == 300
+    assert manager.get_customer("0531111111")['quotes_count'] == 0
+    assert [q['total_amount'] for q in manager.get_quote_history()] == [100, 300, 200]
+    assert manager.get_statistics()['total_revenue'] == 600
+
+
+def test_bulk_import_survives_a_restart(open_manager):
+    manager = open_manager()
+    manager.bulk_import(quotes=[{'name': f"לקוח {i % 3}", 'phone': f"050-000000{i % 3}", 'total_amount': 10,
+                                 'created_at': f"2018-03-{i + 1:02d}"} for i in range(9)])
+    manager.close()
+    reloaded = open_manager()
+    assert len(reloaded.get_quote_history()) == 9
+    assert [c['quotes_count'] for c in reloaded.get_all_customers()] == [3, 3, 3]
+
+
+def test_saves_and_imports_share_customer_ids(open_manager):
+    manager = open_manager()
+    manager.save_quote(quote("דנה", "+972 54-123 4567", 100))
+    manager.add_customer({'name': "דנה כהן", 'phone': "054 1234567"})
+    manager.bulk_import(quotes=[{'name': "דנה", 'phone': "0541234567", 'total_amount': 50}])
+    assert [c['id'] for c in manager.get_all_customers()] == ["0541234567"]
+    assert manager.get_customer("0541234567")['quotes_count'] == 2
+
+
+def test_updated_at_after_import(open_manager):
+    manager = open_manager()
+    manager.save_quote(quote("דנה", "054-1234567"))
+    saved_at = manager.get_customer("0541234567")['updated_at']
+    before = datetime.now().isoformat()
+    manager.bulk_import(
+        quotes=[{'name': "דנה", 'phone': "054-1234567", 'total_amount': 10, 'created_at': "01/02/2015"},
+                {'name': "יוסי", 'phone': "052-7654321", 'total_amount': 10, 'created_at': "2019-02-01"},
+                {'name': "יוסי", 'phone': "052-7654321", 'total_amount': 10, 'created_at': "2019-01-01"}],
+        customers=[{'name': "רונית", 'phone': "053-1111111"}])
+    after = datetime.now().isoformat()
+
+    def check(store):
+        # ייבוא היסטורי לא מחזיר לקוח קיים אחורה; לקוח חדש מקבל את זמן ההצעה האחרונה שלו
+        assert store.get_customer("0541234567")['updated_at'] == saved_at
+        assert store.get_customer("0527654321")['updated_at'] == "2019-02-01T00:00:00"
+        assert before <= store.get_customer("0531111111")['updated_at'] <= after
+
+    check(manager)
+    manager.close()
+    check(open_manager())
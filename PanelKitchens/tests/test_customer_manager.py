@@ -0,0 +1,207 @@
+# file: panel_app/tests/test_customer_manager.py
+"""בדיקות התנהגות לאחסון ה-JSON: יומן, שחזור אחרי קריסה, קומפקציה, עבודה מכמה תהליכים"""
+import json
+import os
+import textwrap
+
+import pytest
+
+from customer_manager import CustomerManager
+from tests.factories import in_other_process, quote, start_other_process
+
+
+def reopen(data_dir: str) -> CustomerManager:
+    return CustomerManager(data_dir, flush_delay=0)
+
+
+# Journal replay and crash recovery
+
+def test_saves_survive_a_restart_without_compaction(tmp_path):
+    data_dir = str(tmp_path)
+    manager = reopen(data_dir)
+    quote_id = manager.save_quote(quote("לקוח א", "050-1111111", 100))
+    manager.save_quote(quote("לקוח א", "050-1111111", 50))
+    manager.close()
+    assert not os.path.exists(tmp_path / "quotes_history.json")
+
+    reloaded = reopen(data_dir)
+    assert reloaded.get_customer("0501111111")['quotes_count'] == 2
+    assert reloaded.get_customer("0501111111")['total_amount'] == 150
+    assert reloaded.get_quote(quote_id)['items'][0]['total'] == 100
+    reloaded.close()
+
+
+def test_write_behind_coalesces_saves_until_flush(tmp_path):
+    manager = CustomerManager(str(tmp_path), flush_delay=60)
+    for i in range(5):
+        manager.save_quote(quote(f"לקוח {i}", f"050-000000{i}"))
+    assert not os.path.exists(tmp_path / "journal.jsonl")
+    assert len(manager.get_quote_history()) == 5
+    manager.flush()
+    lines = (tmp_path / "journal.jsonl").read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['op'] for line in lines].count('quote') == 5
+    manager.close()
+
+
+def test_partial_journal_line_is_dropped_on_load(tmp_path):
+    data_dir = str(tmp_path)
+    manager = reopen(data_dir)
+    manager.save_quote(quote("לקוח א", "050-1111111"))
+    manager.save_quote(quote("לקוח ב", "050-2222222"))
+    manager.close()
+    # קריסה באמצע כתיבת שורה ביומן ובקובץ הפריטים
+    with open(tmp_path / "journal.jsonl", 'ab') as f:
+        f.write(b'{"op": "quote", "data": {"id": "quote_')
+    with open(tmp_path / "quote_items.jsonl", 'ab') as f:
+        f.write(b'{"quote_id": "quote_')
+
+    manager = reopen(data_dir)
+    assert len(manager.get_quote_history()) == 2
+    new_id = manager.save_quote(quote("לקוח ג", "050-3333333", 300))
+    manager.close()
+
+    reloaded = reopen(data_dir)
+    assert len(reloaded.get_quote_history()) == 3
+    assert reloaded.get_quote(new_id)['items'][0]['total'] == 300
+    reloaded.close()
+
+
+def test_interrupted_compaction_is_recovered(tmp_path, monkeypatch):
+    data_dir = str(tmp_path)
+    manager = reopen(data_dir)
+    for i in range(3):
+        manager.save_quote(quote("לקוח א", "050-1111111", 100))
+
+    # הקומפקציה נופלת אחרי שהיומן הועבר הצידה ותמונת ההצעות נכתבה, לפני תמונת הלקוחות
+    save_json = CustomerManager._save_json
+
+    def failing_save(self, filepath, data):
+        if filepath == self.customers_file:
+            raise OSError("disk full")
+        save_json(self, filepath, data)
+
+    monkeypatch.setattr(CustomerManager, '_save_json', failing_save)
+    with pytest.raises(OSError):
+        manager.compact()
+    monkeypatch.undo()
+    assert os.path.exists(tmp_path / "journal.jsonl.compacting")
+    # שמירה אחרי הנפילה נכתבת ליומן החדש
+    manager.save_quote(quote("לקוח ב", "050-2222222", 200))
+    manager.close()
+
+    reloaded = reopen(data_dir)
+    assert not os.path.exists(tmp_path / "journal.jsonl.compacting")
+    assert len(reloaded.get_quote_history()) == 4
+    assert reloaded.get_customer("0501111111")['quotes_count'] == 3
+    assert reloaded.get_customer("0501111111")['total_amount'] == 300
+    assert reloaded.get_statistics()['total_revenue'] == 500
+    reloaded.close()
+
+
+def test_corrupt_snapshot_is_moved_aside(tmp_path):
+    data_dir = str(tmp_path)
+    (tmp_path / "customers.json").write_text("{not json", encoding='utf-8')
+    manager = reopen(data_dir)
+    assert manager.get_all_customers() == []
+    manager.close()
+    assert any(name.startswith("customers.json.corrupt-") for name in os.listdir(data_dir))
+
+
+def test_legacy_embedded_items_are_moved_to_the_items_file(tmp_path):
+    data_dir = str(tmp_path)
+    legacy = [{'id': 'quote_20200101_120000', 'customer_id': '0501111111', 'customer_name': 'לקוח א',
+               'date': '2020-01-01T12:00:00', 'items': [{'name': 'ארון', 'quantity': 2, 'price': 50, 'total': 100}],
+               'total_amount': 100, 'discount': 0, 'created_at': '2020-01-01T12:00:00', 'pdf_path': '', 'notes': ''}]
+    (tmp_path / "quotes_history.json").write_text(json.dumps(legacy, ensure_ascii=False), encoding='utf-8')
+    manager = reopen(data_dir)
+    assert 'items' not in manager.get_quote_history()[0]
+    assert manager.get_quote('quote_20200101_120000')['items'] == legacy[0]['items']
+    manager.close()
+
+    snapshot = json.loads((tmp_path / "quotes_history.json").read_text(encoding='utf-8'))
+    assert 'items' not in snapshot[0] and snapshot[0]['items_ref']
+
+
+# Several processes on one data folder
+
+def test_compact_keeps_quotes_saved_by_another_process(tmp_path):
+    data_dir = str(tmp_path)
+    a = reopen(data_dir)
+    a.save_quote(quote("לקוח א", "050-1111111"))
+    in_other_process(data_dir, "manager.save_quote({'customer_data': {'name': 'לקוח ב', 'phone': '050-2222222'}, "
+                               "'items': [], 'total_amount': 200})")
+    a.compact()
+    a.close()
+
+    reloaded = CustomerManager(data_dir)
+    names = sorted(q['customer_name'] for q in reloaded.get_quote_history())
+    assert names == ["לקוח א", "לקוח ב"]
+    assert reloaded.get_customer("0502222222")['quotes_count'] == 1
+    assert reloaded.get_statistics()['total_revenue'] == 300
+    reloaded.close()
+
+
+def test_concurrent_processes_saving_and_compacting(tmp_path):
+    data_dir = str(tmp_path)
+    workers, per_worker = 3, 40
+    code = """
+        for i in range(%d):
+            manager.save_quote({'customer_data': {'name': 'לקוח', 'phone': '050-0000000'},
+                                'items': [{'name': 'p%%d' %% WORKER, 'quantity': 1, 'total': 10}],
+                                'total_amount': 10, 'notes': '%%d-%%d' %% (WORKER, i)})
+            manager.save_draft({'id': 'draft_%%d_%%d' %% (WORKER, i %% 5), 'items': []})
+            if i %% 15 == 14:
+                manager.compact()
+    """ % per_worker
+    procs = [start_other_process(data_dir, f"WORKER = {w}\n" + textwrap.dedent(code), flush_delay=0.01,
+                                 compact_threshold=4096)
+             for w in range(workers)]
+    assert [p.wait(timeout=120) for p in procs] == [0] * workers
+
+    manager = reopen(data_dir)
+    quotes = manager.get_quote_history()
+    assert len(quotes) == workers * per_worker
+    assert len({q['notes'] for q in quotes}) == workers * per_worker
+    assert len({q['id'] for q in quotes}) == workers * per_worker
+    customer = manager.get_customer("0500000000")
+    assert customer['quotes_count'] == workers * per_worker
+    assert customer['total_amount'] == workers * per_worker * 10
+    assert len(manager.get_all_drafts()) == workers * 5
+    assert manager.get_statistics()['popular_products'] == {f'p{w}': {'count': per_worker, 'quantity': per_worker}
+                                                            for w in range(workers)}
+    manager.close()
+
+
+def test_reader_picks_up_another_process_saves(tmp_path):
+    data_dir = str(tmp_path)
+    reader = reopen(data_dir)
+    assert reader.get_quote_history() == []
+    in_other_process(data_dir, "manager.save_quote({'customer_data': {'name': 'לקוח ב', 'phone': '050-2222222'}, "
+                               "'items': [], 'total_amount': 200})\nmanager.compact()")
+    assert [q['customer_name'] for q in reader.get_quote_history()] == ["לקוח ב"]
+    assert reader.search_customers("0502") and reader.get_statistics()['total_quotes'] == 1
+    reader.close()
+
+
+# Customer records and statistics
+
+def test_restart_reuses_saved_statistics(tmp_path, monkeypatch):
+    data_dir = str(tmp_path)
+    manager = reopen(data_dir)
+    manager.save_quote(quote("לקוח א", "050-1111111", 100))
+    manager.save_quote(quote("לקוח ב", "050-2222222", 200))
+    manager.close()
+    # עמדה שנסגרה בלי close (קריסה) - השמירה שלה נמצאת רק בזנב היומן
+    crashed = reopen(data_dir)
+    crashed.save_quote(quote("לקוח ג", "050-3333333", 300))
+
+    def no_rescan(self):
+        raise AssertionError("statistics were rebuilt from the full history")
+
+    monkeypatch.setattr(CustomerManager, '_rebuild_stats', no_rescan)
+    reloaded = CustomerManager(data_dir)
+    stats = reloaded.get_statistics()
+    assert stats['total_quotes'] == 3
+    assert stats['total_revenue'] == 600
+    assert stats['popular_products']['מוצר'] == {'count': 3, 'quantity': 3}
+    reloaded.close()
@@ -0,0 +1,79 @@
+# file: panel_app/tests/test_customer_manager_sqlite.py
+"""בדיקות התנהגות למאגר ה-SQLite והמעבר אליו מתיקיית JSON"""
+from customer_manager import CustomerManager
+from customer_manager_sqlite import SqliteCustomerManager
+from tests.factories import quote
+
+
+def test_migration_includes_journal_entries(tmp_path):
+    data_dir = str(tmp_path)
+    # בלי קומפקציה - הלקוחות וההצעות נמצאים רק ביומן
+    json_manager = CustomerManager(data_dir, flush_delay=0)
+    json_manager.save_quote(quote("לקוח א", "050-1111111", 100))
+    json_manager.save_quote(quote("לקוח א", "050-1111111", 50))
+    json_manager.save_quote(quote("לקוח ב", "050-2222222", 200))
+    json_manager.save_draft({'customer_data': {'name': 'טיוטה'}, 'items': []})
+    json_manager.close()
+
+    manager = SqliteCustomerManager(data_dir)
+    assert len(manager.get_quote_history()) == 3
+    assert manager.get_customer("0501111111")['quotes_count'] == 2
+    assert manager.get_customer("0501111111")['total_amount'] == 150
+    assert len(manager.get_all_drafts()) == 1
+    assert manager.get_statistics()['total_revenue'] == 350
+    manager.close()
+
+
+def test_migration_keeps_line_items(tmp_path):
+    data_dir = str(tmp_path)
+    items = [{'name': 'ארון', 'quantity': 2, 'price': 50, 'total': 100, 'category': 'ארונות'},
+             {'name': 'ידית', 'quantity': 4, 'price': 5, 'total': 20}]
+    json_manager = CustomerManager(data_dir, flush_delay=0)
+    quote_id = json_manager.save_quote(quote("לקוח א", "050-1111111", 120, items))
+    json_manager.compact()
+    json_manager.save_quote(quote("לקוח ב", "050-2222222", 100, items[:1]))
+    json_manager.close()
+
+    manager = SqliteCustomerManager(data_dir)
+    assert manager.get_quote(quote_id)['items'] == items
+    assert sorted(q['items_count'] for q in manager.get_quote_history()) == [1, 2]
+    assert manager.get_statistics()['popular_products']['ארון'] == {'count': 2, 'quantity': 4}
+    categories = {r['key']: r['revenue'] for r in manager.get_revenue_rollup('category')}
+    assert categories == {'ארונות': 200, 'ללא קטגוריה': 20}
+    manager.close()
+
+
+def _fill(manager):
+    items = [{'name': 'ארון', 'quantity': 2, 'price': 50, 'total': 100},
+             {'name': 'ידית', 'quantity': 4, 'price': 5, 'total': 20}]
+    for i in range(8):
+        manager.save_quote(quote(f"לקוח {i % 3}", f"050-000000{i % 3}", 100 + i, items[:1 + i % 2]))
+    manager.bulk_import(quotes=[{'name': f"לקוח {i}", 'phone': f"052-000000{i}", 'total_amount': 500 * i,
+                                 'created_at': "2019-05-01", 'items': items} for i in range(6)])
+
+
+def test_statistics_match_the_json_backend(tmp_path):
+    json_manager = CustomerManager(str(tmp_path / "json"), flush_delay=0)
+    manager = SqliteCustomerManager(str(tmp_path / "sqlite"))
+    _fill(json_manager)
+    _fill(manager)
+    expected = json_manager.get_statistics()
+    assert manager.get_statistics() == expected
+    manager.rebuild_statistics()
+    assert manager.get_statistics() == expected
+    json_manager.close()
+    manager.close()
+
+
+def test_statistics_tables_are_rebuilt_after_an_upgrade(tmp_path):
+    manager = SqliteCustomerManager(str(tmp_path))
+    _fill(manager)
+    expected = manager.get_statistics()
+    # מסד מגרסה שלא החזיקה את טבלת המוצרים
+    with manager.conn:
+        manager.conn.execute("DELETE FROM product_rollups")
+        manager.conn.execute("UPDATE meta SET value = '2' WHERE key = 'rollups_version'")
+    manager.close()
+    reopened = SqliteCustomerManager(str(tmp_path))
+    assert reopened.get_statistics() == expected
+    reopened.close()
@@ -0,0 +1,46 @@
+# file: panel_app/tests/test_customer_search.py
+"""חיפוש לקוחות - אותם כללי התאמה ואותו סדר בשני סוגי האחסון"""
+import pytest
+
+CUSTOMERS = [
+    {'name': "משה כהן", 'phone': "050-1234567"},
+    {'name': "כהנא דוד", 'phone': "052-7654321"},
+    {'name': "Dana Levi", 'phone': "+972 54 111 2233"},
+    {'name': "אבי משה", 'phone': "03-5050505"},
+]
+
+
+@pytest.fixture
+def manager(open_manager):
+    manager = open_manager()
+    for customer in CUSTOMERS:
+        manager.add_customer(customer)
+    return manager
+
+
+def _names(results):
+    return [c['name'] for c in results]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("כה", ["כהנא דוד", "משה כהן"]),
+    ("הן", []),
+    ("משה", ["אבי משה", "משה כהן"]),
+    ("משה כה", ["משה כהן"]),
+    ("dana", ["Dana Levi"]),
+    ("LEV", ["Dana Levi"]),
+    ("050", ["משה כהן"]),
+    ("050-12", ["משה כהן"]),
+    ("(052) 765", ["כהנא דוד"]),
+    ("97254", ["Dana Levi"]),
+    ("505", []),
+    ("050 x", []),
+])
+def test_matching_rules(manager, query, expected):
+    assert _names(manager.search_customers(query)) == expected
+
+
+def test_limit_and_empty_query(manager):
+    assert _names(manager.search_customers("משה", limit=1)) == ["אבי משה"]
+    assert _names(manager.search_customers("  ")) == _names(manager.get_all_customers())
+    assert len(manager.search_customers("", limit=2)) == 2
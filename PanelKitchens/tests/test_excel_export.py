@@ -0,0 +1,58 @@
+# file: panel_app/tests/test_excel_export.py
+"""ייצוא ל-Excel בזרימה, בעמודים מהאחסון"""
+import json
+
+import pytest
+from openpyxl import load_workbook
+
+import excel_export
+from tests.factories import quote
+
+ITEMS = [{'name': 'ארון', 'quantity': 2, 'price': 100, 'total': 200},
+         {'name': 'ידית', 'quantity': 4, 'price': 5, 'total': 20}]
+
+
+@pytest.fixture
+def manager(open_manager, monkeypatch):
+    # עמודים קטנים - הייצוא חוצה כמה עמודים גם בנתוני בדיקה
+    monkeypatch.setattr(excel_export, 'EXPORT_PAGE_SIZE', 2)
+    manager = open_manager()
+    for i in range(5):
+        manager.save_quote(quote(f"לקוח {i % 3}", f"050-000000{i % 3}", 220, ITEMS[:1 + i % 2]))
+
+    def whole_history(*args, **kwargs):
+        raise AssertionError("export must read pages, not the whole history")
+
+    monkeypatch.setattr(manager, 'get_quote_history', whole_history)
+    return manager
+
+
+def _sheet(path, name):
+    rows = list(load_workbook(path, read_only=True)[name].values)
+    return rows[0], [dict(zip(rows[0], row)) for row in rows[1:]]
+
+
+def test_export_with_items_as_json(manager, tmp_path):
+    path = str(tmp_path / "export.xlsx")
+    manager.export_to_excel(path)
+    assert load_workbook(path, read_only=True).sheetnames == ['לקוחות', 'הצעות מחיר', 'סטטיסטיקות']
+    header, customers = _sheet(path, 'לקוחות')
+    assert list(header) == excel_export.CUSTOMER_COLUMNS
+    assert sorted(c['quotes_count'] for c in customers) == [1, 2, 2]
+    _, quotes = _sheet(path, 'הצעות מחיר')
+    assert len(quotes) == 5
+    assert sorted(len(json.loads(q['items'])) for q in quotes) == [1, 1, 1, 2, 2]
+    _, stats = _sheet(path, 'סטטיסטיקות')
+    assert {'מדד': 'סה"כ הצעות', 'ערך': 5} in stats
+
+
+def test_export_with_flattened_items(manager, tmp_path):
+    path = str(tmp_path / "export.xlsx")
+    manager.export_to_excel(path, flatten_items=True)
+    _, quotes = _sheet(path, 'הצעות מחיר')
+    assert 'items' not in quotes[0] and sorted(q['items_count'] for q in quotes) == [1, 1, 1, 2, 2]
+    header, items = _sheet(path, 'פריטים')
+    assert list(header) == excel_export.ITEM_COLUMNS
+    assert len(items) == 7
+    assert sum(item['total'] for item in items) == 5 * 200 + 2 * 20
+    assert {item['quote_id'] for item in items} == {q['id'] for q in quotes}
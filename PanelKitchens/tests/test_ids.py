@@ -0,0 +1,51 @@
+# file: panel_app/tests/test_ids.py
+"""מזהים ייחודיים וממוינים לפי זמן"""
+import re
+import threading
+from datetime import datetime
+
+from utils.ids import IdGenerator, RANDOM_CHARS, new_id
+
+ID_PATTERN = re.compile(rf'quote_\d{{8}}_\d{{6}}_\d{{3}}[0-9A-HJKMNP-TV-Z]{{{RANDOM_CHARS}}}')
+
+
+def test_format():
+    assert ID_PATTERN.fullmatch(new_id('quote'))
+
+
+def test_ids_are_unique_and_increasing_within_a_millisecond():
+    generator = IdGenerator()
+    ids = [generator.new_id('quote') for _ in range(5000)]
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+
+
+def test_ids_from_several_threads_are_unique():
+    generator = IdGenerator()
+    results = [[] for _ in range(4)]
+
+    def worker(out):
+        out.extend(generator.new_id('draft') for _ in range(2000))
+
+    threads = [threading.Thread(target=worker, args=(out,)) for out in results]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    ids = [i for out in results for i in out]
+    assert len(set(ids)) == len(ids)
+
+
+def test_explicit_time_keeps_historical_order():
+    generator = IdGenerator()
+    now_id = generator.new_id('quote')
+    old = [generator.new_id('quote', at=datetime(2015, 1, 1, 12)) for _ in range(3)]
+    assert old == sorted(old) and len(set(old)) == 3
+    assert old[0].startswith('quote_20150101_120000_000')
+    assert old[-1] < now_id < generator.new_id('quote')
+    # מחרוזת ISO מתקבלת כמו datetime
+    assert generator.new_id('quote', at='2015-01-01T12:00:00') > old[-1]
+
+
+def test_legacy_ids_sort_before_new_ids_of_the_same_second():
+    assert 'quote_20260315_142501' < new_id('quote', at=datetime(2026, 3, 15, 14, 25, 1))
@@ -0,0 +1,73 @@
+# file: panel_app/tests/test_image_processing.py
+"""בדיקות לעיבוד התמונות לפני ההטמעה ב-PDF ולמטמון שלהן"""
+import io
+import os
+
+import pytest
+from PIL import Image as PILImage
+
+import image_processing
+
+
+@pytest.fixture
+def cache_root(tmp_path, monkeypatch):
+    root = tmp_path / "images"
+    root.mkdir()
+    monkeypatch.setattr(image_processing, 'cache_dir', lambda name: str(root))
+    return root
+
+
+def _photo(width: int, height: int, color=(200, 30, 30), orientation=None) -> bytes:
+    out = io.BytesIO()
+    exif = PILImage.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    PILImage.new('RGB', (width, height), color).save(out, format='JPEG', exif=exif)
+    return out.getvalue()
+
+
+def _size(data: bytes):
+    return PILImage.open(io.BytesIO(data)).size
+
+
+def test_exif_rotation_and_downsampling(cache_root):
+    # תמונת טלפון לרוחב עם סימון סיבוב של 90 מעלות
+    data = image_processing.prepare_image(_photo(1200, 600, orientation=6), 72, 72, dpi=100)
+    assert PILImage.open(io.BytesIO(data)).format == 'JPEG'
+    assert _size(data) == (50, 100)
+
+
+def test_small_images_are_not_enlarged(cache_root):
+    assert _size(image_processing.prepare_image(_photo(40, 30), 300, 300)) == (40, 30)
+
+
+def test_repeated_image_is_served_from_the_cache(cache_root, monkeypatch):
+    raw = _photo(800, 800)
+    first = image_processing.prepare_image(raw, 100, 100)
+
+    def fail(*args):
+        raise AssertionError("processed again")
+
+    monkeypatch.setattr(image_processing, '_process', fail)
+    assert image_processing.prepare_image(raw, 100, 100) == first
+    with pytest.raises(AssertionError):
+        image_processing.prepare_image(raw, 100, 100, dpi=300)
+
+
+def test_cache_is_capped_least_recently_used_first(cache_root, monkeypatch):
+    monkeypatch.setattr(image_processing, 'IMAGE_CACHE_MAX_ENTRIES', 2)
+    photos = [_photo(100, 100, (i * 60, 0, 0)) for i in range(3)]
+    image_processing.prepare_image(photos[0], 50, 50)
+    image_processing.prepare_image(photos[1], 50, 50)
+    for i, path in enumerate(sorted(cache_root.iterdir(), key=os.path.getmtime)):
+        os.utime(path, (1000 + i, 1000 + i))
+    # שימוש חוזר בתמונה הראשונה - עכשיו השנייה היא הישנה ביותר
+    image_processing.prepare_image(photos[0], 50, 50)
+    image_processing.prepare_image(photos[2], 50, 50)
+
+    keys = {image_processing._cache_key(p, 50, 50, image_processing.DEFAULT_DPI,
+                                        image_processing.DEFAULT_JPEG_QUALITY) for p in photos}
+    remaining = {path.stem for path in cache_root.iterdir()}
+    assert len(remaining) == 2 and remaining < keys
+    assert image_processing._cache_key(photos[1], 50, 50, image_processing.DEFAULT_DPI,
+                                       image_processing.DEFAULT_JPEG_QUALITY) not in remaining
@@ -0,0 +1,106 @@
+# file: panel_app/tests/test_maintenance.py
+"""בדיקות למתזמן התחזוקה ברקע"""
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+import maintenance
+from maintenance import MaintenanceScheduler
+from settings_manager import SettingsManager
+
+
+class RecordingStore:
+    """Stands in for the customer store - records which jobs ran and on which thread."""
+
+    def __init__(self):
+        self.calls = []
+        self.closed = False
+        self.ran = threading.Event()
+
+    def _record(self, name):
+        self.calls.append((name, threading.current_thread().name))
+        self.ran.set()
+
+    def create_backup(self):
+        self._record('backup')
+
+    def compact(self):
+        self._record('compact')
+
+    def rebuild_statistics(self):
+        raise RuntimeError("disk full")
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def settings(tmp_path):
+    settings = SettingsManager(str(tmp_path / "settings.json"))
+    settings.set('maintenance.idle_minutes', 0)
+    return settings
+
+
+@pytest.fixture
+def store():
+    return RecordingStore()
+
+
+def _scheduler(settings, store, tmp_path, **options):
+    return MaintenanceScheduler(settings, lambda: store, str(tmp_path), **options)
+
+
+def _ran(store):
+    return [name for name, _ in store.calls]
+
+
+def test_jobs_follow_the_settings(settings, store, tmp_path):
+    scheduler = _scheduler(settings, store, tmp_path)
+    assert scheduler.jobs()['backup'] == timedelta(days=7)
+    settings.set('features.auto_backup', False)
+    settings.set('maintenance.compact_interval_hours', 6)
+    assert scheduler.jobs()['backup'] is None and scheduler.jobs()['compact'] == timedelta(hours=6)
+
+
+def test_due_jobs_run_once_per_interval(settings, store, tmp_path):
+    scheduler = _scheduler(settings, store, tmp_path)
+    scheduler.run_pending()
+    assert _ran(store) == ['backup', 'compact']
+    # עבודה שנכשלה נרשמת ולא עוצרת את השאר
+    assert scheduler.state['rollups']['error'] == "disk full"
+    assert scheduler.state['compact']['error'] is None and scheduler.state['compact']['duration_ms'] >= 0
+
+    scheduler.run_pending()
+    _scheduler(settings, store, tmp_path).run_pending()
+    assert _ran(store) == ['backup', 'compact']
+
+
+def test_jobs_wait_for_idle_unless_deferred_too_long(settings, store, tmp_path):
+    settings.set('maintenance.idle_minutes', 10)
+    scheduler = _scheduler(settings, store, tmp_path)
+    scheduler.run_pending()
+    assert _ran(store) == []
+
+    long_ago = (datetime.now() - timedelta(days=1) - maintenance.MAX_DEFER).isoformat()
+    scheduler.state = {'backup': {'last_run': datetime.now().isoformat()}, 'compact': {'last_run': long_ago}}
+    scheduler.run_pending()
+    assert _ran(store) == ['compact']
+
+
+def test_busy_app_and_disabled_maintenance_run_nothing(settings, store, tmp_path):
+    _scheduler(settings, store, tmp_path, is_busy=lambda: True).run_pending()
+    settings.set('maintenance.enabled', False)
+    _scheduler(settings, store, tmp_path).run_pending()
+    assert _ran(store) == []
+
+
+def test_jobs_run_on_a_background_thread(settings, store, tmp_path):
+    scheduler = _scheduler(settings, store, tmp_path, check_interval=0.01)
+    scheduler.start()
+    try:
+        assert store.ran.wait(5)
+    finally:
+        scheduler.stop()
+    assert all(thread == "maintenance" for _, thread in store.calls)
+    assert store.closed
@@ -0,0 +1,68 @@
+# file: panel_app/tests/test_pagination.py
+"""דפדוף לפי cursor - עמודים לא זזים כשנוספות רשומות בזמן הדפדוף (בשני סוגי האחסון)"""
+import pytest
+
+from tests.factories import quote
+
+
+def _collect(page_fn, limit, between_pages=None):
+    rows, cursor, pages = [], None, 0
+    while True:
+        page, cursor = page_fn(limit=limit, cursor=cursor)
+        rows.extend(page)
+        pages += 1
+        if cursor is None:
+            return rows
+        if between_pages:
+            between_pages(pages)
+
+
+def test_quote_pages_are_stable_while_new_quotes_arrive(open_manager):
+    manager = open_manager()
+    for i in range(12):
+        manager.save_quote(quote(f"לקוח {i % 4}", f"050-000000{i % 4}", 100 + i))
+    expected = [q['id'] for q in manager.get_quote_history()]
+
+    def save_more(page):
+        manager.save_quote(quote("לקוח חדש", "050-9999999", 1))
+
+    seen = [q['id'] for q in _collect(manager.page_quotes, 5, save_more)]
+    assert seen == expected
+
+
+def test_customer_pages_are_stable_while_customers_are_added(open_manager):
+    manager = open_manager()
+    for i, name in enumerate(["דנה", "יוסי", "מיכל", "נועם", "רונית", "שירה", "תמר"]):
+        manager.add_customer({'name': name, 'phone': f"050-000000{i}"})
+    expected = [c['name'] for c in manager.get_all_customers()]
+
+    def add_before_cursor(page):
+        # שם שממוין לפני העמוד הנוכחי לא מזיז את העמודים הבאים
+        manager.add_customer({'name': f"אבי {page}", 'phone': f"052-000000{page}"})
+
+    seen = [c['name'] for c in _collect(manager.page_customers, 3, add_before_cursor)]
+    assert seen == expected
+
+
+def test_customer_quote_pages(open_manager):
+    manager = open_manager()
+    for i in range(7):
+        manager.save_quote(quote("לקוח א", "050-1111111", i))
+        manager.save_quote(quote("לקוח ב", "050-2222222", i))
+    pages = _collect(lambda **kw: manager.page_quotes(customer_id="0501111111", **kw), 3)
+    assert [q['total_amount'] for q in pages] == list(range(6, -1, -1))
+
+
+def test_draft_pages_cover_every_draft_once(open_manager):
+    manager = open_manager()
+    for i in range(8):
+        manager.save_draft({'id': f"draft_{i}", 'items': [], 'title': str(i)})
+    seen = [d['id'] for d in _collect(manager.page_drafts, 3)]
+    assert sorted(seen) == sorted(f"draft_{i}" for i in range(8))
+    assert len(seen) == len(set(seen))
+
+
+def test_invalid_cursor_is_rejected(open_manager):
+    manager = open_manager()
+    with pytest.raises(ValueError):
+        manager.page_customers(cursor="not a cursor")
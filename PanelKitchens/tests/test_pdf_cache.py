@@ -0,0 +1,69 @@
+# file: panel_app/tests/test_pdf_cache.py
+"""בדיקות למטמון קובצי ה-PDF של הצעות המחיר"""
+import os
+
+import pandas as pd
+
+from pdf_cache import PdfCache, quote_cache_key
+
+CUSTOMER = {'name': 'לקוח', 'phone': '050-1111111', 'discount': 0}
+ITEMS = [{'הפריט': 'ארון', 'כמות': 2, 'מחיר יחידה': 100, 'סהכ': 200, 'הערות': ''}]
+
+
+def test_key_is_stable_for_the_same_quote():
+    key = quote_cache_key(CUSTOMER, ITEMS, b'image', settings={'profile': 'email'})
+    assert key == quote_cache_key(dict(reversed(list(CUSTOMER.items()))), pd.DataFrame(ITEMS), b'image',
+                                  settings={'profile': 'email'})
+    # עמודות שלא מודפסות לא משנות את המפתח
+    assert key == quote_cache_key(CUSTOMER, [dict(ITEMS[0], הערות='x')], b'image', settings={'profile': 'email'})
+
+
+def test_key_changes_with_anything_that_is_printed(tmp_path):
+    image = tmp_path / "demo.jpg"
+    image.write_bytes(b'image')
+    key = quote_cache_key(CUSTOMER, ITEMS, str(image))
+    assert key == quote_cache_key(CUSTOMER, ITEMS, b'image')
+    assert key != quote_cache_key(CUSTOMER, [dict(ITEMS[0], כמות=3)], str(image))
+    assert key != quote_cache_key(dict(CUSTOMER, discount=5), ITEMS, str(image))
+    assert key != quote_cache_key(CUSTOMER, ITEMS, b'other image')
+    assert key != quote_cache_key(CUSTOMER, ITEMS, str(image), settings={'profile': 'print'})
+
+
+def test_put_get_and_invalidate(tmp_path):
+    cache = PdfCache(str(tmp_path))
+    assert cache.get('a') is None and cache.get_path('a') is None
+    cache.put('a', b'%PDF-a')
+    source = tmp_path / "b.pdf"
+    source.write_bytes(b'%PDF-b')
+    cache.put_file('b', str(source))
+    assert cache.get('a') == b'%PDF-a'
+    with open(cache.get_path('b'), 'rb') as f:
+        assert f.read() == b'%PDF-b'
+    cache.invalidate('a')
+    assert cache.get('a') is None and cache.get('b') == b'%PDF-b'
+    cache.invalidate()
+    assert cache.get('b') is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = PdfCache(str(tmp_path), max_entries=2)
+    cache.put('a', b'a')
+    cache.put('b', b'b')
+    for i, key in enumerate('ab'):
+        os.utime(cache._entry_path(key), (1000 + i, 1000 + i))
+    cache.get('a')
+    cache.put('c', b'c')
+    assert [key for key in 'abc' if cache.get(key)] == ['a', 'c']
+
+    small = PdfCache(str(tmp_path / "small"), max_bytes=10)
+    small.put('a', b'12345678')
+    small.put('b', b'12345678')
+    assert small.get('a') is None and small.get('b')
+
+
+def test_generator_version_change_clears_the_cache(tmp_path):
+    cache = PdfCache(str(tmp_path))
+    cache.put('a', b'%PDF')
+    with open(tmp_path / "VERSION", 'w', encoding='utf-8') as f:
+        f.write('0')
+    assert PdfCache(str(tmp_path)).get('a') is None
@@ -0,0 +1,62 @@
+# file: panel_app/tests/test_pdf_generator.py
+"""בדיקות למחולל ה-PDF"""
+import io
+import threading
+from datetime import date
+
+import pandas as pd
+import pytest
+from reportlab import rl_config
+
+from pdf_generator import PdfGenerationCancelled, create_combined_report, create_enhanced_pdf
+from tests.factories import pdf_page_count
+
+
+def _customer(name='לקוח'):
+    return {'name': name, 'phone': '050-1111111', 'email': '', 'address': '', 'date': date(2026, 1, 1),
+            'discount': 0}
+
+
+def _items(rows=1):
+    return pd.DataFrame([{'הפריט': f'ארון {i}', 'כמות': 1, 'מחיר יחידה': 100, 'סהכ': 100, 'הערות': '',
+                          'קטגוריה': 'ארונות'} for i in range(rows)])
+
+
+def test_binary_streams_do_not_change_reportlab_globally():
+    before = rl_config.useA85
+    data = create_enhanced_pdf(_customer(), _items()).getvalue()
+    assert data.startswith(b'%PDF') and b'ASCII85Decode' not in data
+    assert rl_config.useA85 == before
+
+
+def test_combined_report_shares_fonts_and_images():
+    single = create_enhanced_pdf(_customer(), _items(3)).getvalue()
+    output = io.BytesIO()
+    assert create_combined_report(({'customer_data': _customer(f"לקוח {i}"), 'items_df': _items(3)}
+                                   for i in range(5)), output) == 5
+    combined = output.getvalue()
+    assert pdf_page_count(combined) == 5 * pdf_page_count(single)
+    # גופנים, לוגו וסימן מים מוטמעים פעם אחת לכל הדוח
+    for marker in (b'/FontFile2', b'/Subtype /Image'):
+        assert combined.count(marker) == single.count(marker)
+    assert len(combined) < 2 * len(single)
+
+
+def test_combined_report_reads_quotes_one_at_a_time():
+    produced = []
+
+    def quotes():
+        for i in range(3):
+            produced.append(i)
+            yield {'customer_data': _customer(), 'items_df': _items()}
+
+    seen = []
+    create_combined_report(quotes(), io.BytesIO(), progress=lambda done: seen.append((done, len(produced))))
+    assert seen == [(1, 1), (2, 2), (3, 3)]
+
+
+def test_combined_report_can_be_cancelled():
+    cancel = threading.Event()
+    quotes = ({'customer_data': _customer(), 'items_df': _items()} for _ in range(3))
+    with pytest.raises(PdfGenerationCancelled):
+        create_combined_report(quotes, io.BytesIO(), progress=lambda done: cancel.set(), cancel_event=cancel)
@@ -0,0 +1,31 @@
+# file: panel_app/tests/test_pdf_preview.py
+"""בדיקות לתצוגה המקדימה של PDF"""
+import os
+
+import pytest
+from reportlab.pdfgen import canvas
+
+import pdf_preview
+
+pytest.importorskip("pypdfium2")
+
+
+def _make_pdf(path: str, text: str) -> str:
+    c = canvas.Canvas(path)
+    c.drawString(100, 700, text)
+    c.save()
+    return path
+
+
+def test_thumbnail_cache_is_capped(tmp_path, monkeypatch):
+    root = tmp_path / "thumbnails"
+    root.mkdir()
+    monkeypatch.setattr(pdf_preview, 'cache_dir', lambda name: str(root))
+    monkeypatch.setattr(pdf_preview, 'THUMBNAIL_CACHE_MAX_ENTRIES', 3)
+
+    pages = []
+    for i in range(6):
+        pages = pdf_preview.render_thumbnails(_make_pdf(str(tmp_path / f"q{i}.pdf"), f"quote {i}"), scale=0.2)
+    assert len(os.listdir(root)) == 3
+    # התיקייה של ה-PDF האחרון נשארת
+    assert all(os.path.exists(p) for p in pages)
@@ -0,0 +1,52 @@
+# file: panel_app/tests/test_quote_queries.py
+"""היסטוריית הצעות ושאילתות טווח תאריכים - אותה תוצאה בשני סוגי האחסון"""
+from datetime import date, datetime
+
+from tests.factories import quote
+
+HISTORY = [("דנה", "054-1234567", "2024-01-10T09:00:00", 1), ("יוסי", "052-7654321", "2024-01-31T23:59:00", 2),
+           ("דנה", "054-1234567", "2023-12-31T12:00:00", 3), ("דנה", "054-1234567", "2024-02-01T00:00:00", 4),
+           ("יוסי", "052-7654321", "2024-01-10T09:00:00", 5)]
+
+
+def _history(manager):
+    manager.bulk_import(quotes=[{'name': name, 'phone': phone, 'created_at': created_at, 'total_amount': total}
+                                for name, phone, created_at, total in HISTORY])
+
+
+def _totals(quotes):
+    return [q['total_amount'] for q in quotes]
+
+
+def test_history_is_newest_first(open_manager):
+    manager = open_manager()
+    _history(manager)
+    manager.save_quote(quote("דנה", "054-1234567", 6))
+    # שתי הצעות מאותו רגע - האחרונה שנוספה ראשונה
+    assert _totals(manager.get_quote_history()) == [6, 4, 2, 5, 1, 3]
+    assert _totals(manager.get_quote_history("0541234567")) == [6, 4, 1, 3]
+    assert manager.get_quote_history("0500000000") == []
+    manager.close()
+    assert _totals(open_manager().get_quote_history("0527654321")) == [2, 5]
+
+
+def test_range_is_half_open_and_oldest_first(open_manager):
+    manager = open_manager()
+    _history(manager)
+    assert _totals(manager.get_quotes_in_range(date(2024, 1, 1), date(2024, 2, 1))) == [1, 5, 2]
+    assert _totals(manager.get_quotes_in_range("2024-01-10T09:00:00", datetime(2024, 1, 31, 23, 59))) == [1, 5]
+    assert _totals(manager.get_quotes_in_range(start="2024-01-31")) == [2, 4]
+    assert _totals(manager.get_quotes_in_range(end=date(2024, 1, 1))) == [3]
+    assert _totals(manager.get_quotes_in_range()) == [3, 1, 5, 2, 4]
+    assert _totals(manager.get_quotes_in_range(date(2024, 1, 1), customer_id="0541234567")) == [1, 4]
+    assert manager.get_quotes_in_range(date(2025, 1, 1)) == []
+
+
+def test_new_quotes_keep_the_order(open_manager):
+    manager = open_manager()
+    _history(manager)
+    manager.save_quote(quote("דנה", "054-1234567", 6))
+    manager.bulk_import(quotes=[{'name': "דנה", 'phone': "054-1234567", 'created_at': "2024-01-20",
+                                 'total_amount': 7}])
+    assert _totals(manager.get_quotes_in_range(end=date(2024, 2, 2), customer_id="0541234567")) == [3, 1, 7, 4]
+    assert _totals(manager.get_quote_history())[:2] == [6, 4]
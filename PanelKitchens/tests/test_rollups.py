@@ -0,0 +1,85 @@
+# file: panel_app/tests/test_rollups.py
+"""מצטברי ההכנסות לגרפים - יום / חודש / קטגוריה, אותה תוצאה בשני סוגי האחסון"""
+from datetime import date, datetime
+
+import pytest
+
+from customer_manager import UNCATEGORIZED, category_totals, rollup_range
+
+ITEMS = [{'name': 'ארון', 'quantity': 1, 'price': 300, 'total': 300, 'category': 'ארונות'},
+         {'name': 'ידית', 'quantity': 4, 'price': 5, 'קטגוריה': 'ידיות'},
+         {'name': 'הובלה', 'quantity': 1, 'total': '1,000'}]
+# שורה כפי שהיא מגיעה מהקטלוג / ממסך המוצרים
+CATALOG_ROW = {'הפריט': 'ארון עליון', 'קטגוריה': 'ארונות', 'כמות': 2, 'מחיר יחידה': 100, 'סהכ': 200}
+
+
+def _history(manager):
+    manager.bulk_import(quotes=[
+        {'name': "דנה", 'phone': "0541234567", 'created_at': created_at, 'items': ITEMS, 'total_amount': total}
+        for created_at, total in [("2024-01-10T09:00", 1000), ("2024-01-10T18:00", 500), ("2024-01-31T23:59", 200),
+                                  ("2024-02-01T00:00", 100), ("2024-03-15T12:00", 400)]])
+
+
+def _rows(rows):
+    return [(r['key'], r['count'], r['revenue'], r['average']) for r in rows]
+
+
+def test_category_totals():
+    assert category_totals(ITEMS) == {'ארונות': 300, 'ידיות': 20, UNCATEGORIZED: 1000.0}
+
+
+def test_category_totals_of_catalog_rows():
+    assert category_totals([CATALOG_ROW]) == {'ארונות': 200}
+    assert category_totals([dict(CATALOG_ROW, סהכ=None)]) == {'ארונות': 200}
+
+
+def test_category_rollups_of_catalog_rows(open_manager):
+    manager = open_manager()
+    manager.save_quote({'customer_data': {'name': "דנה", 'phone': "0541234567"}, 'items': [CATALOG_ROW],
+                        'total_amount': 200})
+    assert _rows(manager.get_revenue_rollup('category')) == [('ארונות', 1, 200, 200)]
+
+
+def test_rollup_range_is_half_open():
+    assert rollup_range(date(2024, 1, 1), date(2024, 2, 1), 7) == ('2024-01', '2024-01')
+    assert rollup_range('2024-01-10T05:00', datetime(2024, 1, 12, 3), 10) == ('2024-01-10', '2024-01-12')
+    assert rollup_range(None, None, 10) == (None, None)
+
+
+def test_daily_and_monthly_rollups(open_manager):
+    manager = open_manager()
+    _history(manager)
+    assert _rows(manager.get_revenue_rollup('month')) == [
+        ('2024-01', 3, 1700, 1700 / 3), ('2024-02', 1, 100, 100), ('2024-03', 1, 400, 400)]
+    assert _rows(manager.get_revenue_rollup('day', start=date(2024, 1, 10), end=date(2024, 2, 1))) == [
+        ('2024-01-10', 2, 1500, 750), ('2024-01-31', 1, 200, 200)]
+    assert _rows(manager.get_revenue_rollup('month', start='2024-02-15')) == [
+        ('2024-02', 1, 100, 100), ('2024-03', 1, 400, 400)]
+
+
+def test_category_rollups(open_manager):
+    manager = open_manager()
+    _history(manager)
+    assert _rows(manager.get_revenue_rollup('category')) == [
+        (UNCATEGORIZED, 5, 5000, 1000), ('ארונות', 5, 1500, 300), ('ידיות', 5, 100, 20)]
+    assert _rows(manager.get_revenue_rollup('category', start=date(2024, 2, 1), end=date(2024, 3, 1))) == [
+        (UNCATEGORIZED, 1, 1000, 1000), ('ארונות', 1, 300, 300), ('ידיות', 1, 20, 20)]
+
+
+def test_rollups_follow_saves_and_rebuilds(open_manager):
+    manager = open_manager()
+    _history(manager)
+    manager.save_quote({'customer_data': {'name': "יוסי", 'phone': "052-7654321"}, 'items': ITEMS[:1],
+                        'total_amount': 300})
+    this_month = datetime.now().strftime('%Y-%m')
+    before = _rows(manager.get_revenue_rollup('day'))
+    assert _rows(manager.get_revenue_rollup('month'))[-1] == (this_month, 1, 300, 300)
+    manager.rebuild_statistics()
+    assert _rows(manager.get_revenue_rollup('day')) == before
+    manager.close()
+    assert _rows(open_manager().get_revenue_rollup('day')) == before
+
+
+def test_unknown_period(open_manager):
+    with pytest.raises(ValueError):
+        open_manager().get_revenue_rollup('week')
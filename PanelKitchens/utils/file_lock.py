@@ -0,0 +1,109 @@
+# file: panel_app/utils/file_lock.py
+"""
+נעילת קבצים בין תהליכים (כמה עמדות על אותה תיקיית נתונים משותפת).
+
+ב-Linux/macOS: flock עם נעילה משותפת לקוראים ובלעדית לכותבים.
+ב-Windows ל-msvcrt יש רק נעילה בלעדית, ולכן גם קריאה שדורשת נעילה נועלת בלעדית.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+RETRY_SECONDS = 0.05
+
+
+class FileLock:
+    """
+    Reader/writer lock on a lock file, re-entrant within a thread.
+    Threads of one process are serialized by an internal mutex; nesting a shared lock
+    inside an exclusive one is allowed, upgrading a shared lock to exclusive is not.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._mutex = threading.RLock()
+        self._fd = None
+        self._depth = 0
+        self._exclusive = False
+
+    def _os_lock(self, exclusive: bool, blocking: bool) -> bool:
+        if fcntl is not None:
+            flags = (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | (0 if blocking else fcntl.LOCK_NB)
+            try:
+                fcntl.flock(self._fd, flags)
+                return True
+            except BlockingIOError:
+                return False
+        while True:
+            try:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                time.sleep(RETRY_SECONDS)
+
+    def _os_unlock(self) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+
+    def acquire(self, exclusive: bool = True, blocking: bool = True) -> bool:
+        if not self._mutex.acquire(blocking):
+            return False
+        if self._depth:
+            if exclusive and not self._exclusive:
+                self._mutex.release()
+                raise RuntimeError(f"cannot upgrade a shared lock on {self.path}")
+            self._depth += 1
+            return True
+        try:
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+            if not self._os_lock(exclusive, blocking):
+                self._mutex.release()
+                return False
+        except BaseException:
+            self._mutex.release()
+            raise
+        self._depth = 1
+        self._exclusive = exclusive
+        return True
+
+    def release(self) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            self._os_unlock()
+        self._mutex.release()
+
+    @contextmanager
+    def shared(self):
+        self.acquire(exclusive=False)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @contextmanager
+    def exclusive(self):
+        self.acquire(exclusive=True)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        with self._mutex:
+            if self._fd is not None and not self._depth:
+                os.close(self._fd)
+                self._fd = None
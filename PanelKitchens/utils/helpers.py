@@ -1,6 +1,8 @@
 # file: panel_app/utils/helpers.py
 import os
+import re
 import sys
+from typing import Callable, List, Tuple
 
 
 def get_base_path() -> str:
@@ -23,4 +25,33 @@ def asset_path(filename: str) -> str:
     # Debug print for troubleshooting
     if not os.path.exists(path):
         print(f"Warning: Asset not found at {path}")
-    return path
\ No newline at end of file
+    return path
+
+
+DATA_DIR = "panel_data"
+
+
+def cache_dir(name: str) -> str:
+    """Return (and create) a named cache directory under the local data folder."""
+    path = os.path.join(DATA_DIR, "cache", name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def enforce_lru_limits(entries: List[Tuple[float, int, str]], max_bytes: int, max_entries: int,
+                       remove: Callable[[str], None] = os.remove) -> None:
+    """Remove the least recently used (mtime, size, path) entries until both caps are met."""
+    entries = sorted(entries)
+    total = sum(size for _, size, _ in entries)
+    while entries and (total > max_bytes or len(entries) > max_entries):
+        _, size, path = entries.pop(0)
+        try:
+            remove(path)
+        except OSError:
+            pass
+        total -= size
+
+
+def safe_filename(name: str, default: str = "לקוח") -> str:
+    """Replace characters that are not allowed in Windows file names."""
+    return re.sub(r'[\\/:*?"<>|]', '_', name or '') or default
@@ -0,0 +1,71 @@
+# file: panel_app/utils/ids.py
+"""
+מזהים ייחודיים מסודרים לפי זמן (בסגנון ULID) להצעות, טיוטות ולקוחות.
+
+מבנה: <prefix>_<YYYYmmdd_HHMMSS>_<ms><16 תווי base32>, למשל
+    quote_20260315_142501_374FD3CK8TDD2864YMM
+החלק האקראי (80 ביט) מונע התנגשות גם בין עמדות שונות, ובתוך אותה אלפית שנייה
+הוא עולה באחד - כך שמזהים נשארים ממוינים לפי סדר היצירה גם ביצירה מהירה באצווה.
+מזהים ישנים (quote_YYYYmmdd_HHMMSS) הם תחילית של הפורמט, ולכן ממוינים לפניהם.
+"""
+import secrets
+import threading
+import time
+from datetime import datetime
+from typing import Union
+
+# Crockford base32 - בלי I, L, O, U; סדר ה-ASCII שלהם הוא סדר הערכים
+_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+RANDOM_BITS = 80
+RANDOM_CHARS = RANDOM_BITS // 5
+
+
+def _encode(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        value, digit = divmod(value, 32)
+        chars.append(_ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+class IdGenerator:
+    """Thread-safe, monotonic within a process: every ID sorts after the previous one."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+        # מזהים לזמן מפורש (ייבוא היסטורי) - רצף נפרד, כדי לא להחזיר את השעון של המזהים החדשים אחורה
+        self._at_ms = -1
+        self._at_random = 0
+
+    def new_id(self, prefix: str, at: Union[datetime, str, None] = None) -> str:
+        """New ID for now, or for the given time (historical records keep their place in the order)."""
+        with self._lock:
+            if at is None:
+                # שעון שזז אחורה (סנכרון, שעון קיץ) לא שובר את הסדר - ממשיכים מהזמן האחרון
+                ms = max(int(time.time() * 1000), self._last_ms)
+                if ms == self._last_ms:
+                    self._last_random += 1
+                else:
+                    self._last_ms, self._last_random = ms, secrets.randbits(RANDOM_BITS - 1)
+                random_part = self._last_random
+            else:
+                if isinstance(at, str):
+                    at = datetime.fromisoformat(at)
+                ms = int(at.timestamp() * 1000)
+                if ms == self._at_ms:
+                    self._at_random += 1
+                else:
+                    self._at_ms, self._at_random = ms, secrets.randbits(RANDOM_BITS - 1)
+                random_part = self._at_random
+        stamp = datetime.fromtimestamp(ms / 1000)
+        return f"{prefix}_{stamp.strftime('%Y%m%d_%H%M%S')}_{ms % 1000:03d}{_encode(random_part, RANDOM_CHARS)}"
+
+
+_generator = IdGenerator()
+
+
+def new_id(prefix: str, at: Union[datetime, str, None] = None) -> str:
+    """Time-ordered unique ID, e.g. new_id('quote') or new_id('quote', at=created_at)."""
+    return _generator.new_id(prefix, at)
@@ -1,4 +1,6 @@
 # file: panel_app/utils/rtl.py
+from functools import lru_cache
+
 import arabic_reshaper
 from bidi.algorithm import get_display
 
@@ -6,6 +8,11 @@ def rtl(text: str) -> str:
     """Reshape and apply bidi algorithm"""
     if not isinstance(text, str):
         text = str(text)
+    return _rtl_cached(text)
+
+# אותן מחרוזות (כותרות, פוטר, שמות מוצרים) חוזרות בכל עמוד ובכל הצעה
+@lru_cache(maxsize=4096)
+def _rtl_cached(text: str) -> str:
     try:
         reshaped = arabic_reshaper.reshape(text)
         return get_display(reshaped)